@@ -0,0 +1,327 @@
+"""Scaling benchmarks for the TF-IDF pipeline and the data tools.
+
+Every benchmark runs on a seeded synthetic corpus (see ``synthetic_corpus``)
+at each requested size, in its own process, and records wall time, CPU time,
+items per second and peak resident memory. Results are written as JSON (with run metadata) and
+CSV to ``benchmarks/results/``, and two result files can be compared to
+see how throughput and memory changed between versions.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--sizes 500 5000 50000] [--only clean_text ...]
+    python benchmarks/run_benchmarks.py --sizes 1000000 --label large
+    python benchmarks/run_benchmarks.py --compare results/old.json results/new.json
+"""
+
+import argparse
+import concurrent.futures
+import contextlib
+import csv
+import io
+import multiprocessing
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCHMARK_DIR, '..', 'src'))
+sys.path.append(os.path.join(BENCHMARK_DIR, '..', 'tools'))
+
+import numpy as np
+import pandas as pd
+
+import tfidf
+from profiling import Measurement
+from synthetic_corpus import generate_corpus
+from data_io import write_table
+
+DEFAULT_SIZES = (500, 5000, 50000)
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, 'results')
+NER_MAX_ARTICLES = 2000  # spaCy is slow enough that larger samples only add waiting
+SEED = 0
+
+
+def _texts(df):
+    return df['title'].tolist() + df['body'].tolist()
+
+
+def bench_import_tfidf(df, workdir):
+    # a fresh interpreter, as every worker process and CLI run pays this
+    src_dir = os.path.join(BENCHMARK_DIR, '..', 'src')
+    subprocess.run([sys.executable, '-c', f"import sys; sys.path.insert(0, {src_dir!r}); import tfidf"], check=True)
+    return 1
+
+
+def bench_normalize_text(df, workdir):
+    texts = _texts(df)
+    for text in texts:
+        tfidf.normalize_text(text)
+    return len(texts)
+
+
+def bench_normalize_text_ner(df, workdir):
+    texts = _texts(df.head(NER_MAX_ARTICLES))
+    for text in texts:
+        tfidf.normalize_text_ner(text)
+    return len(texts)
+
+
+def bench_clean_text(df, workdir):
+    texts = _texts(df)
+    for text in texts:
+        tfidf.clean_text(text)
+    return len(texts)
+
+
+def bench_clean_texts(df, workdir):
+    texts = _texts(df)
+    tfidf.clean_texts(texts)
+    return len(texts)
+
+
+def setup_get_top_tfidf_word(df, workdir):
+    return {'texts': tfidf.PreparedCorpus(df).texts.tolist()}
+
+
+def bench_get_top_tfidf_word(df, workdir, texts):
+    tfidf.get_top_tfidf_word(texts)
+    return len(texts)
+
+
+def bench_near_duplicates(df, workdir, texts):
+    from dedup import NearDuplicates
+    NearDuplicates(texts)
+    return len(texts)
+
+
+def bench_analyze_categories(df, workdir):
+    tfidf.analyze_categories(df)
+    return len(df)
+
+
+def bench_analyze_categories_by_political_leaning(df, workdir):
+    tfidf.analyze_categories_by_political_leaning(df)
+    return len(df)
+
+
+ROLLING_DAYS = 180  # synthetic articles are spread over about six months
+
+
+def setup_rolling_tfidf(df, workdir):
+    # seeded publication dates; cleaning and tokenizing stay out of the timing
+    from rolling import RollingGroupTfidf
+    rng = np.random.default_rng(SEED)
+    seconds = rng.integers(0, ROLLING_DAYS * 24 * 3600, size=len(df))
+    dated = df.assign(date=pd.Timestamp('2025-06-01') + pd.to_timedelta(seconds, unit='s'))
+    return {'rolling': RollingGroupTfidf.from_articles(dated)}
+
+
+def bench_rolling_tfidf(df, workdir, rolling):
+    # daily windows of a week, as in a daily report
+    for _ in rolling.windows('7D', '1D'):
+        pass
+    return len(df)
+
+
+SEARCH_QUERIES = 1000
+
+
+def setup_search_index(df, workdir):
+    # the index is built untimed; queries cycle through the most frequent terms
+    from search_index import InvertedIndex
+    index = InvertedIndex.from_articles(df)
+    by_frequency = np.argsort(-np.diff(index.offsets), kind='stable')[:50]
+    return {'index': index, 'terms': [str(index.vocabulary[i]) for i in by_frequency]}
+
+
+def bench_search_index(df, workdir, index, terms):
+    categories = [None, 'Politics', 'Economy']
+    for i in range(SEARCH_QUERIES):
+        index.search(terms[i % len(terms)], category=categories[i % len(categories)])
+    return SEARCH_QUERIES
+
+
+def setup_tool_input(df, workdir, file_format='csv'):
+    # the annotated dataset without leanings, as the tools expect it
+    path = os.path.join(workdir, 'data_annotated.' + file_format)
+    write_table(df.drop(columns=['publisher_leaning']), path)
+    return {'input_file': path}
+
+
+def bench_add_publisher_leaning(df, workdir, input_file):
+    from add_publisher_leaning import add_publisher_leaning
+    output_file = os.path.join(workdir, 'data_annotated_with_leaning' + os.path.splitext(input_file)[1])
+    add_publisher_leaning(input_file, output_file)
+    return len(df)
+
+
+def setup_update_categories(df, workdir, file_format='csv'):
+    # old category names, so every file really gets rewritten
+    renamed = df.replace({'Categories': {'Social Issues': 'Social', 'Corruption & Scandal': 'Corruption/Scandal'}})
+    write_table(renamed, os.path.join(workdir, 'data_annotated.' + file_format))
+    return {}
+
+
+def bench_update_categories(df, workdir):
+    from update_categories import update_categories
+    update_categories()
+    return len(df)
+
+
+def bench_separate_by_category(df, workdir, input_file):
+    from separate_by_category import separate_data_by_category
+    separate_data_by_category(input_file, output_format=os.path.splitext(input_file)[1][1:])
+    return len(df)
+
+
+# name -> (benchmark, setup or None); setup runs untimed and returns extra keyword arguments
+BENCHMARKS = {
+    'import_tfidf': (bench_import_tfidf, None),
+    'normalize_text': (bench_normalize_text, None),
+    'normalize_text_ner': (bench_normalize_text_ner, None),
+    'clean_text': (bench_clean_text, None),
+    'clean_texts': (bench_clean_texts, None),
+    'get_top_tfidf_word': (bench_get_top_tfidf_word, setup_get_top_tfidf_word),
+    'near_duplicates': (bench_near_duplicates, setup_get_top_tfidf_word),
+    'analyze_categories': (bench_analyze_categories, None),
+    'analyze_categories_by_political_leaning': (bench_analyze_categories_by_political_leaning, None),
+    'rolling_tfidf': (bench_rolling_tfidf, setup_rolling_tfidf),
+    'search_index': (bench_search_index, setup_search_index),
+    'add_publisher_leaning': (bench_add_publisher_leaning, setup_tool_input),
+    'update_categories': (bench_update_categories, setup_update_categories),
+    'separate_by_category': (bench_separate_by_category, setup_tool_input),
+}
+
+
+def warm_imports():
+    """Import what the pipeline and tools import lazily, so a fresh process times the work, not the imports."""
+    from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+    import pyarrow.feather
+    import pyarrow.parquet
+    import add_publisher_leaning, dedup, rolling, search_index, separate_by_category, update_categories
+    tfidf.custom_stop_words()
+
+
+def run_benchmark(name, df, file_format='csv'):
+    """One result record for benchmark ``name`` on ``df``, or None when it cannot run here."""
+    if name == 'normalize_text_ner' and not tfidf.NER_AVAILABLE:
+        print(f"  {name}: skipped (spaCy model not available)")
+        return None
+
+    benchmark, setup = BENCHMARKS[name]
+    warm_imports()
+    with tempfile.TemporaryDirectory(prefix='tfidf_bench_') as workdir:
+        original_cwd = os.getcwd()
+        os.chdir(workdir)  # the tools read and write relative to the working directory
+        try:
+            kwargs = {}
+            if setup is not None:
+                options = {'file_format': file_format} if setup in (setup_tool_input, setup_update_categories) else {}
+                kwargs = setup(df, workdir, **options)
+            # the functions report progress with print; keep the benchmark output readable
+            with contextlib.redirect_stdout(io.StringIO()), Measurement() as measurement:
+                n_items = benchmark(df, workdir, **kwargs)
+        finally:
+            os.chdir(original_cwd)
+
+    record = {'benchmark': name, 'n_articles': len(df), 'n_items': n_items, 'format': file_format}
+    record.update(measurement.as_dict())
+    record['items_per_s'] = round(n_items / measurement.wall_s, 2) if measurement.wall_s else None
+    print(f"  {name}: {measurement.wall_s:.3f}s, {record['items_per_s']} items/s, "
+          f"peak {record['peak_rss_mb']} MB")
+    return record
+
+
+def run_isolated(name, df, file_format='csv'):
+    """``run_benchmark`` in a fresh interpreter, so its peak memory is its own.
+
+    Peak RSS is a high-water mark of the whole process: measured in one
+    process, a benchmark would inherit the peak of every one before it.
+    """
+    context = multiprocessing.get_context('spawn')  # a forked child would start with the parent's memory
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(run_benchmark, name, df, file_format).result()
+
+
+def run_metadata(label=None):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=BENCHMARK_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'label': label,
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': SEED,
+        'ner_available': tfidf.NER_AVAILABLE,
+    }
+
+
+def save_results(records, metadata, results_dir=RESULTS_DIR):
+    """Write ``records`` as JSON (with ``metadata``) and CSV; returns the JSON path."""
+    os.makedirs(results_dir, exist_ok=True)
+    stem = f"{metadata['label'] or 'run'}-{metadata['commit'] or 'nocommit'}-{metadata['timestamp'].replace(':', '')}"
+    json_path = os.path.join(results_dir, stem + '.json')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump({'metadata': metadata, 'results': records}, f, indent=2)
+
+    with open(os.path.join(results_dir, stem + '.csv'), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(records[0]) if records else ['benchmark'])
+        writer.writeheader()
+        writer.writerows(records)
+    return json_path
+
+
+def compare_results(old_path, new_path):
+    """Print throughput and peak-memory ratios (new / old) for matching benchmarks."""
+    def load(path):
+        with open(path, encoding='utf-8') as f:
+            return {(r['benchmark'], r['n_articles'], r['format']): r for r in json.load(f)['results']}
+
+    old, new = load(old_path), load(new_path)
+    print(f"{'benchmark':<42} {'articles':>9} {'items/s old':>12} {'items/s new':>12} {'speedup':>8} {'memory':>7}")
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key], new[key]
+        speedup = after['items_per_s'] / before['items_per_s'] if before['items_per_s'] else float('nan')
+        memory = after['peak_rss_mb'] / before['peak_rss_mb'] if before['peak_rss_mb'] else float('nan')
+        print(f"{key[0]:<42} {key[1]:>9} {before['items_per_s']:>12} {after['items_per_s']:>12} "
+              f"{speedup:>7.2f}x {memory:>6.2f}x")
+
+
+def run(sizes=DEFAULT_SIZES, only=None, file_format='csv', label=None, results_dir=RESULTS_DIR):
+    names = list(BENCHMARKS) if not only else list(only)
+    records = []
+    for size in sizes:
+        print(f"\nGenerating {size} synthetic articles (seed {SEED})...")
+        df = generate_corpus(size, SEED)
+        for name in names:
+            record = run_isolated(name, df, file_format)
+            if record is not None:
+                records.append(record)
+    json_path = save_results(records, run_metadata(label), results_dir)
+    print(f"\nResults saved to {json_path}")
+    return records, json_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the TF-IDF pipeline on synthetic corpora.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="corpus sizes in articles (500 to 1000000)")
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help="benchmarks to run (default: all)")
+    parser.add_argument('--format', default='csv', choices=['csv', 'parquet', 'feather'],
+                        help="file format for the tool benchmarks")
+    parser.add_argument('--label', help="name for the results file, e.g. a branch or version")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="compare two results files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_results(*args.compare)
+    else:
+        run(args.sizes, args.only, args.format, args.label)
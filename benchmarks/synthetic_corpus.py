@@ -0,0 +1,153 @@
+"""Seeded synthetic news corpus with the schema of the annotated dataset.
+
+Articles have ``title``, ``body``, ``source``, ``Categories`` and
+``publisher_leaning`` columns. Bodies mix category topic words, entity
+mentions the normalizers rewrite ("gavin newsom", "gop", ...) and a
+Zipf-distributed background vocabulary, so vocabulary growth and group sizes
+behave like real news text. Rows are generated in fixed blocks, each seeded
+from ``(seed, block)``, so the same seed always produces the same corpus.
+
+Usage:
+    python benchmarks/synthetic_corpus.py 50000 corpus.parquet [seed]
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+from add_publisher_leaning import publisher_leaning
+from data_io import write_table
+
+BLOCK_SIZE = 10000
+BODY_WORDS = 150  # mean body length
+TITLE_WORDS = 8
+BACKGROUND_VOCABULARY = 20000
+
+CATEGORY_TOPICS = {
+    'Politics': 'election campaign ballot voters poll governor senate legislation veto primary',
+    'Economy': 'tax budget inflation jobs wages tariffs deficit markets affordability housing',
+    'Social Issues': 'education schools abortion homelessness equality protest rights families community',
+    'Immigration & Security': 'border deportation asylum migrants enforcement ice visa detention security',
+    'Corruption & Scandal': 'investigation indictment bribery ethics probe lawsuit resignation fraud scandal',
+    'Climate & Environment': 'wildfire drought emissions energy solar water heat conservation pollution',
+    'Health': 'hospital vaccine medicaid insurance outbreak doctors patients mental clinics',
+    'Crime & Justice': 'police court prison sentence shooting trial judge prosecutors verdict',
+}
+
+ENTITY_PHRASES = (
+    'donald trump', 'president trump', 'gavin newsom', 'governor newsom', 'joe biden',
+    'kamala harris', 'dana williamson', 'chief of staff', 'california', 'san francisco',
+    'texas', 'washington dc', 'democrats', 'republicans', 'gop', 'federal government',
+    'congress', 'climate change', 'economy', 'immigration', 'health care', 'planned parenthood',
+)
+
+TOPIC_SHARE = 0.3
+ENTITY_SHARE = 0.1
+SENTENCE_LENGTH = 15
+
+
+def _background_vocabulary(size):
+    # deterministic pronounceable pseudo-words, ranked for the Zipf draw
+    onsets = np.array(list('bcdfghjklmnprstvwz'), dtype=object)
+    vowels = np.array(['a', 'e', 'i', 'o', 'u', 'ai', 'ou'], dtype=object)
+    rng = np.random.default_rng(0)
+    n_candidates = size * 4
+    words = np.full(n_candidates, '', dtype=object)
+    n_syllables = rng.integers(2, 5, size=n_candidates)
+    for syllable in range(4):
+        has_syllable = n_syllables > syllable
+        words[has_syllable] += (onsets[rng.integers(len(onsets), size=int(has_syllable.sum()))]
+                                + vowels[rng.integers(len(vowels), size=int(has_syllable.sum()))])
+    _, first = np.unique(words.astype(str), return_index=True)
+    return words[np.sort(first)[:size]]
+
+
+_BACKGROUND = _background_vocabulary(BACKGROUND_VOCABULARY)
+_ZIPF = 1 / np.arange(1, BACKGROUND_VOCABULARY + 1)
+_ZIPF /= _ZIPF.sum()
+_CATEGORIES = np.array(list(CATEGORY_TOPICS), dtype=object)
+_TOPICS = [np.array(words.split(), dtype=object) for words in CATEGORY_TOPICS.values()]
+_ENTITIES = np.array(ENTITY_PHRASES, dtype=object)
+_SOURCES = np.array(list(publisher_leaning), dtype=object)
+_LEANINGS = np.array(list(publisher_leaning.values()), dtype=object)
+
+
+def _words(rng, categories, lengths):
+    """Token array for documents of ``lengths`` words in ``categories``."""
+    total = int(lengths.sum())
+    doc_categories = np.repeat(categories, lengths)
+    tokens = _BACKGROUND[rng.choice(BACKGROUND_VOCABULARY, size=total, p=_ZIPF)]
+
+    kind = rng.random(total)
+    is_topic = kind < TOPIC_SHARE
+    for c, topic in enumerate(_TOPICS):
+        rows = is_topic & (doc_categories == c)
+        tokens[rows] = topic[rng.integers(len(topic), size=int(rows.sum()))]
+    is_entity = (kind >= TOPIC_SHARE) & (kind < TOPIC_SHARE + ENTITY_SHARE)
+    tokens[is_entity] = _ENTITIES[rng.integers(len(_ENTITIES), size=int(is_entity.sum()))]
+    return tokens
+
+
+def _join(tokens, lengths):
+    ends = np.cumsum(lengths)
+    return [' '.join(tokens[end - length:end]) for end, length in zip(ends, lengths)]
+
+
+def _block(seed, block, n_rows):
+    rng = np.random.default_rng([seed, block])
+    categories = rng.integers(len(_CATEGORIES), size=n_rows)
+    sources = rng.integers(len(_SOURCES), size=n_rows)
+
+    title_lengths = rng.integers(TITLE_WORDS // 2, TITLE_WORDS * 3 // 2, size=n_rows)
+    titles = [title.title() for title in _join(_words(rng, categories, title_lengths), title_lengths)]
+
+    body_lengths = np.maximum(rng.poisson(BODY_WORDS, size=n_rows), 1)
+    tokens = _words(rng, categories, body_lengths)
+    # sentence punctuation, so the cleaners have something to strip
+    stops = rng.random(len(tokens)) < 1 / SENTENCE_LENGTH
+    tokens[stops] = tokens[stops] + '.'
+    bodies = _join(tokens, body_lengths)
+
+    return pd.DataFrame({
+        'title': titles,
+        'body': bodies,
+        'source': _SOURCES[sources],
+        'Categories': _CATEGORIES[categories],
+        'publisher_leaning': _LEANINGS[sources],
+    })
+
+
+def iter_corpus(n_articles, seed=0):
+    """Yield the corpus in blocks of at most BLOCK_SIZE rows."""
+    for block, start in enumerate(range(0, n_articles, BLOCK_SIZE)):
+        yield _block(seed, block, min(BLOCK_SIZE, n_articles - start))
+
+
+def generate_corpus(n_articles, seed=0):
+    """DataFrame of ``n_articles`` synthetic articles; the same seed gives the same rows."""
+    blocks = list(iter_corpus(n_articles, seed))
+    if not blocks:
+        return _block(seed, 0, 0)
+    return pd.concat(blocks, ignore_index=True)
+
+
+def write_corpus(path, n_articles, seed=0):
+    """Write a synthetic corpus to a CSV, Parquet or Feather file."""
+    df = generate_corpus(n_articles, seed)
+    write_table(df, path)
+    return df
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        print("Usage: python benchmarks/synthetic_corpus.py <n_articles> <output.csv|.parquet|.feather> [seed]")
+        sys.exit(1)
+
+    n_articles, output_file = int(sys.argv[1]), sys.argv[2]
+    seed = int(sys.argv[3]) if len(sys.argv) == 4 else 0
+    write_corpus(output_file, n_articles, seed)
+    print(f"Wrote {n_articles} synthetic articles to {output_file} (seed {seed})")
@@ -0,0 +1,156 @@
+"""Bootstrap stability of the top TF-IDF words per group.
+
+A bootstrap resample of a group draws its documents with replacement, which
+is the same as giving every document a weight: the number of times it was
+drawn. A batch of resamples is a sparse (resamples x documents) weight
+matrix, and the per-resample document frequencies, IDF vectors, row norms and
+mean TF-IDF scores all follow from a few products of that matrix with the
+group's count matrix. Each resample scores exactly what refitting
+``get_top_tfidf_word`` on the drawn documents would, without any refitting.
+
+For every top word of the full group this gives a percentile confidence
+interval of its mean TF-IDF and how often it stays in the top ``n_words``.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from group_tfidf import group_idf
+from tfidf import number_idf_words, top_display_features
+
+N_RESAMPLES = 200
+BATCH_SIZE = 50  # resamples scored per set of matrix products
+CONFIDENCE = 0.95
+
+WordStability = namedtuple('WordStability', ['word', 'score', 'ci_low', 'ci_high', 'top_n_rate', 'median_rank'])
+
+
+def resample_weights(rng, n_docs, n_resamples):
+    """(resamples x documents) sparse matrix of how often each document was drawn."""
+    draws = rng.multinomial(n_docs, np.full(n_docs, 1 / n_docs), size=n_resamples)
+    return sparse.csr_matrix(draws, dtype=float)
+
+
+def resample_scores(counts, weights, max_features=None, min_df=1, max_df=1.0):
+    """Mean TF-IDF of every term in each resample (resamples x terms).
+
+    ``counts`` is the group's (documents x terms) count matrix and ``weights``
+    the (resamples x documents) draw counts. Terms pruned in a resample score 0.
+    """
+    presence = counts.copy()
+    presence.data[:] = 1
+    n_docs = np.asarray(weights.sum(axis=1)).ravel()
+    doc_freq = (weights @ presence).toarray()
+    term_freq = (weights @ counts).toarray()
+    idf, _ = group_idf(n_docs, doc_freq, term_freq, max_features, min_df, max_df)
+
+    # L2 norm of every document's TF-IDF row under every resample's IDF (documents x resamples)
+    row_norms = np.sqrt(counts.multiply(counts) @ (idf ** 2).T)
+    row_norms[row_norms == 0] = 1
+    normalized_weights = sparse.csr_matrix(weights.multiply(1 / row_norms.T))
+
+    return (normalized_weights @ counts).toarray() * idf / n_docs[:, None]
+
+
+def _ranks(scores, columns):
+    # 1-based rank of scores[:, columns] within each row; ties share the best rank
+    ranks = np.empty((len(scores), len(columns)), dtype=int)
+    for r, row in enumerate(scores):
+        ranks[r] = len(row) - np.searchsorted(np.sort(row), row[columns], side='right') + 1
+    return ranks
+
+
+def bootstrap_group(counts, feature_names, n_words=number_idf_words, n_resamples=N_RESAMPLES,
+                    batch_size=BATCH_SIZE, confidence=CONFIDENCE, rng=None,
+                    max_features=None, min_df=1, max_df=1.0, doc_weights=None):
+    """``[WordStability, ...]`` for the top words of one group's ``counts``.
+
+    ``doc_weights`` scales how much each document counts, in the full group
+    and in every resample (see ``GroupTfidfEngine``).
+    """
+    rng = np.random.default_rng(rng)
+    vectorizer_options = dict(max_features=max_features, min_df=min_df, max_df=max_df)
+    n_docs = counts.shape[0]
+    doc_weights = np.ones(n_docs) if doc_weights is None else np.asarray(doc_weights, dtype=float)
+
+    # the document weights alone are the group itself
+    full_scores = resample_scores(counts, sparse.csr_matrix(doc_weights[None, :]), **vectorizer_options)[0]
+    top = top_display_features(feature_names, full_scores, n_words)
+    if not top:
+        return []
+    columns = np.array([i for i, _ in top])
+
+    top_scores = np.empty((n_resamples, len(columns)))
+    top_ranks = np.empty((n_resamples, len(columns)), dtype=int)
+    for start in range(0, n_resamples, batch_size):
+        weights = sparse.csr_matrix(resample_weights(rng, n_docs, min(batch_size, n_resamples - start))
+                                    .multiply(doc_weights[None, :]))
+        scores = resample_scores(counts, weights, **vectorizer_options)
+        top_scores[start:start + len(scores)] = scores[:, columns]
+        top_ranks[start:start + len(scores)] = _ranks(scores, columns)
+
+    tail = (1 - confidence) / 2 * 100
+    ci_low, ci_high = np.percentile(top_scores, [tail, 100 - tail], axis=0)
+    # a word pruned from a resample (score 0) is not in its top words
+    in_top = (top_ranks <= n_words) & (top_scores > 0)
+    return [
+        WordStability(word, float(full_scores[column]), float(ci_low[i]), float(ci_high[i]),
+                      float(in_top[:, i].mean()), float(np.median(top_ranks[:, i])))
+        for i, (column, word) in enumerate(top)
+    ]
+
+
+def bootstrap_stability(engine, labels, n_words=number_idf_words, n_resamples=N_RESAMPLES,
+                        batch_size=BATCH_SIZE, confidence=CONFIDENCE, seed=0):
+    """``{label: [WordStability, ...]}`` for one grouping column of a ``GroupTfidfEngine``.
+
+    ``labels`` is a Series aligned with the corpus index; groups with fewer
+    than two documents are left out, as in the regular analysis. The same
+    ``seed`` gives the same intervals whatever the ``batch_size``.
+    """
+    labels = pd.Series(labels).reindex(engine.index).where(engine.is_document)
+    codes, groups = pd.factorize(labels, sort=False)
+    rng = np.random.default_rng(seed)
+
+    stability = {}
+    for g, label in enumerate(groups):
+        rows = np.flatnonzero(codes == g)
+        if len(rows) < 2:
+            continue
+        counts = engine.counts[rows]
+        # only the terms the group uses, so the dense per-resample arrays stay small
+        columns = np.flatnonzero(counts.getnnz(axis=0))
+        stability[label] = bootstrap_group(
+            counts[:, columns], engine.vocabulary[columns], n_words, n_resamples, batch_size, confidence, rng,
+            max_features=engine.max_features, min_df=engine.min_df, max_df=engine.max_df,
+            doc_weights=None if engine.weights is None else engine.weights[rows],
+        )
+    return stability
+
+
+def print_stability(stability, heading, label, confidence=CONFIDENCE):
+    print("\n" + "=" * 60)
+    print(heading)
+    print("=" * 60)
+
+    for group, words in stability.items():
+        print(f"\n{label}: {group}")
+        print("-" * 40)
+        print(f"    {'word':<25} {'score':>7} {f'{confidence:.0%} CI':>17} {'in top':>7} {'rank':>5}")
+        for i, word in enumerate(words, 1):
+            print(f"{i:2d}. {word.word:<25} {word.score:7.4f} [{word.ci_low:.4f}, {word.ci_high:.4f}] "
+                  f"{word.top_n_rate:7.0%} {word.median_rank:5.0f}")
+
+    print("\n" + "=" * 60)
+
+
+def stability_frame(stability, grouping):
+    """One row per (group, word) of the ``grouping`` column, for saving as CSV."""
+    return pd.DataFrame(
+        [{'grouping': grouping, 'group': group, 'rank': i, **word._asdict()}
+         for group, words in stability.items() for i, word in enumerate(words, 1)],
+        columns=['grouping', 'group', 'rank', *WordStability._fields],
+    )
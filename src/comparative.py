@@ -0,0 +1,113 @@
+"""Distinctive terms per group from one shared term-count matrix.
+
+Per-group TF-IDF scores come from separate vocabularies and IDF vectors, so
+they rank words within a group but cannot be compared across groups. Here all
+groups share the corpus-wide count matrix of ``GroupTfidfEngine``, and a term
+is distinctive for a group when its log-odds in that group exceed its log-odds
+in the comparison group. The log-odds use an informative Dirichlet prior (the
+corpus-wide counts, scaled by ``prior_scale``), and dividing by their standard
+error gives a z-score (Monroe, Colaresi & Quinn 2008, "Fightin' Words").
+
+Every group is compared with the rest of the corpus, and all ordered pairs of
+groups are compared at once by broadcasting the per-group log-odds.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from tfidf import number_idf_words, top_display_features
+
+PRIOR_SCALE = 0.1  # prior pseudo-counts as a share of the corpus-wide counts
+REST = 'rest'
+
+TermComparison = namedtuple('TermComparison', ['word', 'z_score', 'log_odds', 'count', 'other_count'])
+
+
+def _log_odds(counts, prior):
+    # log-odds of every term in every row of counts, smoothed by the prior
+    totals = counts.sum(axis=-1, keepdims=True)
+    return np.log(counts + prior) - np.log(totals + prior.sum() - counts - prior)
+
+
+def log_odds_against_rest(counts, prior):
+    """Log-odds ratios and z-scores of each group (row of ``counts``) against all other groups."""
+    rest = counts.sum(axis=0) - counts
+    delta = _log_odds(counts, prior) - _log_odds(rest, prior)
+    variance = 1 / (counts + prior) + 1 / (rest + prior)
+    return delta, delta / np.sqrt(variance)
+
+
+def pairwise_log_odds(counts, prior):
+    """Log-odds ratios and z-scores of every group against every other (groups x groups x terms).
+
+    Entry ``[i, j]`` is positive for terms used more by group ``i`` than by ``j``.
+    """
+    log_odds = _log_odds(counts, prior)
+    inverse = 1 / (counts + prior)
+    delta = log_odds[:, None, :] - log_odds[None, :, :]
+    return delta, delta / np.sqrt(inverse[:, None, :] + inverse[None, :, :])
+
+
+def _top_terms(vocabulary, z_scores, delta, counts, other_counts, n_words):
+    return [
+        TermComparison(word, float(z_scores[i]), float(delta[i]), float(counts[i]), float(other_counts[i]))
+        for i, word in top_display_features(vocabulary, z_scores, n_words)
+    ]
+
+
+def compare_groups(engine, labels, n_words=number_idf_words, prior_scale=PRIOR_SCALE, pairs=True):
+    """Distinctive terms of one grouping column of a ``GroupTfidfEngine``.
+
+    Returns ``{(label, other): [TermComparison, ...]}`` with ``other`` either
+    ``REST`` or, with ``pairs``, every other label. Terms are ranked by
+    z-score, so the first ones are the most over-represented in ``label``.
+    """
+    _, groups, _, _, term_freq = engine._group_frequencies(labels)
+    if len(groups) == 0:
+        return {}
+    corpus_counts = (np.asarray(engine.counts.sum(axis=0)).ravel() if engine.weights is None
+                     else engine.counts.T @ engine.weights)
+    prior = prior_scale * corpus_counts
+
+    comparisons = {}
+    rest = term_freq.sum(axis=0) - term_freq
+    delta, z_scores = log_odds_against_rest(term_freq, prior)
+    for g, label in enumerate(groups):
+        comparisons[label, REST] = _top_terms(engine.vocabulary, z_scores[g], delta[g], term_freq[g], rest[g],
+                                              n_words)
+
+    if pairs:
+        delta, z_scores = pairwise_log_odds(term_freq, prior)
+        for g, label in enumerate(groups):
+            for h, other in enumerate(groups):
+                if g != h:
+                    comparisons[label, other] = _top_terms(engine.vocabulary, z_scores[g, h], delta[g, h],
+                                                           term_freq[g], term_freq[h], n_words)
+    return comparisons
+
+
+def print_comparisons(comparisons, heading, label):
+    print("\n" + "=" * 60)
+    print(heading)
+    print("=" * 60)
+
+    for (group, other), terms in comparisons.items():
+        print(f"\n{label}: {group} vs {other}")
+        print("-" * 40)
+        print(f"    {'word':<25} {'z':>7} {'log-odds':>9} {'count':>7} {'other':>7}")
+        for i, term in enumerate(terms, 1):
+            print(f"{i:2d}. {term.word:<25} {term.z_score:7.2f} {term.log_odds:9.3f} "
+                  f"{term.count:7.0f} {term.other_count:7.0f}")
+
+    print("\n" + "=" * 60)
+
+
+def comparison_frame(comparisons, grouping):
+    """One row per (group, comparison, word) of the ``grouping`` column, for saving as CSV."""
+    return pd.DataFrame(
+        [{'grouping': grouping, 'group': group, 'compared_with': other, 'rank': i, **term._asdict()}
+         for (group, other), terms in comparisons.items() for i, term in enumerate(terms, 1)],
+        columns=['grouping', 'group', 'compared_with', 'rank', *TermComparison._fields],
+    )
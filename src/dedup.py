@@ -0,0 +1,227 @@
+"""Near-duplicate article detection with MinHash signatures and LSH.
+
+Syndicated wire stories appear under many outlets. Each cleaned text is cut
+into word shingles, the shingles are hashed once with a fixed hash, and
+``num_perm`` multiply-shift hash functions turn every document into a MinHash
+signature (two signatures agree in a position with probability equal to the
+Jaccard similarity of the shingle sets). Signatures are computed in chunks of
+documents with numpy, so memory stays bounded. Documents of a
+``token_store.TokenStore`` are shingled on their stored token IDs instead.
+
+Locality-sensitive hashing then splits every signature into ``bands`` bands;
+documents sharing a band are candidates. Each candidate is checked against
+the first document of its bucket (estimated Jaccard similarity of at least
+``threshold``) and the accepted pairs are joined into clusters with
+connected components. There is no all-pairs comparison: the work is linear in
+the number of documents for a fixed number of bands.
+"""
+
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+NUM_PERM = 64
+BANDS = 16  # 4 signature rows per band
+SHINGLE_SIZE = 3
+SIMILARITY_THRESHOLD = 0.8
+SIGNATURE_CHUNK_SIZE = 10000  # documents hashed per numpy pass
+DEDUP_MODES = ('collapse', 'downweight')
+
+_SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+_NO_SHINGLES = np.iinfo(np.uint32).max
+
+
+def shingle_hashes(texts, shingle_size=SHINGLE_SIZE):
+    """64-bit hashes of the word shingles of ``texts`` and the number per text.
+
+    A text shorter than ``shingle_size`` words is one shingle; an empty text
+    has none.
+    """
+    tokens = [str(text).split() for text in texts]
+    lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+    n_tokens = int(lengths.sum())
+    if n_tokens == 0:
+        return np.zeros(0, dtype=np.uint64), np.zeros(len(tokens), dtype=np.int64)
+    token_hashes = pd.util.hash_array(np.fromiter(chain.from_iterable(tokens), dtype=object, count=n_tokens))
+    return token_shingle_hashes(token_hashes, lengths, shingle_size)
+
+
+def token_shingle_hashes(token_hashes, lengths, shingle_size=SHINGLE_SIZE):
+    """Shingle hashes from the uint64 hashes of all tokens, back to back, and the tokens per document."""
+    n_tokens = len(token_hashes)
+    if n_tokens == 0:
+        return np.zeros(0, dtype=np.uint64), np.zeros(len(lengths), dtype=np.int64)
+    positions = np.arange(n_tokens)
+    ends = np.repeat(np.cumsum(lengths), lengths)
+    hashes = np.zeros(n_tokens, dtype=np.uint64)
+    for offset in range(shingle_size):
+        # words past the end of their document count as 0
+        inside = positions + offset < ends
+        hashes = hashes * _SHINGLE_MULTIPLIER + np.where(
+            inside, token_hashes[np.minimum(positions + offset, n_tokens - 1)], np.uint64(0))
+
+    is_start = positions == np.repeat(np.cumsum(lengths) - lengths, lengths)
+    valid = (positions + shingle_size <= ends) | is_start
+    counts = np.where(lengths >= shingle_size, lengths - shingle_size + 1, (lengths > 0).astype(np.int64))
+    return hashes[valid], counts
+
+
+def _hash_functions(num_perm, seed):
+    rng = np.random.default_rng(seed)
+    multipliers = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    offsets = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+    return multipliers, offsets
+
+
+def minhash_signatures(texts, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=0,
+                       chunk_size=SIGNATURE_CHUNK_SIZE):
+    """(documents x num_perm) uint32 MinHash signatures; texts without words get all-max rows."""
+    texts = list(texts)
+    return _signatures(lambda start, stop: shingle_hashes(texts[start:stop], shingle_size),
+                       len(texts), num_perm, seed, chunk_size)
+
+
+def token_store_signatures(store, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=0,
+                           chunk_size=SIGNATURE_CHUNK_SIZE):
+    """MinHash signatures of the documents of a ``token_store.TokenStore``, read from its token IDs.
+
+    Tokens are hashed through the vocabulary, so a document gets the same
+    signature as its analysis tokens (stop words removed) joined into a text.
+    """
+    vocabulary_hashes = pd.util.hash_array(np.asarray(store.vocabulary, dtype=object))
+    lengths = np.diff(store.offsets)
+
+    def shingles(start, stop):
+        tokens = store.tokens[store.offsets[start]:store.offsets[stop]]
+        return token_shingle_hashes(vocabulary_hashes[tokens], lengths[start:stop], shingle_size)
+
+    return _signatures(shingles, len(store), num_perm, seed, chunk_size)
+
+
+def _signatures(shingles, n_docs, num_perm, seed, chunk_size):
+    # shingles(start, stop) gives the shingle hashes and counts of one chunk of documents
+    multipliers, offsets = _hash_functions(num_perm, seed)
+    signatures = np.full((n_docs, num_perm), _NO_SHINGLES, dtype=np.uint32)
+
+    for start in range(0, n_docs, chunk_size):
+        hashes, counts = shingles(start, min(start + chunk_size, n_docs))
+        has_shingles = counts > 0
+        if not has_shingles.any():
+            continue
+        first = (np.cumsum(counts) - counts)[has_shingles]
+        rows = start + np.flatnonzero(has_shingles)
+        for i in range(num_perm):
+            # multiply-shift hashing: the high 32 bits of a * x + b (mod 2^64)
+            permuted = ((hashes * multipliers[i] + offsets[i]) >> np.uint64(32)).astype(np.uint32)
+            signatures[rows, i] = np.minimum.reduceat(permuted, first)
+    return signatures
+
+
+def lsh_clusters(signatures, bands=BANDS, threshold=SIMILARITY_THRESHOLD):
+    """Cluster id per row of ``signatures``; rows without words stay singletons."""
+    n_docs, num_perm = signatures.shape
+    rows_per_band = num_perm // bands
+    candidates = np.flatnonzero((signatures != _NO_SHINGLES).any(axis=1))
+    band_multipliers, _ = _hash_functions(rows_per_band, seed=1)  # combine a band's rows into one key
+
+    sources, targets = [], []
+    for band in range(bands):
+        block = signatures[candidates, band * rows_per_band:(band + 1) * rows_per_band].astype(np.uint64)
+        keys = (block * band_multipliers).sum(axis=1)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        run_start = np.ones(len(order), dtype=bool)
+        run_start[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        # every bucket member is compared with the bucket's first document only
+        first = order[np.maximum.accumulate(np.where(run_start, np.arange(len(order)), 0))]
+        members = order[~run_start]
+        leaders = first[~run_start]
+        if not len(members):
+            continue
+        agreement = (signatures[candidates[members]] == signatures[candidates[leaders]]).mean(axis=1)
+        similar = agreement >= threshold
+        sources.append(candidates[members[similar]])
+        targets.append(candidates[leaders[similar]])
+
+    sources = np.concatenate(sources) if sources else np.zeros(0, dtype=np.int64)
+    targets = np.concatenate(targets) if targets else np.zeros(0, dtype=np.int64)
+    graph = sparse.csr_matrix((np.ones(len(sources)), (sources, targets)), shape=(n_docs, n_docs))
+    _, labels = connected_components(graph, directed=False)
+    return labels
+
+
+class NearDuplicates:
+    """Near-duplicate clusters of a Series of cleaned texts.
+
+    ``cluster`` is a cluster id per text, ``cluster_size`` the size of that
+    cluster, and ``is_representative`` marks the first text of every cluster
+    (singletons included), which is what ``collapse`` keeps.
+    """
+
+    def __init__(self, texts, num_perm=NUM_PERM, bands=BANDS, threshold=SIMILARITY_THRESHOLD,
+                 shingle_size=SHINGLE_SIZE, seed=0):
+        texts = texts if isinstance(texts, pd.Series) else pd.Series(list(texts))
+        self._set_clusters(texts.index, minhash_signatures(texts, num_perm, shingle_size, seed), bands, threshold)
+
+    @classmethod
+    def from_token_store(cls, store, num_perm=NUM_PERM, bands=BANDS, threshold=SIMILARITY_THRESHOLD,
+                         shingle_size=SHINGLE_SIZE, seed=0):
+        """Clusters of the documents of a ``token_store.TokenStore``, shingled on its token IDs."""
+        duplicates = cls.__new__(cls)
+        duplicates._set_clusters(store.index, token_store_signatures(store, num_perm, shingle_size, seed),
+                                 bands, threshold)
+        return duplicates
+
+    def _set_clusters(self, index, signatures, bands, threshold):
+        self.index = index
+        labels = lsh_clusters(signatures, bands, threshold)
+
+        _, first, inverse, sizes = np.unique(labels, return_index=True, return_inverse=True, return_counts=True)
+        self.cluster = inverse
+        self.cluster_size = sizes[inverse]
+        self.is_representative = np.zeros(len(labels), dtype=bool)
+        self.is_representative[first] = True
+
+    @property
+    def weights(self):
+        """1 / cluster size per text, so every cluster counts as one document."""
+        return 1 / self.cluster_size
+
+    def stats(self):
+        duplicated = self.cluster_size > 1
+        sizes = np.bincount(self.cluster)
+        return {
+            'documents': len(self.cluster),
+            'clusters': int((sizes > 1).sum()),
+            'clustered_documents': int(duplicated.sum()),
+            'redundant_documents': int((duplicated & ~self.is_representative).sum()),
+            'largest_cluster': int(sizes.max()) if len(sizes) else 0,
+            'size_histogram': {int(size): int(count) for size, count in
+                               zip(*np.unique(sizes[sizes > 1], return_counts=True))},
+        }
+
+    def cluster_frame(self, articles=None, columns=('source', 'publisher_leaning', 'title')):
+        """One row per clustered text, largest clusters first, with ``columns`` of ``articles``."""
+        frame = pd.DataFrame({'cluster': self.cluster, 'cluster_size': self.cluster_size,
+                              'is_representative': self.is_representative}, index=self.index)
+        if articles is not None:
+            frame = frame.join(articles[[column for column in columns if column in articles.columns]])
+        frame = frame[frame['cluster_size'] > 1]
+        return frame.sort_values(['cluster_size', 'cluster'], ascending=[False, True], kind='stable')
+
+
+def print_duplicate_report(duplicates, articles=None, n_clusters=5):
+    stats = duplicates.stats()
+    print(f"\nNear-duplicate clusters: {stats['clusters']} covering {stats['clustered_documents']} of "
+          f"{stats['documents']} articles ({stats['redundant_documents']} redundant, largest "
+          f"{stats['largest_cluster']})")
+    if stats['size_histogram']:
+        print("Cluster sizes: " + ', '.join(f"{size}: {count}" for size, count in stats['size_histogram'].items()))
+    frame = duplicates.cluster_frame(articles)
+    for cluster, members in list(frame.groupby('cluster', sort=False))[:n_clusters]:
+        sources = ', '.join(members['source'].astype(str).unique()) if 'source' in members else ''
+        title = members['title'].iloc[0] if 'title' in members else ''
+        print(f"  {len(members):>4} x {str(title)[:60]!r} ({sources})")
@@ -0,0 +1,203 @@
+"""One-fit TF-IDF for every group of every grouping column.
+
+The corpus is tokenized once into a document-term count matrix. Per-group
+document frequencies, IDF vectors and mean TF-IDF scores are then derived with
+sparse group-indicator products, reproducing what a separate ``TfidfVectorizer``
+fit per group (``get_top_tfidf_word``) would compute: per-group ``min_df``,
+``max_df`` and ``max_features`` pruning, smoothed IDF and L2-normalized rows.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+from tfidf import (
+    CUSTOM_STOP_WORDS,
+    MAX_DF,
+    MAX_FEATURES,
+    MIN_DF,
+    number_idf_words,
+    top_display_words,
+)
+
+GroupScores = namedtuple('GroupScores', ['n_documents', 'feature_names', 'mean_scores'])
+
+
+def _group_indicator(codes, n_groups, weights=None):
+    # (groups x documents) 0/1 (or document weight) matrix; documents with code -1 belong to no group
+    rows = np.flatnonzero(codes >= 0)
+    return sparse.csr_matrix(
+        (np.ones(len(rows)) if weights is None else weights[rows], (codes[rows], rows)),
+        shape=(n_groups, len(codes)),
+    )
+
+
+def kept_terms(n_docs, doc_freq, term_freq, max_features=MAX_FEATURES, min_df=MIN_DF, max_df=MAX_DF):
+    """Boolean mask of the terms a ``TfidfVectorizer`` fit on one group would keep."""
+    min_doc_count = min_df if isinstance(min_df, (int, np.integer)) else min_df * n_docs
+    max_doc_count = max_df if isinstance(max_df, (int, np.integer)) else max_df * n_docs
+    kept = (doc_freq >= min_doc_count) & (doc_freq <= max_doc_count)
+    if max_features is not None and kept.sum() > max_features:
+        candidates = np.flatnonzero(kept)
+        # the same default (unstable) argsort as sklearn's _limit_features, so ties at the cutoff break alike
+        best = candidates[(-term_freq[candidates]).argsort()[:max_features]]
+        kept = np.zeros_like(kept)
+        kept[best] = True
+    return kept
+
+
+def group_idf(n_docs, doc_freq, term_freq, max_features=MAX_FEATURES, min_df=MIN_DF, max_df=MAX_DF):
+    """Per-group smoothed IDF (groups x terms, 0 for pruned terms) and kept-term masks."""
+    idf = np.zeros(doc_freq.shape)
+    kept_masks = []
+    for g in range(len(n_docs)):
+        kept = kept_terms(n_docs[g], doc_freq[g], term_freq[g], max_features, min_df, max_df)
+        kept_masks.append(kept)
+        # smooth_idf: ln((1 + n) / (1 + df)) + 1
+        idf[g, kept] = np.log((1 + n_docs[g]) / (1 + doc_freq[g, kept])) + 1
+    return idf, kept_masks
+
+
+def group_vocabulary_sizes(n_docs, doc_freq, term_freq, max_features=MAX_FEATURES, min_df=MIN_DF, max_df=MAX_DF):
+    """Per group: (documents, distinct terms, terms kept after pruning)."""
+    return [
+        (int(round(n_docs[g])), int((doc_freq[g] > 0).sum()),
+         int(kept_terms(n_docs[g], doc_freq[g], term_freq[g], max_features, min_df, max_df).sum()))
+        for g in range(len(n_docs))
+    ]
+
+
+def group_tfidf_sums(counts, codes, idf, weights=None):
+    """Sum of L2-normalized TF-IDF rows per group (groups x terms).
+
+    Each document is weighted by the IDF of its own group (``codes``, -1 for
+    no group) and, if given, by its entry in ``weights``; dividing by the
+    group sizes (or weight sums) gives the mean TF-IDF.
+    """
+    n_groups = idf.shape[0]
+    weighted = counts.tocoo()
+    doc_codes = codes[weighted.row]
+    in_group = doc_codes >= 0
+    data = np.zeros(weighted.nnz)
+    data[in_group] = weighted.data[in_group] * idf[doc_codes[in_group], weighted.col[in_group]]
+    weighted = sparse.csr_matrix((data, (weighted.row, weighted.col)), shape=counts.shape)
+
+    row_norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+    row_norms[row_norms == 0] = 1
+    weighted = sparse.diags(1 / row_norms) @ weighted
+
+    return (_group_indicator(codes, n_groups, weights) @ weighted).toarray()
+
+
+class GroupTfidfEngine:
+    """Tokenize once, then score any number of groupings of the same documents.
+
+    ``weights`` (one per text, e.g. ``dedup.NearDuplicates.weights``) makes a
+    document count that much towards its group's document count, document
+    frequencies and mean scores; by default every document counts once.
+    """
+
+    def __init__(self, texts, max_features=MAX_FEATURES, min_df=MIN_DF, max_df=MAX_DF,
+                 stop_words=CUSTOM_STOP_WORDS, weights=None):
+        texts = texts if isinstance(texts, pd.Series) else pd.Series(list(texts))
+        # blank texts never reach a per-group vectorizer, so they are not documents
+        is_document = (texts.str.strip() != '').to_numpy()
+
+        vectorizer = CountVectorizer(stop_words=sorted(stop_words))
+        counts = vectorizer.fit_transform(texts.where(is_document, ''))
+        self._set_counts(counts, vectorizer.get_feature_names_out(), texts.index, is_document,
+                         max_features, min_df, max_df, weights)
+
+    def _set_counts(self, counts, vocabulary, index, is_document, max_features, min_df, max_df, weights):
+        self.max_features = max_features
+        self.min_df = min_df
+        self.max_df = max_df
+        self.weights = None if weights is None else np.asarray(weights, dtype=float)
+        self.index = index
+        self.is_document = np.asarray(is_document, dtype=bool)
+        self.counts = counts.tocsr()
+        self.vocabulary = np.asarray(vocabulary, dtype=object)
+
+        self.presence = self.counts.copy()
+        self.presence.data[:] = 1
+
+    @classmethod
+    def from_counts(cls, counts, vocabulary, index, is_document, max_features=MAX_FEATURES, min_df=MIN_DF,
+                    max_df=MAX_DF, weights=None):
+        """Engine over an existing (documents x vocabulary) count matrix, without tokenizing."""
+        engine = cls.__new__(cls)
+        engine._set_counts(counts, vocabulary, index, is_document, max_features, min_df, max_df, weights)
+        return engine
+
+    @classmethod
+    def from_corpus(cls, corpus, **kwargs):
+        return cls(corpus.texts, **kwargs)
+
+    @classmethod
+    def from_token_store(cls, store, rows=None, **kwargs):
+        """Engine over a ``token_store.TokenStore``, optionally restricted to a boolean ``rows`` mask."""
+        counts, index, is_document = store.counts(), store.index, np.asarray(store.is_document)
+        if rows is not None:
+            rows = np.asarray(rows, dtype=bool)
+            counts, index, is_document = counts[rows], index[rows], is_document[rows]
+        # terms that only occur in dropped rows are not part of the vocabulary, as in a fresh fit
+        used = np.flatnonzero(np.bincount(counts.indices, minlength=counts.shape[1]))
+        if len(used) < counts.shape[1]:
+            counts, vocabulary = counts[:, used], store.vocabulary[used]
+        else:
+            vocabulary = store.vocabulary
+        return cls.from_counts(counts, vocabulary, index, is_document, **kwargs)
+
+    def _group_frequencies(self, labels):
+        # codes, groups and per-group document count / document frequency / term frequency
+        labels = pd.Series(labels).reindex(self.index)
+        labels = labels.where(self.is_document)
+        codes, groups = pd.factorize(labels, sort=False)
+        indicator = _group_indicator(codes, len(groups), self.weights)
+        n_docs = np.asarray(indicator.sum(axis=1)).ravel()
+        doc_freq = (indicator @ self.presence).toarray()
+        term_freq = (indicator @ self.counts).toarray()
+        return codes, groups, n_docs, doc_freq, term_freq
+
+    def vocabulary_sizes(self, labels):
+        """``{label: (n_documents, n_terms, n_features)}`` without computing any scores."""
+        _, groups, n_docs, doc_freq, term_freq = self._group_frequencies(labels)
+        sizes = group_vocabulary_sizes(n_docs, doc_freq, term_freq, self.max_features, self.min_df, self.max_df)
+        return dict(zip(groups, sizes))
+
+    def score_groups(self, labels):
+        """Per-group TF-IDF for one grouping column.
+
+        ``labels`` is a Series aligned with the corpus index (missing labels
+        are ignored). Returns ``{label: GroupScores}`` for every label with at
+        least one non-blank document; ``feature_names`` is empty when pruning
+        leaves no terms.
+        """
+        codes, groups, n_docs, doc_freq, term_freq = self._group_frequencies(labels)
+        if len(groups) == 0:
+            return {}
+
+        idf, kept_masks = group_idf(
+            n_docs, doc_freq, term_freq, self.max_features, self.min_df, self.max_df
+        )
+        mean_scores = group_tfidf_sums(self.counts, codes, idf, self.weights) / n_docs[:, None]
+
+        results = {}
+        for g, label in enumerate(groups):
+            kept = kept_masks[g]
+            results[label] = GroupScores(
+                n_documents=int(round(n_docs[g])),
+                feature_names=self.vocabulary[kept],
+                mean_scores=mean_scores[g, kept],
+            )
+        return results
+
+    def top_words(self, labels, n_words=number_idf_words):
+        """``{label: (n_documents, [(display_word, score), ...])}`` for one grouping column."""
+        return {
+            label: (scores.n_documents, top_display_words(scores.feature_names, scores.mean_scores, n_words))
+            for label, scores in self.score_groups(labels).items()
+        }
@@ -0,0 +1,223 @@
+"""Incremental TF-IDF model with persisted document-frequency state.
+
+The model keeps, on disk, everything ``get_top_tfidf_word`` needs for every
+group of every grouping column: the vocabulary, per-group document counts,
+document frequencies and term sums, plus each merged article's sparse term
+counts (needed because row normalization depends on the final IDF). New
+articles are cleaned and tokenized once and merged with ``update``; articles
+that were already merged are recognized by a content hash and skipped, so
+feeding the full daily file only adds the new rows. Identical rows are kept
+apart by counting: the k-th copy of an article is merged once, on the first
+batch that contains k copies. Rankings after any sequence of updates are the
+same as a full refit over all rows.
+
+The frequency arrays and seen hashes of each save go to new files named by a
+generation number, and ``state.json``, replaced atomically, names the files
+that belong to it; a crash during ``save`` leaves the previous state intact.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from tfidf import (
+    ARTICLE_COLUMNS,
+    CUSTOM_STOP_WORDS,
+    MAX_DF,
+    MAX_FEATURES,
+    MIN_DF,
+    clean_texts,
+    group_political_leaning,
+    normalizer_fingerprint,
+    number_idf_words,
+)
+from streaming import StreamingGroupTfidf, _grow
+from data_io import find_table, read_table
+
+DEFAULT_MODEL_DIR = os.path.join('.cache', 'tfidf_model')
+DEFAULT_GROUP_COLUMNS = ('Categories', 'grouped_leaning', 'source')
+STATE_FILE = 'state.json'
+FREQUENCIES_FILE = 'frequencies_{:06d}.npz'  # formatted with the save generation
+SEEN_FILE = 'seen_{:06d}.npy'
+
+
+def article_hashes(articles):
+    """64-bit content hash per article (title, body and source)."""
+    hashes = np.empty(len(articles), dtype=np.uint64)
+    columns = [column for column in ('title', 'body', 'source') if column in articles.columns]
+    for i, row in enumerate(articles[columns].itertuples(index=False, name=None)):
+        digest = hashlib.blake2b(digest_size=8)
+        for value in row:
+            digest.update(b'\0' if pd.isna(value) else str(value).encode('utf-8'))
+            digest.update(b'\x1f')
+        hashes[i] = int.from_bytes(digest.digest(), 'little')
+    return hashes
+
+
+class IncrementalTfidfModel(StreamingGroupTfidf):
+    """Per-group TF-IDF state persisted in ``path`` and updated in place."""
+
+    def __init__(self, path=DEFAULT_MODEL_DIR, group_columns=DEFAULT_GROUP_COLUMNS, use_ner=False,
+                 max_features=MAX_FEATURES, min_df=MIN_DF, max_df=MAX_DF, stop_words=CUSTOM_STOP_WORDS):
+        if not os.path.exists(path):
+            os.makedirs(path)
+        super().__init__(group_columns, max_features=max_features, min_df=min_df, max_df=max_df,
+                         stop_words=stop_words, spill_dir=path)
+        self.path = path
+        self.use_ner = use_ner
+        self.stop_words = sorted(stop_words)
+        self.fingerprint = normalizer_fingerprint(use_ner)
+        self._seen = np.zeros(0, dtype=np.uint64)  # one hash per merged article, duplicates repeated
+        self._generation = 0
+
+    @classmethod
+    def open(cls, path=DEFAULT_MODEL_DIR, **kwargs):
+        """Load the model saved in ``path``, or start an empty one there."""
+        if os.path.exists(os.path.join(path, STATE_FILE)):
+            return cls.load(path)
+        return cls(path, **kwargs)
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL_DIR):
+        with open(os.path.join(path, STATE_FILE), encoding='utf-8') as f:
+            state = json.load(f)
+
+        model = cls(path, group_columns=state['group_columns'], use_ner=state['use_ner'],
+                    max_features=state['max_features'], min_df=state['min_df'], max_df=state['max_df'],
+                    stop_words=state['stop_words'])
+        if model.fingerprint != state['fingerprint']:
+            raise ValueError(
+                f"Model in {path} was built with a different normalizer; rebuild it from the full dataset."
+            )
+
+        model._vocabulary = {term: i for i, term in enumerate(state['vocabulary'])}
+        model._labels = {column: {label: i for i, label in enumerate(labels)}
+                         for column, labels in state['labels'].items()}
+        model._spills = [os.path.join(path, name) for name in state['chunks']]
+        model.n_documents = state['n_documents']
+
+        # models saved before generations were introduced use generation -1, the unnumbered files
+        model._generation = state.get('generation', -1)
+        frequencies = np.load(os.path.join(path, model._file(FREQUENCIES_FILE)))
+        for j, column in enumerate(model.group_columns):
+            model._n_docs[column] = frequencies[f'n_docs_{j}']
+            model._doc_freq[column] = frequencies[f'doc_freq_{j}']
+            model._term_freq[column] = frequencies[f'term_freq_{j}']
+        model._seen = np.load(os.path.join(path, model._file(SEEN_FILE)))
+        return model
+
+    def _file(self, pattern, generation=None):
+        generation = self._generation if generation is None else generation
+        return pattern.format(generation) if generation >= 0 else pattern.replace('_{:06d}', '')
+
+    def save(self):
+        n_terms = len(self._vocabulary)
+        arrays = {}
+        for j, column in enumerate(self.group_columns):
+            n_groups = len(self._labels[column])
+            arrays[f'n_docs_{j}'] = _grow(self._n_docs[column], (n_groups,))
+            arrays[f'doc_freq_{j}'] = _grow(self._doc_freq[column], (n_groups, n_terms))
+            arrays[f'term_freq_{j}'] = _grow(self._term_freq[column], (n_groups, n_terms))
+        # new files for every save, so the ones the current state.json names are never touched
+        previous, generation = self._generation, self._generation + 1
+        np.savez(os.path.join(self.path, self._file(FREQUENCIES_FILE, generation)), **arrays)
+        np.save(os.path.join(self.path, self._file(SEEN_FILE, generation)), self._seen)
+
+        state = {
+            'group_columns': self.group_columns,
+            'use_ner': self.use_ner,
+            'fingerprint': self.fingerprint,
+            'max_features': self.max_features,
+            'min_df': self.min_df,
+            'max_df': self.max_df,
+            'stop_words': self.stop_words,
+            'vocabulary': list(self._vocabulary),
+            'labels': {column: list(labels) for column, labels in self._labels.items()},
+            'chunks': [os.path.basename(spill) for spill in self._spills],
+            'n_documents': self.n_documents,
+            'generation': generation,
+        }
+        # state.json is written last and replaced atomically, so it only ever
+        # points at chunk and frequency files that are already on disk
+        temp_file = os.path.join(self.path, STATE_FILE + '.tmp')
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(temp_file, os.path.join(self.path, STATE_FILE))
+        self._generation = generation
+        for name in (self._file(FREQUENCIES_FILE, previous), self._file(SEEN_FILE, previous)):
+            if os.path.exists(os.path.join(self.path, name)):
+                os.remove(os.path.join(self.path, name))
+
+    def update(self, new_articles, cache=None, workers=1):
+        """Merge the rows of ``new_articles`` that are not in the model yet.
+
+        A row is new when the model has fewer copies of it than the batch has
+        up to and including that row, so identical articles count as often as
+        they occur, as in a full refit. Returns the number of articles merged.
+        Call ``save`` to persist.
+        """
+        hashes = article_hashes(new_articles)
+        # occurrence number of each row among the rows of the batch with the same hash
+        order = np.argsort(hashes, kind='stable')
+        _, first, inverse = np.unique(hashes[order], return_index=True, return_inverse=True)
+        occurrence = np.empty(len(hashes), dtype=np.int64)
+        occurrence[order] = np.arange(len(hashes)) - first[inverse]
+
+        # copies of each row merged by earlier updates
+        seen, seen_counts = np.unique(self._seen, return_counts=True)
+        found = np.minimum(np.searchsorted(seen, hashes), max(len(seen) - 1, 0))
+        merged_before = np.zeros(len(hashes), dtype=np.int64)
+        if len(seen):
+            known = seen[found] == hashes
+            merged_before[known] = seen_counts[found[known]]
+        is_new = occurrence >= merged_before
+        articles = new_articles[is_new]
+        if articles.empty:
+            return 0
+
+        options = dict(use_ner=self.use_ner, cache=cache, workers=workers)
+        texts = clean_texts(articles['title'], **options) + ' ' + clean_texts(articles['body'], **options)
+
+        labels = articles.reindex(columns=[c for c in self.group_columns if c != 'grouped_leaning'])
+        if 'grouped_leaning' in self.group_columns:
+            leaning = articles['publisher_leaning'] if 'publisher_leaning' in articles.columns else None
+            labels['grouped_leaning'] = (
+                leaning.astype(object).apply(group_political_leaning) if leaning is not None else pd.NA
+            )
+
+        self.partial_fit(texts, labels)
+        self._seen = np.concatenate([self._seen, hashes[is_new]])
+        return len(articles)
+
+    def close(self):
+        pass  # the chunk files are the persisted state
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge new articles into the saved TF-IDF model and print its top words.")
+    parser.add_argument('data_file', nargs='?', help="annotated dataset (default: data_annotated_with_leaning.*)")
+    parser.add_argument('model_dir', nargs='?', default=DEFAULT_MODEL_DIR,
+                        help=f"directory of the saved model (default: {DEFAULT_MODEL_DIR})")
+    args = parser.parse_args()
+
+    data_file = args.data_file or find_table('data_annotated_with_leaning') or 'data_annotated_with_leaning.csv'
+    if not os.path.exists(data_file):
+        parser.error(f"data file not found: {data_file}")
+    model_dir = args.model_dir
+
+    model = IncrementalTfidfModel.open(model_dir)
+    merged = model.update(read_table(data_file, columns=ARTICLE_COLUMNS))
+    model.save()
+    print(f"Merged {merged} new articles into {model_dir} ({model.n_documents} documents in total)")
+
+    for column in ('Categories', 'grouped_leaning'):
+        for label, (n_documents, top_words) in model.top_words(column, number_idf_words).items():
+            if n_documents < 2:
+                continue
+            print(f"\n{column}: {label} ({n_documents} documents)")
+            for i, (word, score) in enumerate(top_words, 1):
+                print(f"{i:2d}. {word:<25} {score:.4f}")
@@ -0,0 +1,166 @@
+"""Wall time, CPU time and peak memory of a block of code.
+
+``Measurement`` is a context manager: a background thread samples the resident
+set size while the block runs, so the peak includes memory allocated by numpy,
+scipy and spaCy, not only Python objects. Without psutil the peak falls back
+to the process-wide high-water mark reported by ``resource``.
+
+``PipelineProfiler`` measures the named stages of a run, records per-group
+vocabulary sizes and writes both as a JSON and CSV report; one stage can also
+be run under cProfile.
+"""
+
+import cProfile
+import csv
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+# psutil import - optional
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+RSS_SAMPLE_INTERVAL = 0.01  # seconds between RSS samples
+MB = 1024 * 1024
+
+
+def current_rss():
+    """Resident set size in bytes (the peak so far when psutil is missing)."""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # KiB on Linux
+
+
+class Measurement:
+    """Time and memory of a ``with`` block; read the attributes after it exits."""
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.wall_s = self.cpu_s = 0.0
+        self.start_rss = self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, current_rss())
+
+    def __enter__(self):
+        self.start_rss = self.peak_rss = current_rss()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.wall_s = time.perf_counter() - self._wall
+        self.cpu_s = time.process_time() - self._cpu
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, current_rss())
+
+    def as_dict(self):
+        return {
+            'wall_s': round(self.wall_s, 6),
+            'cpu_s': round(self.cpu_s, 6),
+            'peak_rss_mb': round(self.peak_rss / MB, 2),
+            'rss_growth_mb': round((self.peak_rss - self.start_rss) / MB, 2),
+        }
+
+
+class PipelineProfiler:
+    """Per-stage measurements of one pipeline run.
+
+    Wrap each stage in ``with profiler.stage(name, n_documents):``; the
+    yielded dict can be updated inside the block (e.g. with the document count
+    once it is known). When ``profile_stage`` names a stage, that stage also
+    runs under cProfile and its stats are written to ``report_dir``.
+    """
+
+    def __init__(self, report_dir='Visualizations', profile_stage=None, top_functions=20):
+        self.report_dir = report_dir
+        self.profile_stage = profile_stage
+        self.top_functions = top_functions
+        self.stages = []
+        self.groups = []
+        self.profile_path = None
+
+    @contextmanager
+    def stage(self, name, n_documents=None):
+        record = {'stage': name, 'n_documents': n_documents}
+        profiler = cProfile.Profile() if name == self.profile_stage else None
+        try:
+            with Measurement() as measurement:
+                if profiler is not None:
+                    profiler.enable()
+                try:
+                    yield record
+                finally:
+                    if profiler is not None:
+                        profiler.disable()
+        finally:
+            self._add(record, measurement.as_dict())
+            if profiler is not None:
+                self._save_profile(name, profiler)
+
+    def record_stage(self, name, measured, n_documents=None):
+        """Add a stage measured elsewhere, e.g. in a worker process; ``measured`` is ``Measurement.as_dict()``."""
+        self._add({'stage': name, 'n_documents': n_documents}, measured)
+
+    def _add(self, record, measured):
+        record.update(measured)
+        n_documents = record['n_documents']
+        record['docs_per_s'] = (round(n_documents / record['wall_s'], 2)
+                                if n_documents and record['wall_s'] else None)
+        self.stages.append(record)
+
+    def _save_profile(self, name, profiler):
+        os.makedirs(self.report_dir, exist_ok=True)
+        self.profile_path = os.path.join(self.report_dir, f'profile_{name}.prof')
+        profiler.dump_stats(self.profile_path)
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(self.top_functions)
+        print(f"\ncProfile of stage '{name}' saved as '{self.profile_path}'")
+        print(summary.getvalue())
+
+    def record_groups(self, column, sizes):
+        """Add ``{label: (n_documents, n_terms, n_features)}`` for one grouping column."""
+        for label, (n_documents, n_terms, n_features) in sizes.items():
+            self.groups.append({'column': column, 'group': str(label), 'n_documents': n_documents,
+                                'n_terms': n_terms, 'n_features': n_features})
+
+    def print_summary(self):
+        print(f"\n{'stage':<24} {'wall s':>9} {'cpu s':>9} {'peak MB':>9} {'docs/s':>10}")
+        for record in self.stages:
+            docs_per_s = '' if record['docs_per_s'] is None else f"{record['docs_per_s']:.0f}"
+            print(f"{record['stage']:<24} {record['wall_s']:>9.3f} {record['cpu_s']:>9.3f} "
+                  f"{record['peak_rss_mb']:>9.1f} {docs_per_s:>10}")
+
+    def save(self, name='pipeline_profile', metadata=None):
+        """Write ``<name>.json`` (stages, groups, metadata) and ``<name>.csv`` (stages); returns the JSON path."""
+        os.makedirs(self.report_dir, exist_ok=True)
+        json_path = os.path.join(self.report_dir, name + '.json')
+        report = {
+            'metadata': dict(metadata or {}, timestamp=time.strftime('%Y-%m-%dT%H:%M:%S'),
+                             profiled_stage=self.profile_stage, profile_file=self.profile_path),
+            'stages': self.stages,
+            'groups': self.groups,
+        }
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+        fieldnames = ['stage', 'n_documents', 'wall_s', 'cpu_s', 'peak_rss_mb', 'rss_growth_mb', 'docs_per_s']
+        with open(os.path.join(self.report_dir, name + '.csv'), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(self.stages)
+        return json_path
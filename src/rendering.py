@@ -0,0 +1,123 @@
+"""Parallel, skip-if-unchanged rendering of the result figures.
+
+Each figure is fingerprinted from its results and rendering settings (kind,
+DPI, format, normalization backend). The fingerprints of the last rendered
+figures are kept in ``Visualizations/.render_fingerprints.json``, and a figure
+whose fingerprint and file are unchanged is not drawn again. The remaining
+figures are drawn in worker processes with matplotlib's Agg backend.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from profiling import Measurement
+from tfidf import (
+    FIGURE_DPI,
+    _pyplot,
+    create_leaning_visualization,
+    create_visualizations,
+    figure_path,
+)
+
+RENDER_VERSION = 1  # bump when the figure layout changes, to re-render everything
+FINGERPRINT_FILE = os.path.join('Visualizations', '.render_fingerprints.json')
+FIGURES = {'categories': create_visualizations, 'leaning': create_leaning_visualization}
+
+
+def figure_fingerprint(kind, results, use_ner=False, dpi=FIGURE_DPI, fmt='png'):
+    """Hash of everything that determines how a figure looks."""
+    basis = {
+        'kind': kind,
+        # group order decides the subplot layout, so it is part of the fingerprint
+        'results': [[str(group), [[str(word), float(score)] for word, score in top_words]]
+                    for group, top_words in results.items()],
+        'use_ner': bool(use_ner),
+        'dpi': dpi,
+        'format': fmt,
+        'version': RENDER_VERSION,
+    }
+    return hashlib.sha256(json.dumps(basis).encode('utf-8')).hexdigest()[:16]
+
+
+def _load_fingerprints(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_fingerprints(path, fingerprints):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(fingerprints, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def _render(kind, results, use_ner, dpi, fmt, filename):
+    # worker entry point - must stay a module-level function to be picklable;
+    # returns the figure's own time and memory, measured where it is drawn
+    with Measurement() as measurement:
+        FIGURES[kind](results, use_ner=use_ner, dpi=dpi, fmt=fmt, filename=filename)
+    return measurement.as_dict()
+
+
+def render_figures(figures, use_ner=False, dpi=FIGURE_DPI, fmt='png', workers=None, force=False,
+                   fingerprint_file=FINGERPRINT_FILE, profiler=None):
+    """Render ``{kind: results}`` (kinds: ``'categories'``, ``'leaning'``).
+
+    Figures whose results and settings match the last render are skipped
+    unless ``force`` is set. The rest are drawn in up to ``workers`` processes
+    (default: one per CPU); with one worker they are drawn in this process.
+    With a ``profiling.PipelineProfiler``, every drawn figure is recorded as a
+    ``visualize_<kind>`` stage. Returns
+    ``{kind: 'rendered' | 'unchanged' | 'empty' | 'failed'}``.
+    """
+    fingerprints = _load_fingerprints(fingerprint_file)
+    status = {}
+    jobs = []
+    for kind, results in figures.items():
+        if not results:
+            FIGURES[kind](results)  # prints why there is nothing to draw
+            status[kind] = 'empty'
+            continue
+        filename = figure_path(kind, use_ner, fmt)
+        fingerprint = figure_fingerprint(kind, results, use_ner, dpi, fmt)
+        if not force and fingerprints.get(filename) == fingerprint and os.path.exists(filename):
+            print(f"'{filename}' is up to date, not re-rendered")
+            status[kind] = 'unchanged'
+            continue
+        jobs.append((kind, results, filename, fingerprint))
+
+    workers = min(len(jobs), workers or os.cpu_count() or 1)
+    if workers <= 1:
+        outcomes = []
+        for kind, results, filename, _ in jobs:
+            try:
+                outcomes.append(_render(kind, results, use_ner, dpi, fmt, filename))
+            except Exception as e:
+                outcomes.append(e)
+    else:
+        _pyplot()  # imported once here, so forked workers start with matplotlib loaded
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_render, kind, results, use_ner, dpi, fmt, filename)
+                       for kind, results, filename, _ in jobs]
+            outcomes = [future.exception() or future.result() for future in futures]
+
+    for (kind, _, filename, fingerprint), outcome in zip(jobs, outcomes):
+        if isinstance(outcome, Exception):
+            print(f"Error creating {kind} visualization: {outcome}")
+            fingerprints.pop(filename, None)
+            status[kind] = 'failed'
+        else:
+            fingerprints[filename] = fingerprint
+            status[kind] = 'rendered'
+            if profiler is not None:
+                profiler.record_stage(f'visualize_{kind}', outcome)
+
+    if jobs:
+        _save_fingerprints(fingerprint_file, fingerprints)
+    return status
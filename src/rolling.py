@@ -0,0 +1,217 @@
+"""Rolling time-window TF-IDF over an article date column.
+
+The articles are cleaned and tokenized once (``GroupTfidfEngine``) and sorted
+by date, so every window is a contiguous block of rows. Per-group document
+counts, document frequencies and term sums are kept for the current window
+and, as it moves, only the rows entering and leaving at its edges are added
+or subtracted. Mean TF-IDF still needs the window's own IDF for the row
+normalization, so scoring a window reads that window's rows once; daily
+windows of a fixed length therefore cost time linear in the number of
+articles. Each window's top words are the same as a separate fit on the
+articles in it.
+
+Usage:
+    python src/rolling.py [data_file] [--date-column date] [--window 7D] [--step 1D]
+    python src/tfidf.py [data_file] --window 7D [--window-step 1D] [--date-column date]
+"""
+
+import argparse
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from tfidf import (
+    ARTICLE_COLUMNS,
+    PreparedCorpus,
+    group_political_leaning,
+    number_idf_words,
+    top_display_words,
+)
+from group_tfidf import GroupTfidfEngine, _group_indicator, group_idf, group_tfidf_sums
+from data_io import find_table, read_table
+
+DATE_COLUMN = 'date'
+WINDOW = '7D'
+STEP = '1D'
+DEFAULT_GROUP_COLUMNS = ('Categories', 'grouped_leaning')
+
+WindowTopWords = namedtuple('WindowTopWords', ['start', 'end', 'n_documents', 'top_words'])
+
+
+def group_labels(df, group_columns=DEFAULT_GROUP_COLUMNS):
+    """The grouping columns of ``df`` present in it; ``grouped_leaning`` is derived from ``publisher_leaning``."""
+    labels = pd.DataFrame(index=df.index)
+    for column in group_columns:
+        if column == 'grouped_leaning' and 'publisher_leaning' in df.columns:
+            labels[column] = df['publisher_leaning'].astype(object).apply(group_political_leaning)
+        elif column in df.columns:
+            labels[column] = df[column]
+    return labels
+
+
+class RollingGroupTfidf:
+    """Per-group top words in date windows, updated at the window edges.
+
+    ``labels`` holds the grouping columns, aligned with the engine's corpus
+    index; ``dates`` is aligned the same way (rows without a date are left
+    out of every window).
+    """
+
+    def __init__(self, engine, dates, labels):
+        self.engine = engine
+        self.group_columns = list(labels.columns)
+
+        dates = pd.to_datetime(pd.Series(dates).reindex(engine.index), errors='coerce')
+        if dates.dt.tz is not None:
+            dates = dates.dt.tz_convert(None)  # windows are compared as naive UTC times
+        dated = np.flatnonzero(dates.notna().to_numpy())
+        order = dated[np.argsort(dates.to_numpy()[dated], kind='stable')]
+        self.dates = dates.to_numpy()[order]
+        self.counts = engine.counts[order]
+        self.presence = engine.presence[order]
+
+        self.codes = np.empty((len(order), len(self.group_columns)), dtype=np.int64)
+        self.groups = {}
+        for j, column in enumerate(self.group_columns):
+            column_labels = labels[column].reindex(engine.index).where(engine.is_document)
+            codes, groups = pd.factorize(column_labels, sort=False)
+            self.codes[:, j] = codes[order]
+            self.groups[column] = groups
+        self._reset(0)
+
+    @classmethod
+    def from_articles(cls, df, date_column=DATE_COLUMN, group_columns=DEFAULT_GROUP_COLUMNS, corpus=None,
+                      use_ner=False, cache=None, workers=1, **vectorizer_options):
+        """Clean and tokenize ``df`` once; ``grouped_leaning`` is derived from ``publisher_leaning``."""
+        if corpus is None:
+            corpus = PreparedCorpus(df, use_ner=use_ner, cache=cache, workers=workers)
+        return cls(GroupTfidfEngine.from_corpus(corpus, **vectorizer_options), df[date_column],
+                   group_labels(df, group_columns))
+
+    def _reset(self, row):
+        n_terms = self.counts.shape[1]
+        self._lo = self._hi = row
+        self._n_docs = {column: np.zeros(len(self.groups[column])) for column in self.group_columns}
+        self._doc_freq = {column: np.zeros((len(self.groups[column]), n_terms)) for column in self.group_columns}
+        self._term_freq = {column: np.zeros((len(self.groups[column]), n_terms)) for column in self.group_columns}
+
+    def _apply(self, lo, hi, sign):
+        # add (sign 1) or remove (sign -1) rows lo:hi of the date-sorted corpus
+        if hi <= lo:
+            return
+        counts, presence = self.counts[lo:hi], self.presence[lo:hi]
+        for j, column in enumerate(self.group_columns):
+            indicator = _group_indicator(self.codes[lo:hi, j], len(self.groups[column]))
+            self._n_docs[column] += sign * np.asarray(indicator.sum(axis=1)).ravel()
+            self._doc_freq[column] += sign * (indicator @ presence).toarray()
+            self._term_freq[column] += sign * (indicator @ counts).toarray()
+
+    def move_to(self, lo, hi):
+        """Make rows ``lo:hi`` the current window; windows may only move forward."""
+        if lo < self._lo or hi < self._hi:
+            raise ValueError("rolling windows must move forward in time")
+        if lo >= self._hi:
+            self._reset(lo)  # no overlap with the previous window
+        self._apply(self._lo, lo, -1)
+        self._apply(self._hi, hi, 1)
+        self._lo, self._hi = lo, hi
+
+    def window_top_words(self, column, n_words=number_idf_words):
+        """``{label: (n_documents, top_words)}`` of the current window; top_words is None below 2 documents."""
+        j = self.group_columns.index(column)
+        engine = self.engine
+        n_docs = self._n_docs[column]
+        idf, kept_masks = group_idf(n_docs, self._doc_freq[column], self._term_freq[column],
+                                    engine.max_features, engine.min_df, engine.max_df)
+        sums = group_tfidf_sums(self.counts[self._lo:self._hi], self.codes[self._lo:self._hi, j], idf)
+
+        top_words = {}
+        for g, label in enumerate(self.groups[column]):
+            if n_docs[g] == 0:
+                continue
+            kept = kept_masks[g]
+            words = (top_display_words(engine.vocabulary[kept], sums[g, kept] / n_docs[g], n_words)
+                     if n_docs[g] >= 2 else None)
+            top_words[label] = (int(n_docs[g]), words)
+        return top_words
+
+    def windows(self, window=WINDOW, step=STEP, start=None, end=None, n_words=number_idf_words):
+        """Yield ``WindowTopWords`` for windows ``[start, start + window)`` every ``step``.
+
+        ``start`` defaults to the midnight before the first article and
+        ``end`` to the last article's date; ``top_words`` maps each grouping
+        column to ``{label: (n_documents, top_words)}``.
+        """
+        if len(self.dates) == 0:
+            return
+        window, step = pd.Timedelta(window), pd.Timedelta(step)
+        start = pd.Timestamp(self.dates[0]).normalize() if start is None else pd.Timestamp(start)
+        end = pd.Timestamp(self.dates[-1]) if end is None else pd.Timestamp(end)
+
+        self._reset(0)
+        for window_start in pd.date_range(start, end, freq=step):
+            window_end = window_start + window
+            lo, hi = np.searchsorted(self.dates, [window_start.to_datetime64(), window_end.to_datetime64()])
+            self.move_to(int(lo), int(hi))
+            yield WindowTopWords(
+                window_start, window_end, int(hi - lo),
+                {column: self.window_top_words(column, n_words) for column in self.group_columns},
+            )
+
+
+def print_window(window):
+    """The window's article count and the three top words of every group."""
+    print(f"\n{window.start:%Y-%m-%d %H:%M} - {window.end:%Y-%m-%d %H:%M} ({window.n_documents} articles)")
+    for column, by_group in window.top_words.items():
+        for group, (n_documents, top_words) in by_group.items():
+            if top_words:
+                print(f"  {group:<24} {n_documents:>5}  {', '.join(word for word, _ in top_words[:3])}")
+
+
+def rolling_path(use_ner=False):
+    return os.path.join('Visualizations', f"tfidf_rolling_{'ner' if use_ner else 'manual'}.csv")
+
+
+def rolling_frame(windows):
+    """One row per (window, grouping, group, word), for saving as CSV."""
+    rows = []
+    for window in windows:
+        for column, by_group in window.top_words.items():
+            for group, (n_documents, top_words) in by_group.items():
+                for rank, (word, score) in enumerate(top_words or [], 1):
+                    rows.append({'window_start': window.start, 'window_end': window.end, 'grouping': column,
+                                 'group': group, 'n_documents': n_documents, 'rank': rank,
+                                 'word': word, 'score': score})
+    return pd.DataFrame(rows, columns=['window_start', 'window_end', 'grouping', 'group', 'n_documents',
+                                       'rank', 'word', 'score'])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Top TF-IDF words per group in rolling date windows.")
+    parser.add_argument('input', nargs='?', help="annotated dataset with a date column "
+                                                 "(default: data_annotated_with_leaning.*)")
+    parser.add_argument('--date-column', default=DATE_COLUMN, help=f"article date column (default: {DATE_COLUMN})")
+    parser.add_argument('--window', default=WINDOW, help=f"window length, e.g. 7D or 36h (default: {WINDOW})")
+    parser.add_argument('--step', default=STEP, help=f"distance between window starts (default: {STEP})")
+    parser.add_argument('--groupings', nargs='+', default=list(DEFAULT_GROUP_COLUMNS),
+                        choices=['Categories', 'grouped_leaning', 'source'], help="grouping columns")
+    parser.add_argument('--top-n', type=int, default=number_idf_words, help="top words per group and window")
+    parser.add_argument('--backend', choices=['manual', 'ner'], default='manual', help="entity normalization")
+    args = parser.parse_args()
+
+    data_file = args.input or find_table('data_annotated_with_leaning') or 'data_annotated_with_leaning.csv'
+    df = read_table(data_file, columns=list(ARTICLE_COLUMNS) + [args.date_column])
+    use_ner = args.backend == 'ner'
+    rolling = RollingGroupTfidf.from_articles(df, args.date_column, args.groupings, use_ner=use_ner)
+
+    windows = []
+    for window in rolling.windows(args.window, args.step, n_words=args.top_n):
+        windows.append(window)
+        print_window(window)
+
+    output_file = rolling_path(use_ner)
+    os.makedirs('Visualizations', exist_ok=True)
+    rolling_frame(windows).to_csv(output_file, index=False)
+    print(f"\nRolling window results saved as '{output_file}'")
@@ -0,0 +1,248 @@
+"""Inverted index over the tokenized corpus, with a small local HTTP endpoint.
+
+Every term of a ``token_store.TokenStore`` (entity tokens such as
+``williamson_entity`` included) maps to a postings list: the articles that
+contain it and their corpus-wide TF-IDF weights (smoothed IDF over all
+articles, L2-normalized rows, no pruning). Postings are sorted by weight once,
+so the top articles for a term are a slice of two arrays, and category,
+leaning or source filters are a comparison of small integer label codes over
+that slice.
+
+Queries go through ``clean_text`` with the same normalizer as the analysis,
+so ``williamson``, ``Williamson`` and ``Marianne Williamson`` all reach the
+``williamson_entity`` postings; a query with several terms adds up their
+weights.
+
+Usage:
+    python src/search_index.py [data_file] --query williamson --category "Corruption & Scandal"
+    python src/search_index.py [data_file] --port 8765
+    curl 'http://127.0.0.1:8765/search?term=williamson&leaning=Left&n=5'
+"""
+
+import argparse
+import json
+import time
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from tfidf import (
+    ARTICLE_COLUMNS,
+    PreparedCorpus,
+    clean_text,
+    custom_stop_words,
+    group_political_leaning,
+    number_idf_words,
+)
+from token_store import LABEL_COLUMNS, TokenStore, store_dir, store_key
+from data_io import find_table, read_table
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# query filter -> label column it is matched against
+FILTERS = {'category': 'Categories', 'leaning': 'grouped_leaning', 'source': 'source'}
+
+Hit = namedtuple('Hit', ['article', 'score', 'category', 'leaning', 'source', 'title'])
+
+
+class InvertedIndex:
+    """Term -> (article, TF-IDF weight) postings over the articles of a ``TokenStore``.
+
+    ``titles`` (a Series aligned with the store index) is only used to label
+    the hits.
+    """
+
+    def __init__(self, store, titles=None, use_ner=False):
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        self.use_ner = use_ner
+        self.index = store.index
+        self.titles = None if titles is None else titles.reindex(store.index).astype(object).to_numpy()
+        self.vocabulary = store.vocabulary
+        self._term_ids = {term: i for i, term in enumerate(self.vocabulary)}
+        self._analyze = CountVectorizer(stop_words=sorted(custom_stop_words())).build_analyzer()
+
+        counts = store.counts()
+        n_docs = int(np.asarray(store.is_document).sum())
+        doc_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+        weights = counts @ sparse.diags(np.log((1 + n_docs) / (1 + doc_freq)) + 1)
+        norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        weights = (sparse.diags(1 / norms) @ weights).tocsc()
+
+        # within every term, postings by descending weight (ties by article order)
+        terms = np.repeat(np.arange(weights.shape[1]), np.diff(weights.indptr))
+        order = np.lexsort((weights.indices, -weights.data, terms))
+        self.postings = weights.indices[order].astype(np.int32)
+        self.weights = weights.data[order].astype(np.float32)
+        self.offsets = weights.indptr.astype(np.int64)
+
+        self._labels = {}
+        for name, column in FILTERS.items():
+            source_column = 'publisher_leaning' if column == 'grouped_leaning' else column
+            if source_column not in store.labels:
+                continue
+            codes, categories = store.labels[source_column]
+            if column == 'grouped_leaning':
+                # missing leanings count as Neutral, as in the leaning analysis
+                grouped = [group_political_leaning(category) for category in categories]
+                categories = list(dict.fromkeys(grouped + [group_political_leaning(None)]))
+                mapping = np.array([categories.index(label) for label in grouped]
+                                   + [categories.index(group_political_leaning(None))], dtype=np.int8)
+                codes = mapping[np.asarray(codes)]  # code -1 picks the last entry, the missing leaning
+            self._labels[name] = (codes, categories, {category: code for code, category in enumerate(categories)})
+
+    @classmethod
+    def from_articles(cls, df, use_ner=False, cache=None, workers=1):
+        """Clean and tokenize ``df`` (with title and body) and index it."""
+        corpus = PreparedCorpus(df, use_ner=use_ner, cache=cache, workers=workers)
+        store = TokenStore.from_texts(corpus.texts, df[[column for column in LABEL_COLUMNS if column in df.columns]])
+        return cls(store, titles=df['title'] if 'title' in df.columns else None, use_ner=use_ner)
+
+    def terms(self, query):
+        """The indexed terms ``query`` stands for: itself if indexed, else its tokens after ``clean_text``."""
+        query = query.strip().lower()
+        if query in self._term_ids:
+            return [query]
+        tokens = self._analyze(clean_text(query, use_ner=self.use_ner))
+        return [token for token in dict.fromkeys(tokens) if token in self._term_ids]
+
+    def _postings(self, term):
+        term_id = self._term_ids[term]
+        start, end = self.offsets[term_id], self.offsets[term_id + 1]
+        return self.postings[start:end], self.weights[start:end]
+
+    def _article(self, row):
+        article = self.index[row]
+        # numpy scalars (integer or datetime labels) as plain Python values, for JSON
+        return article.item() if isinstance(article, np.generic) else article
+
+    def _label(self, name, row):
+        if name not in self._labels:
+            return None
+        codes, categories, _ = self._labels[name]
+        return categories[codes[row]] if codes[row] >= 0 else None
+
+    def search(self, query, n=number_idf_words, category=None, leaning=None, source=None):
+        """The ``n`` articles with the highest TF-IDF weight for ``query``, optionally filtered.
+
+        ``category``, ``leaning`` (Left, Right or Neutral) and ``source`` must
+        match exactly. Returns a list of ``Hit``, best first.
+        """
+        terms = self.terms(query)
+        if not terms:
+            return []
+        if len(terms) == 1:
+            rows, scores = self._postings(terms[0])
+        else:
+            rows, scores = map(np.concatenate, zip(*map(self._postings, terms)))
+            rows, inverse = np.unique(rows, return_inverse=True)
+            scores = np.bincount(inverse, weights=scores)
+            order = np.lexsort((rows, -scores))
+            rows, scores = rows[order], scores[order]
+
+        keep = None
+        for name, value in (('category', category), ('leaning', leaning), ('source', source)):
+            if value is None:
+                continue
+            if name not in self._labels:
+                raise ValueError(f"the index has no {FILTERS[name]} labels to filter by {name}")
+            codes, _, lookup = self._labels[name]
+            if value not in lookup:
+                return []
+            matches = codes[rows] == lookup[value]
+            keep = matches if keep is None else keep & matches
+        if keep is not None:
+            rows, scores = rows[keep], scores[keep]
+
+        return [
+            Hit(article=self._article(row), score=float(score), category=self._label('category', row),
+                leaning=self._label('leaning', row), source=self._label('source', row),
+                title=None if self.titles is None or pd.isna(self.titles[row]) else self.titles[row])
+            for row, score in zip(rows[:n], scores[:n])
+        ]
+
+
+def make_server(index, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """An HTTP server answering ``GET /search?term=...&n=...&category=...&leaning=...&source=...``."""
+
+    class SearchHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path != '/search':
+                return self._send(404, {'error': "unknown path; use /search?term=..."})
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            if not params.get('term'):
+                return self._send(400, {'error': "missing 'term' parameter"})
+            try:
+                n = int(params.get('n', number_idf_words))
+                if n < 1:
+                    raise ValueError("'n' must be at least 1")
+                start = time.perf_counter()
+                hits = index.search(params['term'], n=n, **{name: params.get(name) for name in FILTERS})
+                elapsed = time.perf_counter() - start
+            except ValueError as e:
+                return self._send(400, {'error': str(e)})
+            self._send(200, {'term': params['term'], 'terms': index.terms(params['term']),
+                             'milliseconds': elapsed * 1000, 'hits': [hit._asdict() for hit in hits]})
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # no line per request on stderr
+
+    return ThreadingHTTPServer((host, port), SearchHandler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Top articles for a term, as a query or a local HTTP service.")
+    parser.add_argument('input', nargs='?', help="annotated dataset (default: data_annotated_with_leaning.*)")
+    parser.add_argument('--backend', choices=['manual', 'ner'], default='manual', help="entity normalization")
+    parser.add_argument('--query', metavar='TERM', help="print the top articles for TERM instead of serving")
+    parser.add_argument('-n', type=int, default=number_idf_words, help="articles per query")
+    for name, column in FILTERS.items():
+        parser.add_argument(f'--{name}', help=f"only articles with this {column} (with --query)")
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"address to serve on (default: {DEFAULT_HOST})")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"port to serve on (default: {DEFAULT_PORT})")
+    args = parser.parse_args()
+
+    data_file = args.input or find_table('data_annotated_with_leaning') or 'data_annotated_with_leaning.csv'
+    use_ner = args.backend == 'ner'
+    # the token store written by tfidf.py is reused while the data file is unchanged
+    key = store_key(data_file, use_ner)
+    store = TokenStore.load_matching(key, store_dir(use_ner))
+    if store is None:
+        df = read_table(data_file, columns=ARTICLE_COLUMNS)
+        corpus = PreparedCorpus(df, use_ner=use_ner)
+        store = TokenStore.from_texts(corpus.texts, df[[column for column in LABEL_COLUMNS if column in df.columns]],
+                                      key=key)
+        store.save(store_dir(use_ner))
+    titles = read_table(data_file, columns=['title']).get('title')
+    index = InvertedIndex(store, titles=titles, use_ner=use_ner)
+    print(f"Indexed {len(store)} articles, {len(index.vocabulary)} terms, {len(index.postings)} postings")
+
+    if args.query is not None:
+        hits = index.search(args.query, n=args.n, **{name: getattr(args, name) for name in FILTERS})
+        print(f"Top articles for {' + '.join(index.terms(args.query)) or args.query!r}:")
+        for i, hit in enumerate(hits, 1):
+            print(f"{i:2d}. {hit.score:.4f}  #{hit.article:<7} {hit.source or '':<20} {hit.category or '':<22} "
+                  f"{str(hit.title or '')[:60]}")
+    else:
+        server = make_server(index, args.host, args.port)
+        print(f"Serving on http://{args.host}:{server.server_address[1]}/search?term=...  (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
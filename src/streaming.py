@@ -0,0 +1,309 @@
+"""Chunked streaming ingestion of the annotated article CSV.
+
+The CSV is read in bounded chunks (only the columns the analysis needs), each
+chunk is cleaned and tokenized, and its per-group document/term frequencies are
+folded into running totals. The chunk's sparse count matrix is spilled to a
+temporary directory and the raw text is dropped, so peak memory depends on the
+chunk size and the vocabulary, not on the number of articles.
+
+Mean TF-IDF needs the final per-group IDF, so scoring replays the spilled count
+matrices once at the end; the results match ``GroupTfidfEngine`` on the same
+data.
+"""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+from tfidf import (
+    ARTICLE_COLUMNS,
+    CUSTOM_STOP_WORDS,
+    MAX_DF,
+    MAX_FEATURES,
+    MIN_DF,
+    NER_BATCH_SIZE,
+    clean_texts,
+    group_political_leaning,
+    number_idf_words,
+    top_display_words,
+)
+from group_tfidf import GroupScores, group_idf, group_tfidf_sums, group_vocabulary_sizes
+
+from data_io import iter_table_chunks, read_columns
+
+STREAM_CHUNK_SIZE = 10000
+
+
+class _NullProfiler:
+    # stands in for profiling.PipelineProfiler when nothing is recorded
+    @contextmanager
+    def stage(self, name, n_documents=None):
+        yield {'stage': name, 'n_documents': n_documents}
+
+    def record_groups(self, column, sizes):
+        pass
+
+
+def read_article_chunks(path, chunk_size=STREAM_CHUNK_SIZE, columns=ARTICLE_COLUMNS):
+    """Yield DataFrames of at most ``chunk_size`` rows, restricted to ``columns``."""
+    yield from iter_table_chunks(path, chunk_size, columns=list(columns))
+
+
+def clean_article_chunks(chunks, use_ner=False, batch_size=NER_BATCH_SIZE, n_process=1,
+                         cache=None, workers=1):
+    """Yield ``(labels, texts)`` per chunk: the non-text columns and the cleaned ``title body``."""
+    for chunk in chunks:
+        options = dict(use_ner=use_ner, batch_size=batch_size, n_process=n_process,
+                       cache=cache, workers=workers)
+        texts = clean_texts(chunk['title'], **options) + ' ' + clean_texts(chunk['body'], **options)
+        yield chunk.drop(columns=['title', 'body']), texts
+
+
+def _grow(array, shape):
+    """``array`` at exactly ``shape``: its used part (a view) padded with zeros where it is too small."""
+    array = array[tuple(slice(0, size) for size in shape)]
+    if array.shape == shape:
+        return array
+    grown = np.zeros(shape, dtype=array.dtype)
+    grown[tuple(slice(0, size) for size in array.shape)] = array
+    return grown
+
+
+def _reserve(array, shape):
+    """``array`` with room for at least ``shape``.
+
+    A dimension that is too small at least doubles, so totals over a vocabulary
+    that grows with every chunk are only copied a logarithmic number of times.
+    """
+    if all(size <= capacity for size, capacity in zip(shape, array.shape)):
+        return array
+    capacity = tuple(max(size, 2 * old) if size > old else old for size, old in zip(shape, array.shape))
+    grown = np.zeros(capacity, dtype=array.dtype)
+    grown[tuple(slice(0, size) for size in array.shape)] = array
+    return grown
+
+
+class StreamingGroupTfidf:
+    """Per-group TF-IDF accumulated chunk by chunk over several grouping columns."""
+
+    def __init__(self, group_columns, max_features=MAX_FEATURES, min_df=MIN_DF, max_df=MAX_DF,
+                 stop_words=CUSTOM_STOP_WORDS, spill_dir=None):
+        self.group_columns = list(group_columns)
+        self.max_features = max_features
+        self.min_df = min_df
+        self.max_df = max_df
+
+        self._analyze = CountVectorizer(stop_words=sorted(stop_words)).build_analyzer()
+        self._vocabulary = {}
+        self._labels = {column: {} for column in self.group_columns}
+        self._n_docs = {column: np.zeros(0) for column in self.group_columns}
+        self._doc_freq = {column: np.zeros((0, 0)) for column in self.group_columns}
+        self._term_freq = {column: np.zeros((0, 0)) for column in self.group_columns}
+
+        self._owns_spill_dir = spill_dir is None
+        self.spill_dir = tempfile.mkdtemp(prefix='tfidf_stream_') if spill_dir is None else spill_dir
+        self._spills = []
+        self._scores = None
+        self.n_documents = 0
+
+    def _count(self, texts):
+        indices = []
+        indptr = [0]
+        for text in texts:
+            for token in self._analyze(text):
+                indices.append(self._vocabulary.setdefault(token, len(self._vocabulary)))
+            indptr.append(len(indices))
+        counts = sparse.csr_matrix(
+            (np.ones(len(indices)), np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(texts), len(self._vocabulary)),
+        )
+        counts.sum_duplicates()
+        return counts
+
+    def partial_fit(self, texts, labels):
+        """Fold one chunk in. ``labels`` holds the group columns for the same rows."""
+        texts = pd.Series(texts).reset_index(drop=True)
+        labels = labels.reset_index(drop=True)
+        is_document = (texts.str.strip() != '').to_numpy()
+        texts = texts[is_document].tolist()
+        labels = labels[is_document]
+        if not texts:
+            return self
+
+        counts = self._count(texts)
+        presence = counts.copy()
+        presence.data[:] = 1
+        n_terms = len(self._vocabulary)
+
+        codes = np.empty((len(texts), len(self.group_columns)), dtype=np.int32)
+        for j, column in enumerate(self.group_columns):
+            label_codes = self._labels[column]
+            codes[:, j] = [
+                -1 if pd.isna(label) else label_codes.setdefault(label, len(label_codes))
+                for label in labels[column]
+            ]
+            n_groups = len(label_codes)
+            indicator = sparse.csr_matrix(
+                (np.ones(int((codes[:, j] >= 0).sum())),
+                 (codes[codes[:, j] >= 0, j], np.flatnonzero(codes[:, j] >= 0))),
+                shape=(n_groups, len(texts)),
+            )
+            # the arrays have spare capacity; only the first n_groups x n_terms are in use
+            n_docs = self._n_docs[column] = _reserve(self._n_docs[column], (n_groups,))
+            n_docs[:n_groups] += np.asarray(indicator.sum(axis=1)).ravel()
+            for totals, chunk_totals in ((self._doc_freq, indicator @ presence), (self._term_freq, indicator @ counts)):
+                array = totals[column] = _reserve(totals[column], (n_groups, n_terms))
+                chunk_totals = chunk_totals.tocoo()  # canonical, so every (group, term) appears once
+                array[chunk_totals.row, chunk_totals.col] += chunk_totals.data
+
+        spill = os.path.join(self.spill_dir, f'chunk_{len(self._spills):06d}')
+        sparse.save_npz(spill + '_counts.npz', counts)
+        np.save(spill + '_codes.npy', codes)
+        self._spills.append(spill)
+        self.n_documents += len(texts)
+        self._scores = None
+        return self
+
+    @property
+    def n_terms(self):
+        return len(self._vocabulary)
+
+    def _score_all(self):
+        terms = np.array(list(self._vocabulary), dtype=object)
+        order = np.argsort(terms.astype(str), kind='stable')  # sklearn sorts feature names
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        feature_names = terms[order].astype(str)
+        n_terms = len(terms)
+
+        fits = {}
+        for column in self.group_columns:
+            n_groups = len(self._labels[column])
+            doc_freq = _grow(self._doc_freq[column], (n_groups, n_terms))[:, order]
+            term_freq = _grow(self._term_freq[column], (n_groups, n_terms))[:, order]
+            idf, kept_masks = group_idf(
+                _grow(self._n_docs[column], (n_groups,)), doc_freq, term_freq,
+                self.max_features, self.min_df, self.max_df,
+            )
+            fits[column] = (idf, kept_masks, np.zeros(idf.shape))
+
+        # replay the spilled chunks once, for every grouping column
+        for spill in self._spills:
+            counts = sparse.load_npz(spill + '_counts.npz')
+            counts = sparse.csr_matrix(
+                (counts.data, rank[counts.indices], counts.indptr), shape=(counts.shape[0], n_terms)
+            )
+            codes = np.load(spill + '_codes.npy')
+            for j, column in enumerate(self.group_columns):
+                idf, _, sums = fits[column]
+                sums += group_tfidf_sums(counts, codes[:, j], idf)
+
+        scores = {}
+        for column in self.group_columns:
+            idf, kept_masks, sums = fits[column]
+            n_docs = _grow(self._n_docs[column], (len(self._labels[column]),))
+            scores[column] = {
+                label: GroupScores(
+                    n_documents=int(n_docs[g]),
+                    feature_names=feature_names[kept_masks[g]],
+                    mean_scores=sums[g, kept_masks[g]] / n_docs[g],
+                )
+                for label, g in self._labels[column].items()
+            }
+        return scores
+
+    def score_groups(self, column):
+        """``{label: GroupScores}`` for one grouping column, as ``GroupTfidfEngine`` returns."""
+        if self._scores is None:
+            self._scores = self._score_all()
+        return self._scores[column]
+
+    def top_words(self, column, n_words=number_idf_words):
+        return {
+            label: (scores.n_documents, top_display_words(scores.feature_names, scores.mean_scores, n_words))
+            for label, scores in self.score_groups(column).items()
+        }
+
+    def vocabulary_sizes(self, column):
+        """``{label: (n_documents, n_terms, n_features)}`` for one grouping column."""
+        shape = (len(self._labels[column]), len(self._vocabulary))
+        sizes = group_vocabulary_sizes(
+            _grow(self._n_docs[column], shape[:1]), _grow(self._doc_freq[column], shape),
+            _grow(self._term_freq[column], shape), self.max_features, self.min_df, self.max_df,
+        )
+        return dict(zip(self._labels[column], sizes))
+
+    def close(self):
+        if self._owns_spill_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def analyze_csv_streaming(csv_path, use_ner=False, chunk_size=STREAM_CHUNK_SIZE, cache=None,
+                          workers=1, n_words=number_idf_words, profiler=None, categories=True, leaning=True,
+                          max_features=MAX_FEATURES, min_df=MIN_DF, max_df=MAX_DF, n_process=1):
+    """Category and political leaning top words from a CSV/Parquet/Feather file read in chunks.
+
+    Returns ``(category_results, leaning_results)`` in the same shape as
+    ``analyze_categories`` / ``analyze_categories_by_political_leaning``;
+    a grouping switched off with ``categories`` / ``leaning`` comes back
+    empty. With a ``profiling.PipelineProfiler`` the streaming pass and the
+    scoring are recorded as stages, along with per-group vocabulary sizes.
+    """
+    profiler = _NullProfiler() if profiler is None else profiler
+    has_leaning = leaning and 'publisher_leaning' in read_columns(csv_path)
+    group_columns = (['Categories'] if categories else []) + (['grouped_leaning'] if has_leaning else [])
+    if not group_columns:
+        return {}, {}
+
+    with StreamingGroupTfidf(group_columns, max_features=max_features, min_df=min_df, max_df=max_df) as model:
+        # reading, cleaning and tokenizing are interleaved chunk by chunk
+        with profiler.stage('stream') as stage:
+            n_articles = 0
+            for labels, texts in clean_article_chunks(
+                read_article_chunks(csv_path, chunk_size=chunk_size), use_ner=use_ner, n_process=n_process,
+                cache=cache, workers=workers,
+            ):
+                n_articles += len(labels)
+                if has_leaning:
+                    labels = labels.assign(grouped_leaning=labels['publisher_leaning'].astype(object).apply(group_political_leaning))
+                model.partial_fit(texts, labels)
+                print(f"  Streamed {n_articles} articles ({model.n_terms} distinct terms)")
+            stage['n_documents'] = n_articles
+
+        with profiler.stage('score', n_articles):
+            category_top_words = model.top_words('Categories', n_words) if categories else {}
+            leaning_top_words = model.top_words('grouped_leaning', n_words) if has_leaning else {}
+        for column in group_columns:
+            profiler.record_groups(column, model.vocabulary_sizes(column))
+
+        results = {}
+        for category, (n_documents, top_words) in category_top_words.items():
+            if n_documents < 2:
+                print(f"Category '{category}': Not enough documents ({n_documents}) for meaningful TF-IDF analysis")
+                continue
+            results[category] = top_words
+
+        leaning_results = {}
+        if has_leaning:
+            for leaning in ['Left', 'Right', 'Neutral']:
+                if leaning not in leaning_top_words:
+                    continue
+                n_documents, top_words = leaning_top_words[leaning]
+                if n_documents < 2:
+                    print(f"  {leaning}: not enough documents ({n_documents}) for analysis")
+                    continue
+                leaning_results[leaning] = top_words
+
+    return results, leaning_results
@@ -0,0 +1,150 @@
+"""Persistent cache of normalized article text.
+
+Entries are content-addressed: the key is a hash of the raw text together with
+a fingerprint of the normalizer that produced the value, so editing an article
+or changing the mapping table / spaCy model simply misses the cache. Values are
+zlib-compressed in a single SQLite file and the least recently used entries are
+evicted once the file grows past its size budget.
+"""
+
+import hashlib
+import os
+import sqlite3
+import zlib
+
+DEFAULT_CACHE_PATH = os.path.join('.cache', 'normalized_text.sqlite')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+SQLITE_MAX_VARIABLES = 500
+
+
+class NormalizedTextCache:
+    """Size-bounded, LRU-evicting key/value store for normalized text."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key BLOB PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access INTEGER NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access)")
+        self._conn.commit()
+
+        size, clock = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0), COALESCE(MAX(last_access), 0) FROM entries"
+        ).fetchone()
+        self._size = size
+        self._clock = clock
+
+    @staticmethod
+    def key(text, fingerprint):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(fingerprint.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(str(text).encode('utf-8'))
+        return digest.digest()
+
+    def _tick(self):
+        self._clock += 1
+        return self._clock
+
+    def get_many(self, keys):
+        """Return ``{key: text}`` for the keys present in the cache."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        for start in range(0, len(keys), SQLITE_MAX_VARIABLES):
+            chunk = keys[start:start + SQLITE_MAX_VARIABLES]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, value FROM entries WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            for key, value in rows:
+                found[key] = zlib.decompress(value).decode('utf-8')
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+
+        if found:
+            now = self._tick()
+            self._conn.executemany(
+                "UPDATE entries SET last_access = ? WHERE key = ?",
+                [(now, key) for key in found],
+            )
+            self._conn.commit()
+        return found
+
+    def put_many(self, items):
+        """Store ``{key: text}`` pairs, evicting old entries if over budget."""
+        if not items:
+            return
+        now = self._tick()
+        rows = []
+        for key, text in items.items():
+            value = zlib.compress(text.encode('utf-8'))
+            rows.append((key, value, len(key) + len(value), now))
+
+        replaced = 0
+        keys = [row[0] for row in rows]
+        for start in range(0, len(keys), SQLITE_MAX_VARIABLES):
+            chunk = keys[start:start + SQLITE_MAX_VARIABLES]
+            placeholders = ','.join('?' * len(chunk))
+            replaced += self._conn.execute(
+                f"SELECT COALESCE(SUM(size), 0) FROM entries WHERE key IN ({placeholders})", chunk
+            ).fetchone()[0]
+
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        self._size += sum(row[2] for row in rows) - replaced
+        self._evict()
+        self._conn.commit()
+
+    def _evict(self):
+        if self._size <= self.max_bytes:
+            return
+        # trim to 90% of the budget so eviction does not run on every insert
+        target = int(self.max_bytes * 0.9)
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            if self._size <= target:
+                break
+            victims.append((key,))
+            self._size -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    def stats(self):
+        entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'bytes': self._size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -7,104 +7,212 @@ and spaCy NER), custom stop word filtering, and political leaning-based analysis
 
 import pandas as pd              
 import numpy as np               
-from sklearn.feature_extraction.text import TfidfVectorizer  
-from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS  
 import re                       
-from collections import defaultdict 
-import matplotlib.pyplot as plt  
-import seaborn as sns            
 import os                        
+import sys
+import threading
+import functools
+# scikit-learn, matplotlib and spaCy are imported on first use (see
+# custom_stop_words, _pyplot and get_nlp), so importing this module stays cheap
+import hashlib
+import json
+import time
+import argparse
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
 
-# NER import - optional
-try:
-    import spacy
-    nlp = spacy.load("en_core_web_sm")
-    NER_AVAILABLE = True
-except (ImportError, OSError):
-    NER_AVAILABLE = False
+# shared table I/O (CSV / Parquet / Feather) lives with the data tools
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools')
+if TOOLS_DIR not in sys.path:
+    sys.path.append(TOOLS_DIR)
+
+# columns the analysis reads - everything else in the dataset is never loaded
+ARTICLE_COLUMNS = ('title', 'body', 'source', 'Categories', 'publisher_leaning')
+
+# NER - optional; the spaCy model is loaded once per process, on first use
+NER_MODEL = "en_core_web_sm"
+nlp = None
+_nlp_lock = threading.Lock()
+_nlp_load_attempted = False
+
+def get_nlp():
+    """The process-wide spaCy pipeline, or None when spaCy or the model is missing."""
+    global nlp, _nlp_load_attempted
+    if nlp is None and not _nlp_load_attempted:
+        with _nlp_lock:
+            if nlp is None and not _nlp_load_attempted:
+                try:
+                    import spacy
+                    nlp = spacy.load(NER_MODEL)
+                except (ImportError, OSError):
+                    nlp = None
+                _nlp_load_attempted = True
+    return nlp
+
+def ner_available():
+    return get_nlp() is not None
+
+# components the NER normalizer never reads - skipped when running the pipeline
+NER_UNUSED_COMPONENTS = ('tagger', 'parser', 'attribute_ruler', 'lemmatizer')
+NER_BATCH_SIZE = 256
+
+def _ner_disabled_components():
+    return [name for name in get_nlp().pipe_names if name in NER_UNUSED_COMPONENTS]
+
+def _ner_replacement(ent):
+    ent_text = ent.text.lower()
+    if ent.label_ == "PERSON":
+        if "trump" in ent_text:
+            return "trump"
+        elif "newsom" in ent_text:
+            return "newsom"
+        elif "biden" in ent_text:
+            return "biden"
+    elif ent.label_ == "GPE":  # geopolitical entities (entities, countries, etc.)
+        if "francisco" in ent_text:
+            return "san francisco"
+        elif "california" in ent_text:
+            return "california"
+    elif ent.label_ == "ORG":  # organizations
+        if "democratic" in ent_text and "party" in ent_text:
+            return "democratic party"
+        elif "republican" in ent_text and "party" in ent_text:
+            return "republican party"
+    return ent_text
+
+def _render_ner_doc(doc):
+    # build the normalised text in one pass over the (sorted, non-overlapping) entities
+    text = doc.text
+    pieces = []
+    last = 0
+    for ent in doc.ents:
+        pieces.append(text[last:ent.start_char])
+        pieces.append(_ner_replacement(ent))
+        last = ent.end_char
+    pieces.append(text[last:])
+    return ''.join(pieces).lower()
 
 def normalize_text_ner(text):
-    if not NER_AVAILABLE:
+    if not ner_available():
         return str(text).lower()  # fallback to basic normalization
     
     if pd.isna(text):
         raise ValueError("Error with normalization text.")
     
-    text = str(text)
-    doc = nlp(text)
-    
-    # normalise
-    for ent in reversed(doc.ents): 
-        if ent.label_ == "PERSON":
-            if "trump" in ent.text.lower():
-                text = text[:ent.start_char] + "trump" + text[ent.end_char:]
-            elif "newsom" in ent.text.lower():
-                text = text[:ent.start_char] + "newsom" + text[ent.end_char:]
-            elif "biden" in ent.text.lower():
-                text = text[:ent.start_char] + "biden" + text[ent.end_char:]
-            else:
-                # to lowercase for others
-                text = text[:ent.start_char] + ent.text.lower() + text[ent.end_char:]
-        elif ent.label_ == "GPE":  # geopolitical entities (entities, countries, etc.)
-            if "francisco" in ent.text.lower():
-                text = text[:ent.start_char] + "san francisco" + text[ent.end_char:]
-            elif "california" in ent.text.lower():
-                text = text[:ent.start_char] + "california" + text[ent.end_char:]
-            else:
-                text = text[:ent.start_char] + ent.text.lower() + text[ent.end_char:]
-        elif ent.label_ == "ORG":  # organizations
-            if "democratic" in ent.text.lower() and "party" in ent.text.lower():
-                text = text[:ent.start_char] + "democratic party" + text[ent.end_char:]
-            elif "republican" in ent.text.lower() and "party" in ent.text.lower():
-                text = text[:ent.start_char] + "republican party" + text[ent.end_char:]
-            else:
-                text = text[:ent.start_char] + ent.text.lower() + text[ent.end_char:]
-    
-    return text.lower()
+    return _render_ner_doc(get_nlp()(str(text), disable=_ner_disabled_components()))
 
-def normalize_text(text):
-    if pd.isna(text):
-        raise ValueError("Error with normalization text.")
+def normalize_texts_ner(texts, batch_size=NER_BATCH_SIZE, n_process=1):
+    """Batched NER normalization streaming texts through ``nlp.pipe``.
 
-    text = str(text).lower()
-
-    # developed based on pre entity mapping tf-idf results
-    entity_mappings = {
-        # Political figures
-        'trump_entity': ['trump', 'donald trump', 'president trump', 'former president trump', 'president donald trump', 'donald'],
-        'newsom_entity': ['newsom', 'gavin newsom', 'governor newsom', 'gov newsom', 'california governor', 'gov gavin', 'gavin', 'gov', 'governor'],
-        'biden_entity': ['biden', 'joe biden', 'president biden', 'biden administration', 'joe'],
-        'harris_entity': ['harris', 'kamala harris', 'vice president harris', 'vp harris', 'kamala'],
-        'williamson_entity': ['chief of staff', 'dana williamson', 'williamson', 'chief staff', 'chief', 'staff'],
-
-        # Locations
-        'california_entity': ['california', 'calif', 'ca', 'golden state', 'west coast'],
-        'san_francisco_entity': ['san francisco', 'sf', 'san fran', 'francisco', 'san'],
-        'texas_entity': ['texas', 'tx', 'lone star state'],
-        'washington_entity': ['washington', 'dc', 'washington dc', 'capitol'],
-        
-        # Political terms
-        'democrat_entity': ['democrat', 'democratic', 'democrats', 'dem', 'dems'],
-        'republican_entity': ['republican', 'republicans', 'gop', 'rep', 'reps'],
-        'government_entity': ['government', 'federal government', 'administration', 'govt'],
-        'congress_entity': ['congress', 'congressional', 'house', 'senate', 'legislature'],
-        
-        # Issues
-        'climate_entity': ['climate', 'climate change', 'global warming', 'environmental'],
-        'economy_entity': ['economy', 'economic', 'economics', 'financial', 'fiscal'],
-        'immigration_entity': ['immigration', 'immigrant', 'immigrants', 'undocumented', 'border'],
-        'healthcare_entity': ['healthcare', 'health care', 'medical', 'hospital', 'insurance'],
-        'planned_parenthood_entity': ['planned parenthood', 'parenthood']
-    }
+    Accepts a pandas Series (returns a Series with the same index) or any
+    iterable (returns a list). Output matches ``normalize_text_ner`` per text.
+    """
+    is_series = isinstance(texts, pd.Series)
+    values = list(texts)
+
+    if not ner_available():
+        normalized = [str(text).lower() for text in values]  # fallback to basic normalization
+    else:
+        if any(pd.isna(text) for text in values):
+            raise ValueError("Error with normalization text.")
+        docs = get_nlp().pipe(
+            (str(text) for text in values),
+            batch_size=batch_size,
+            n_process=n_process,
+            disable=_ner_disabled_components(),
+        )
+        normalized = [_render_ner_doc(doc) for doc in docs]
+
+    if is_series:
+        return pd.Series(normalized, index=texts.index, dtype=object)
+    return normalized
+
+# developed based on pre entity mapping tf-idf results
+ENTITY_MAPPINGS = {
+    # Political figures
+    'trump_entity': ['trump', 'donald trump', 'president trump', 'former president trump', 'president donald trump', 'donald'],
+    'newsom_entity': ['newsom', 'gavin newsom', 'governor newsom', 'gov newsom', 'california governor', 'gov gavin', 'gavin', 'gov', 'governor'],
+    'biden_entity': ['biden', 'joe biden', 'president biden', 'biden administration', 'joe'],
+    'harris_entity': ['harris', 'kamala harris', 'vice president harris', 'vp harris', 'kamala'],
+    'williamson_entity': ['chief of staff', 'dana williamson', 'williamson', 'chief staff', 'chief', 'staff'],
 
+    # Locations
+    'california_entity': ['california', 'calif', 'ca', 'golden state', 'west coast'],
+    'san_francisco_entity': ['san francisco', 'sf', 'san fran', 'francisco', 'san'],
+    'texas_entity': ['texas', 'tx', 'lone star state'],
+    'washington_entity': ['washington', 'dc', 'washington dc', 'capitol'],
+
+    # Political terms
+    'democrat_entity': ['democrat', 'democratic', 'democrats', 'dem', 'dems'],
+    'republican_entity': ['republican', 'republicans', 'gop', 'rep', 'reps'],
+    'government_entity': ['government', 'federal government', 'administration', 'govt'],
+    'congress_entity': ['congress', 'congressional', 'house', 'senate', 'legislature'],
+
+    # Issues
+    'climate_entity': ['climate', 'climate change', 'global warming', 'environmental'],
+    'economy_entity': ['economy', 'economic', 'economics', 'financial', 'fiscal'],
+    'immigration_entity': ['immigration', 'immigrant', 'immigrants', 'undocumented', 'border'],
+    'healthcare_entity': ['healthcare', 'health care', 'medical', 'hospital', 'insurance'],
+    'planned_parenthood_entity': ['planned parenthood', 'parenthood']
+}
+
+
+def _apply_mappings_sequentially(text, entity_mappings):
+    # reference semantics: one re.sub per variation, in table order
     for entity_name, variations in entity_mappings.items():
         for variation in variations:
             pattern = r'\b' + re.escape(variation) + r'\b'
-            text = re.sub(pattern, entity_name, text) # replacement
-
+            text = re.sub(pattern, entity_name, text)
     return text
 
 
+class EntityNormalizer:
+    """Entity normalizer compiled once from an entity mapping table.
+
+    Every variation is folded into a single longest-first alternation, so a text
+    is rewritten in one scan. Each variation is replaced by what the sequential
+    per-variation substitution produces for it (e.g. 'donald trump' becomes
+    'trump_entity trump_entity'), which keeps the output tokens unchanged.
+    """
+
+    def __init__(self, entity_mappings=None):
+        self.entity_mappings = ENTITY_MAPPINGS if entity_mappings is None else entity_mappings
+        self.replacements = {
+            variation: _apply_mappings_sequentially(variation, self.entity_mappings)
+            for variations in self.entity_mappings.values()
+            for variation in variations
+        }
+        alternatives = sorted(self.replacements, key=lambda v: (-len(v), v))
+        self.pattern = re.compile(r'\b(?:' + '|'.join(map(re.escape, alternatives)) + r')\b')
+
+    def _replace(self, match):
+        return self.replacements[match.group(0)]
+
+    def normalize(self, text):
+        if pd.isna(text):
+            raise ValueError("Error with normalization text.")
+        return self.pattern.sub(self._replace, str(text).lower())
+
+    def normalize_many(self, texts):
+        """Normalize a pandas Series (returns a Series) or any iterable (returns a list)."""
+        if isinstance(texts, pd.Series):
+            if texts.isna().any():
+                raise ValueError("Error with normalization text.")
+            return texts.astype(str).str.lower().str.replace(self.pattern, self._replace, regex=True)
+        return [self.normalize(text) for text in texts]
+
+
+entity_normalizer = EntityNormalizer()
+
+
+def normalize_text(text):
+    return entity_normalizer.normalize(text)
+
+
+def normalize_texts(texts):
+    return entity_normalizer.normalize_many(texts)
+
+
 def clean_text(text, use_ner=False):
     if pd.isna(text): return ""
     
@@ -117,70 +225,284 @@ def clean_text(text, use_ner=False):
     text = ' '.join(text.split())
     return text
 
+# bump whenever clean_text / the NER replacement rules change, to invalidate cached text
+CLEANING_VERSION = 1
+
+def normalizer_fingerprint(use_ner=False):
+    if use_ner and ner_available():
+        import spacy
+        meta = get_nlp().meta
+        basis = {
+            'backend': 'ner',
+            'model': f"{meta.get('lang')}_{meta.get('name')}",
+            'model_version': meta.get('version'),
+            'spacy_version': spacy.__version__,
+        }
+    elif use_ner:
+        basis = {'backend': 'lowercase'}  # NER requested but unavailable
+    else:
+        basis = {'backend': 'manual', 'entity_mappings': ENTITY_MAPPINGS}
+    basis['cleaning_version'] = CLEANING_VERSION
+    return hashlib.sha256(json.dumps(basis, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+CLEAN_CHUNK_SIZE = 500
+
+def _clean_serial(texts, use_ner=False, batch_size=NER_BATCH_SIZE, n_process=1):
+    # texts: Series without missing values
+    if use_ner:
+        normalized = normalize_texts_ner(texts, batch_size=batch_size, n_process=n_process)
+    else:
+        normalized = normalize_texts(texts)
+
+    return (
+        normalized.str.replace(r'[^a-zA-Z\s_]', ' ', regex=True)
+        .str.split()
+        .str.join(' ')
+    )
+
+def _clean_chunk(values, use_ner, batch_size):
+    # worker entry point - must stay a module-level function to be picklable
+    return _clean_serial(pd.Series(values, dtype=object), use_ner=use_ner, batch_size=batch_size).tolist()
+
+def _clean_parallel(texts, use_ner=False, batch_size=NER_BATCH_SIZE, workers=None, chunk_size=CLEAN_CHUNK_SIZE):
+    values = texts.tolist()
+    chunks = [values[start:start + chunk_size] for start in range(0, len(values), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map() yields in submission order, so chunks are reassembled in order
+        cleaned_chunks = pool.map(_clean_chunk, chunks, [use_ner] * len(chunks), [batch_size] * len(chunks))
+        cleaned = [text for chunk in cleaned_chunks for text in chunk]
+    return pd.Series(cleaned, index=texts.index, dtype=object)
+
+def _clean_present(texts, use_ner=False, batch_size=NER_BATCH_SIZE, n_process=1, workers=1, chunk_size=CLEAN_CHUNK_SIZE):
+    # texts: Series without missing values
+    if (workers is not None and workers <= 1) or len(texts) <= chunk_size:
+        return _clean_serial(texts, use_ner=use_ner, batch_size=batch_size, n_process=n_process)
+    return _clean_parallel(texts, use_ner=use_ner, batch_size=batch_size, workers=workers, chunk_size=chunk_size)
+
+def clean_texts(texts, use_ner=False, batch_size=NER_BATCH_SIZE, n_process=1, cache=None,
+                workers=1, chunk_size=CLEAN_CHUNK_SIZE):
+    """Column-wise ``clean_text``: returns a Series aligned with ``texts``.
+
+    With a ``NormalizedTextCache``, only texts whose (raw text, normalizer
+    fingerprint) key is not cached yet are normalized. ``workers`` other than 1
+    splits the work into ``chunk_size`` chunks cleaned in a process pool
+    (``None`` uses every core); the output is the same as the serial path.
+    """
+    texts = pd.Series(texts) if not isinstance(texts, pd.Series) else texts
+    present = texts.notna()
+    cleaned = pd.Series('', index=texts.index, dtype=object)
+    if not present.any():
+        return cleaned
+
+    to_clean = texts[present]
+    if cache is None:
+        cleaned[present] = _clean_present(
+            to_clean, use_ner=use_ner, batch_size=batch_size, n_process=n_process,
+            workers=workers, chunk_size=chunk_size,
+        )
+        return cleaned
+
+    fingerprint = normalizer_fingerprint(use_ner)
+    keys = [cache.key(text, fingerprint) for text in to_clean]
+    found = cache.get_many(keys)
+
+    missing = {}
+    for key, text in zip(keys, to_clean):
+        if key not in found:
+            missing.setdefault(key, text)
+    if missing:
+        fresh = _clean_present(
+            pd.Series(list(missing.values()), dtype=object),
+            use_ner=use_ner, batch_size=batch_size, n_process=n_process,
+            workers=workers, chunk_size=chunk_size,
+        )
+        new_entries = dict(zip(missing.keys(), fresh))
+        cache.put_many(new_entries)
+        found.update(new_entries)
+
+    cleaned[present] = [found[key] for key in keys]
+    return cleaned
+
+def report_cleaning_speedup(texts, use_ner=False, workers=None, chunk_sizes=(100, 500, 2000)):
+    """Time serial vs. process-pool cleaning and print a speedup table.
+
+    Every parallel run is checked against the serial output. Returns the rows
+    of the report as dicts so they can be saved or compared across machines.
+    """
+    texts = pd.Series(texts).dropna().astype(str)
+    workers = workers or os.cpu_count()
+
+    start = time.perf_counter()
+    serial = _clean_serial(texts, use_ner=use_ner)
+    serial_seconds = time.perf_counter() - start
+
+    rows = [{'mode': 'serial', 'workers': 1, 'chunk_size': len(texts),
+             'seconds': serial_seconds, 'speedup': 1.0}]
+    for chunk_size in chunk_sizes:
+        start = time.perf_counter()
+        parallel = _clean_parallel(texts, use_ner=use_ner, workers=workers, chunk_size=chunk_size)
+        seconds = time.perf_counter() - start
+        if not parallel.equals(serial):
+            raise RuntimeError(f"Parallel cleaning (chunk size {chunk_size}) differs from serial output")
+        rows.append({'mode': 'parallel', 'workers': workers, 'chunk_size': chunk_size,
+                     'seconds': seconds, 'speedup': serial_seconds / seconds if seconds else float('inf')})
+
+    print(f"\nCleaning speedup report ({len(texts)} texts, {'NER' if use_ner else 'manual'} normalization)")
+    print("-" * 60)
+    print(f"{'mode':<10}{'workers':>8}{'chunk':>8}{'seconds':>10}{'docs/s':>12}{'speedup':>10}")
+    for row in rows:
+        docs_per_second = len(texts) / row['seconds'] if row['seconds'] else float('inf')
+        print(f"{row['mode']:<10}{row['workers']:>8}{row['chunk_size']:>8}"
+              f"{row['seconds']:>10.3f}{docs_per_second:>12.0f}{row['speedup']:>9.2f}x")
+    return rows
+
+class PreparedCorpus:
+    """Articles cleaned once and shared by every grouping analysis.
+
+    The cleaned ``title + body`` text is built column-wise a single time and
+    kept aligned with the DataFrame index, so each analysis only slices it.
+    """
+
+    def __init__(self, df, use_ner=False, batch_size=NER_BATCH_SIZE, n_process=1, cache=None,
+                 workers=1, chunk_size=CLEAN_CHUNK_SIZE):
+        if not df.index.is_unique:
+            raise ValueError("PreparedCorpus needs a DataFrame with a unique index.")
+        self.df = df
+        self.use_ner = use_ner
+        options = dict(use_ner=use_ner, batch_size=batch_size, n_process=n_process, cache=cache,
+                       workers=workers, chunk_size=chunk_size)
+        titles = clean_texts(df['title'], **options)
+        bodies = clean_texts(df['body'], **options)
+        self.texts = titles + ' ' + bodies
+
+    def __len__(self):
+        return len(self.texts)
+
+    def texts_for(self, index):
+        """Non-empty cleaned texts for the given index labels (or boolean mask)."""
+        selected = self.texts.loc[index]
+        return selected[selected.str.strip() != ''].tolist()
+
+
 number_idf_words = 10
+
+# added to scikit-learn's English stop words by custom_stop_words()
+EXTRA_STOP_WORDS = frozenset({
+    # common reporting words
+    'said', 'says', 'would', 'could', 'also', 'one', 'two', 'new', 'year', 
+    'years', 'time', 'first', 'last', 'way', 'people', 'state', 'states',
+    'according', 'report', 'news', 'like', 'make', 'made', 'get', 'go',
+    # time-related words that appear frequently but aren't topically important
+    'week', 'day', 'days', 'today', 'yesterday', 'monday', 'tuesday', 'wednesday',
+    'thursday', 'friday', 'saturday', 'sunday', 'january', 'february', 'march',
+    'april', 'may', 'june', 'july', 'august', 'september', 'october', 'november', 'december'
+})
+
+@functools.lru_cache(maxsize=None)
+def custom_stop_words():
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+    return frozenset(ENGLISH_STOP_WORDS).union(EXTRA_STOP_WORDS)
+
+def __getattr__(name):
+    # module constants that need a heavy import are built on first access
+    if name == 'CUSTOM_STOP_WORDS':
+        return custom_stop_words()
+    if name == 'NER_AVAILABLE':
+        return ner_available()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+MAX_FEATURES = 1000     # top 1000 features - reduce noise
+MIN_DF = 2              # word must appear in at least 2 documents - reduce noise
+MAX_DF = 0.8            # word must not appear in more than 80% of documents - removes very common words
+
 def get_top_tfidf_word(texts, n_words = number_idf_words):
-    custom_stop_words = set(ENGLISH_STOP_WORDS).union({
-        # common reporting words
-        'said', 'says', 'would', 'could', 'also', 'one', 'two', 'new', 'year', 
-        'years', 'time', 'first', 'last', 'way', 'people', 'state', 'states',
-        'according', 'report', 'news', 'like', 'make', 'made', 'get', 'go',
-        # time-related words that appear frequently but aren't topically important
-        'week', 'day', 'days', 'today', 'yesterday', 'monday', 'tuesday', 'wednesday',
-        'thursday', 'friday', 'saturday', 'sunday', 'january', 'february', 'march',
-        'april', 'may', 'june', 'july', 'august', 'september', 'october', 'november', 'december'
-    })
+    from sklearn.feature_extraction.text import TfidfVectorizer
 
     vectorizer = TfidfVectorizer(
-        max_features=1000,              # top 1000 features - reduce noise
-        stop_words=list(custom_stop_words),
-        min_df=2,                       # word must appear in at least 2 documents - reduce noise
-        max_df=0.8,                     # word must not appear in more than 80% of documents - removes very common words
+        max_features=MAX_FEATURES,
+        stop_words=sorted(custom_stop_words()),
+        min_df=MIN_DF,
+        max_df=MAX_DF,
         # no need for ngram since we normalise first    
     )
 
     tfidf_matrix = vectorizer.fit_transform(texts)
     feature_names = vectorizer.get_feature_names_out()
 
-    mean_scores = np.mean(tfidf_matrix.toarray(), axis=0)
-    word_scores = list(zip(feature_names, mean_scores)) # pair up
-    word_scores.sort(key=lambda x: x[1], reverse=True)
+    # column means straight from the sparse matrix - never densified
+    mean_scores = np.asarray(tfidf_matrix.sum(axis=0)).ravel() / tfidf_matrix.shape[0]
 
-    cleaned_scores = []
-    for word, score in word_scores[:n_words*2]:
-        # "trump_entity" becomes "trump"
-        display_word = word.replace('_entity', '').replace('_', ' ')
-        
-        existing_words = [w[0] for w in cleaned_scores]
-        if display_word not in existing_words:
-            cleaned_scores.append((display_word, score))
-        
-        if len(cleaned_scores) >= n_words:
-            break
-    
-    return cleaned_scores
+    return top_display_words(feature_names, mean_scores, n_words)
+
+
+def top_display_words(feature_names, scores, n_words=number_idf_words):
+    """Top ``n_words`` (display_word, score) pairs, one per display word.
+
+    Only the best ``2 * n_words`` features are ranked (ties broken by feature
+    order, as a stable sort would), then "trump_entity"-style names are turned
+    into display words and duplicates dropped.
+    """
+    scores = np.asarray(scores)
+    return [(word, scores[i]) for i, word in top_display_features(feature_names, scores, n_words)]
+
+
+def top_display_features(feature_names, scores, n_words=number_idf_words):
+    """The (feature_index, display_word) pairs behind ``top_display_words``."""
+    feature_names = np.asarray(feature_names)
+    scores = np.asarray(scores)
+    n_candidates = min(n_words * 2, len(scores))
+    if n_candidates == 0:
+        return []
+
+    if n_candidates < len(scores):
+        threshold = np.partition(scores, -n_candidates)[-n_candidates]
+        candidates = np.flatnonzero(scores >= threshold)
+    else:
+        candidates = np.arange(len(scores))
+    candidates = candidates[np.lexsort((candidates, -scores[candidates]))][:n_candidates]
+
+    # "trump_entity" becomes "trump"
+    display_words = np.char.replace(
+        np.char.replace(feature_names[candidates].astype(str), '_entity', ''), '_', ' '
+    )
+    _, first_seen = np.unique(display_words, return_index=True)
+    keep = np.sort(first_seen)[:n_words]
 
+    return [(int(candidates[i]), str(display_words[i])) for i in keep]
+
+
+def _grouped_top_words(df, column, groups, corpus, engine=None, n_words=number_idf_words):
+    # {group: (n_documents, top_words)} - top_words is None below 2 documents
+    if engine is not None:
+        engine_results = engine.top_words(df[column], n_words=n_words)
+
+    grouped = {}
+    for group in groups:
+        if engine is not None:
+            n_documents, top_words = engine_results.get(group, (0, None))
+        else:
+            texts = corpus.texts_for(df.index[df[column] == group])
+            n_documents = len(texts)
+            top_words = get_top_tfidf_word(texts, n_words=n_words) if n_documents >= 2 else None
+        grouped[group] = (n_documents, top_words if n_documents >= 2 else None)
+    return grouped
+
+def analyze_categories(df, use_ner=False, batch_size=NER_BATCH_SIZE, n_process=1, corpus=None, engine=None,
+                       n_words=number_idf_words):
+    if corpus is None and engine is None:
+        corpus = PreparedCorpus(df, use_ner=use_ner, batch_size=batch_size, n_process=n_process)
 
-def analyze_categories(df, use_ner=False):
     results = {}
-    categories = df['Categories'].unique()
+    categories = [category for category in df['Categories'].unique() if not pd.isna(category)]
+    grouped = _grouped_top_words(df, 'Categories', categories, corpus, engine=engine, n_words=n_words)
 
     for category in categories:
-        if pd.isna(category): continue
-        category_data = df[df['Categories'] == category] #filter
-        
-        texts = []
-        for _, row in category_data.iterrows():
-            title = clean_text(row['title'], use_ner=use_ner)
-            body = clean_text(row['body'], use_ner=use_ner)
-            combined_text = f"{title} {body}"
-            if combined_text.strip():
-                texts.append(combined_text)
-
-        if len(texts) < 2:
-            print(f"Category '{category}': Not enough documents ({len(texts)}) for meaningful TF-IDF analysis")
+        n_documents, top_words = grouped[category]
+
+        if top_words is None:
+            print(f"Category '{category}': Not enough documents ({n_documents}) for meaningful TF-IDF analysis")
             continue
 
-        top_words = get_top_tfidf_word(texts)
         results[category] = top_words
 
     return results
@@ -200,14 +522,17 @@ def group_political_leaning(leaning):
     else:
         return 'Neutral'
 
-def analyze_categories_by_political_leaning(df, use_ner=False):
+def analyze_categories_by_political_leaning(df, use_ner=False, batch_size=NER_BATCH_SIZE, n_process=1, corpus=None, engine=None,
+                                           n_words=number_idf_words):
     results = {}
     
     if 'publisher_leaning' not in df.columns:
         print("No 'publisher_leaning' column found. Skipping political leaning analysis.")
         return results
     
-    df['grouped_leaning'] = df['publisher_leaning'].apply(group_political_leaning)
+    df['grouped_leaning'] = df['publisher_leaning'].astype(object).apply(group_political_leaning)
+    if corpus is None and engine is None:
+        corpus = PreparedCorpus(df, use_ner=use_ner, batch_size=batch_size, n_process=n_process)
     
     print("\nAnalyzing TF-IDF by political leaning...")
     print("=" * 60)
@@ -218,38 +543,45 @@ def analyze_categories_by_political_leaning(df, use_ner=False):
         print(f"  {leaning}: {count} articles")
     print()
     
-    leanings = df['grouped_leaning'].unique()
-    for leaning in ['Left', 'Right', 'Neutral']: 
-        if leaning not in leanings:
-            continue
-            
+    leanings = [leaning for leaning in ['Left', 'Right', 'Neutral'] if leaning in df['grouped_leaning'].unique()]
+    grouped = _grouped_top_words(df, 'grouped_leaning', leanings, corpus, engine=engine, n_words=n_words)
+    for leaning in leanings:
         print(f"\nProcessing {leaning} leaning...")
         
-        leaning_data = df[df['grouped_leaning'] == leaning]
-        
-        texts = []
-        for _, row in leaning_data.iterrows():
-            title = clean_text(row['title'], use_ner=use_ner)
-            body = clean_text(row['body'], use_ner=use_ner)
-            combined_text = f"{title} {body}"
-            if combined_text.strip():
-                texts.append(combined_text)
+        n_documents, top_words = grouped[leaning]
         
-        if len(texts) < 2:
-            print(f"  Not enough documents ({len(texts)}) for analysis")
+        if top_words is None:
+            print(f"  Not enough documents ({n_documents}) for analysis")
             continue
         
-        top_words = get_top_tfidf_word(texts, n_words=number_idf_words)
         results[leaning] = top_words
         
-        print(f"  Processed {len(texts)} articles")
+        print(f"  Processed {n_documents} articles")
         print(f"  Top 3 words: {', '.join([word for word, score in top_words[:3]])}")
     
     return results
 
+FIGURE_DPI = 300
+FIGURE_FORMATS = ('png', 'svg', 'pdf')
+FIGURE_NAMES = {'categories': 'tfidf_visualization', 'leaning': 'tfidf_political_leaning'}
+
+def _pyplot():
+    # matplotlib is only imported when a figure is drawn; unless pyplot is
+    # already in use, the Agg backend renders straight to files without a display
+    import matplotlib
+    if 'matplotlib.pyplot' not in sys.modules:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+def figure_path(kind, use_ner=False, fmt='png'):
+    """Output file of the ``'categories'`` or ``'leaning'`` figure."""
+    method_suffix = "ner" if use_ner and ner_available() else "manual"
+    return os.path.join("Visualizations", f'{FIGURE_NAMES[kind]}_{method_suffix}.{fmt}')
+
 def save_leaning_results_to_file(results, use_ner=False):
 
-    actual_ner_used = use_ner and NER_AVAILABLE
+    actual_ner_used = use_ner and ner_available()
     method_suffix = "ner" if actual_ner_used else "manual"
     
     import os
@@ -276,11 +608,12 @@ def save_leaning_results_to_file(results, use_ner=False):
     
     print(f"\nPolitical leaning analysis saved as '{filename}'")
 
-def create_leaning_visualization(results, use_ner=False):
+def create_leaning_visualization(results, use_ner=False, dpi=FIGURE_DPI, fmt='png', filename=None):
     if not results:
         print("No political leaning results to visualize")
         return
     
+    plt = _pyplot()
     fig, axes = plt.subplots(1, 3, figsize=(18, 8))
     
     leaning_colors = {
@@ -314,21 +647,18 @@ def create_leaning_visualization(results, use_ner=False):
             axes[i].text(score + max(scores) * 0.01, j, f'{score:.3f}', 
                         va='center', fontsize=9)
     
-    actual_ner_used = use_ner and NER_AVAILABLE
-    method_suffix = "ner" if actual_ner_used else "manual"
-    
-    viz_folder = "Visualizations"
-    if not os.path.exists(viz_folder):
-        os.makedirs(viz_folder)
-    
-    filename = os.path.join(viz_folder, f'tfidf_political_leaning_{method_suffix}.png')
+    if filename is None:
+        filename = figure_path('leaning', use_ner, fmt)
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
     
     plt.suptitle('TF-IDF Analysis by Political Leaning', fontsize=16, fontweight='bold')
     plt.tight_layout()
-    plt.savefig(filename, dpi=300, bbox_inches='tight')
+    plt.savefig(filename, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
     print(f"Political leaning visualization saved as '{filename}'")
+    return filename
 
-def create_visualizations(results, use_ner=False):
+def create_visualizations(results, use_ner=False, dpi=FIGURE_DPI, fmt='png', filename=None):
     if not results:
         print("No results to visualize")
         return
@@ -344,6 +674,7 @@ def create_visualizations(results, use_ner=False):
         rows, cols = 3, 3
         figsize = (15, 15)
     
+    plt = _pyplot()
     fig, axes = plt.subplots(rows, cols, figsize=figsize)
     
     if num_categories == 1:
@@ -382,116 +713,400 @@ def create_visualizations(results, use_ner=False):
         axes[i].remove()
     
    
-    actual_ner_used = use_ner and NER_AVAILABLE
-    method_suffix = "ner" if actual_ner_used else "manual"
-    
-    import os
-    viz_folder = "Visualizations"
-    if not os.path.exists(viz_folder):
-        os.makedirs(viz_folder)
-    
-    filename = os.path.join(viz_folder, f'tfidf_visualization_{method_suffix}.png')
+    if filename is None:
+        filename = figure_path('categories', use_ner, fmt)
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
     
     plt.suptitle('TF-IDF Analysis: Media Coverage of Gavin Newsom (21.10.2025-25.11.2025)', fontsize=16, fontweight='bold')
     plt.tight_layout()
-    plt.savefig(filename, dpi=300, bbox_inches='tight')
+    plt.savefig(filename, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
     #plt.show()
     print(f"\nVisualization saved as '{filename}'")
+    return filename
+
+def print_top_words(results, heading, label):
+    print("\n" + "=" * 60)
+    print(heading)
+    print("=" * 60)
+    
+    for group, top_words in results.items():
+        print(f"\n{label}: {group}")
+        print("-" * 40)
+        print("Top words by TF-IDF score:")
+        
+        for i, (word, score) in enumerate(top_words, 1):
+            print(f"{i:2d}. {word:<25} {score:.4f}")
+    
+    print("\n" + "=" * 60)
+
+GROUPINGS = ('categories', 'leaning')
+OUTPUTS = ('text', 'figures')
+
+def _document_frequency(value):
+    # min_df / max_df: an integer is a document count, a float a proportion
+    number = float(value)
+    return int(number) if number.is_integer() and '.' not in value else number
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="TF-IDF top words per category and per political leaning.",
+    )
+    data = parser.add_argument_group('data')
+    data.add_argument('--input', metavar='PATH',
+                      help="annotated dataset (default: data_annotated_with_leaning.* in the "
+                           "current or script directory)")
+    data.add_argument('--format', choices=['csv', 'parquet', 'feather'],
+                      help="format to look for when --input is not given (default: Parquet, then Feather, then CSV)")
+    data.add_argument('--stream-chunk-size', type=int, metavar='ROWS',
+                      help="stream the dataset in chunks of ROWS instead of loading it whole")
+
+    analysis = parser.add_argument_group('analysis')
+    analysis.add_argument('--backend', choices=['manual', 'ner'], default='manual',
+                          help="entity normalization: manual mappings or spaCy NER (default: manual)")
+    analysis.add_argument('--groupings', nargs='+', choices=GROUPINGS, default=list(GROUPINGS),
+                          help="groupings to compute (default: both)")
+    analysis.add_argument('--top-n', type=int, default=number_idf_words, metavar='N',
+                          help=f"top words per group (default: {number_idf_words})")
+    analysis.add_argument('--max-features', type=int, default=MAX_FEATURES,
+                          help=f"vocabulary size per group (default: {MAX_FEATURES})")
+    analysis.add_argument('--min-df', type=_document_frequency, default=MIN_DF,
+                          help=f"minimum document count (int) or proportion (float) (default: {MIN_DF})")
+    analysis.add_argument('--max-df', type=_document_frequency, default=MAX_DF,
+                          help=f"maximum document count (int) or proportion (float) (default: {MAX_DF})")
+    analysis.add_argument('--dedup', choices=['collapse', 'downweight'],
+                          help="find near-duplicate (e.g. syndicated) articles and keep one per cluster "
+                               "(collapse) or weight each by 1 / cluster size (downweight)")
+    analysis.add_argument('--bootstrap', type=int, default=0, metavar='RESAMPLES',
+                          help="also report confidence intervals and rank stability of the top words "
+                               "from RESAMPLES bootstrap resamples per group (e.g. 200)")
+    analysis.add_argument('--comparative', action='store_true',
+                          help="also report the terms that set each group apart from the others "
+                               "(log-odds z-scores over one shared count matrix)")
+    analysis.add_argument('--window', metavar='LENGTH',
+                          help="also report the top words per group in rolling date windows of this "
+                               "length, e.g. 7D or 36h (needs a date column)")
+    analysis.add_argument('--window-step', default='1D', metavar='STEP',
+                          help="distance between rolling window starts (default: 1D)")
+    analysis.add_argument('--date-column', default='date',
+                          help="article date column for --window (default: date)")
+
+    performance = parser.add_argument_group('performance')
+    performance.add_argument('--workers', type=int, default=1,
+                             help="processes for text cleaning (default: 1)")
+    performance.add_argument('--n-process', type=int, default=1,
+                             help="spaCy processes for NER normalization (default: 1)")
+    performance.add_argument('--no-cache', action='store_true', help="do not use the normalized text cache")
+    performance.add_argument('--profile-stage', metavar='STAGE',
+                             help="run one stage (e.g. clean) under cProfile")
 
-def main():
-    USE_NER = False  # True to use Named Entity Recognition, False for manual normalization
+    output = parser.add_argument_group('output')
+    output.add_argument('--outputs', nargs='+', choices=list(OUTPUTS) + ['png', 'none'], default=list(OUTPUTS),
+                        help="files to write to Visualizations/: text report, figures ('png' is an alias), "
+                             "or none (default: text figures)")
+    output.add_argument('--figure-format', choices=FIGURE_FORMATS, default='png',
+                        help="figure file format; svg and pdf are vector formats (default: png)")
+    output.add_argument('--dpi', type=int, default=FIGURE_DPI,
+                        help=f"figure resolution, e.g. 100 for quick previews (default: {FIGURE_DPI})")
+    output.add_argument('--render-workers', type=int,
+                        help="processes drawing figures (default: one per CPU, at most one per figure)")
+    output.add_argument('--force-render', action='store_true',
+                        help="redraw figures even when results and settings are unchanged")
+    output.add_argument('--save-matrices', action='store_true',
+                        help="save the fitted TF-IDF matrices, vocabularies and IDF vectors of every group "
+                             "and of the whole corpus to .cache/tfidf_matrices_<backend> for reuse")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    use_ner = args.backend == 'ner'
+    outputs = set() if 'none' in args.outputs else {'figures' if o == 'png' else o for o in args.outputs}
+    with_categories = 'categories' in args.groupings
+    with_leaning = 'leaning' in args.groupings
     
-    print(f"Using {'NER (Named Entity Recognition)' if USE_NER else 'Manual Entity Normalization'}")
-    if USE_NER and not NER_AVAILABLE:
+    print(f"Using {'NER (Named Entity Recognition)' if use_ner else 'Manual Entity Normalization'}")
+    if use_ner and not ner_available():
         print("NER requested but not available. Falling back to manual normalization.")
-        USE_NER = False
+        use_ner = False
+    
+    # wall/CPU time, peak memory and docs/s of every stage, saved next to the visualizations
+    from profiling import PipelineProfiler
+    profiler = PipelineProfiler(report_dir='Visualizations', profile_stage=args.profile_stage)
         
     try:
         import os
         
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        csv_path = os.path.join(script_dir, 'data_annotated_with_leaning.csv')
+        from data_io import find_table, read_table
         
-        if os.path.exists('data_annotated_with_leaning.csv'):
-            df = pd.read_csv('data_annotated_with_leaning.csv')
-        elif os.path.exists(csv_path):
-            df = pd.read_csv(csv_path)
+        if args.input is not None:
+            csv_path = args.input
+            if not os.path.exists(csv_path):
+                raise FileNotFoundError(csv_path)
         else:
+            script_dir = os.path.dirname(os.path.abspath(__file__))
+            base_name = 'data_annotated_with_leaning'
+            if args.format is not None:
+                candidates = [os.path.join(directory, f'{base_name}.{args.format}') for directory in ('.', script_dir)]
+                csv_path = next((path for path in candidates if os.path.exists(path)), None)
+            else:
+                # Parquet/Feather are preferred over CSV when several formats exist
+                csv_path = find_table(base_name) or find_table(base_name, script_dir)
+        
+        if csv_path is None:
             raise FileNotFoundError("data_annotated_with_leaning.csv not found")
         
-        print(f"Loaded {len(df)} articles")
+        # a re-run on an unchanged file reopens the tokenized corpus instead of loading and cleaning it
+        from token_store import store_dir
+        store, store_path = None, store_dir(use_ner)
+        if args.stream_chunk_size is None and not args.no_cache:
+            from token_store import TokenStore, store_key
+            with profiler.stage('load_token_store') as stage:
+                store = TokenStore.load_matching(store_key(csv_path, use_ner), store_path)
+                stage['n_documents'] = len(store) if store is not None else 0
+        
+        if store is not None:
+            df = store.frame()
+            print(f"Loaded {len(df)} tokenized articles from '{store_path}' ({csv_path} is unchanged)")
+        elif args.stream_chunk_size is None:
+            with profiler.stage('load') as stage:
+                df = read_table(csv_path, columns=ARTICLE_COLUMNS)
+                stage['n_documents'] = len(df)
+            print(f"Loaded {len(df)} articles from {csv_path}")
+        else:
+            print(f"Streaming {csv_path} in chunks of {args.stream_chunk_size} rows")
     except FileNotFoundError:
-        print("Error: data_annotated_with_leaning.csv not found in current directory or script directory")
+        print(f"Error: {args.input or 'data_annotated_with_leaning.csv'} not found"
+              f"{'' if args.input else ' in current directory or script directory'}")
         print("Please run the add_publisher_leaning.py script first to generate this file.")
         return  
     except Exception as e:
         print(f"Error loading data: {e}")
         return  
     
-    print(f"Dataset shape: {df.shape}")                   
-    print(f"Categories: {df['Categories'].nunique()} unique categories")  
-    print(f"Articles per category:")
-    print(df['Categories'].value_counts())                 
-    print()  
+    if args.stream_chunk_size is None:
+        print(f"Dataset shape: {df.shape}")                   
+        print(f"Categories: {df['Categories'].nunique()} unique categories")  
+        print(f"Articles per category:")
+        print(df['Categories'].value_counts())                 
+        print()  
     
     # run analyses
     print("\n" + "=" * 80)
     print("STARTING TF-IDF ANALYSIS")
     print("=" * 80)
     
-    # regular category analysis
-    results = analyze_categories(df, use_ner=USE_NER)
-    
-    print("\n" + "=" * 60)
-    print("TF-IDF RESULTS BY CATEGORY")
-    print("=" * 60)
-    
-    for category, top_words in results.items():
-        print(f"\nCategory: {category}")
-        print("-" * 40)
-        print("Top words by TF-IDF score:")
-        
-        for i, (word, score) in enumerate(top_words, 1):
-            print(f"{i:2d}. {word:<25} {score:.4f}")
-    
-    print("\n" + "=" * 60)
+    vectorizer_options = dict(max_features=args.max_features, min_df=args.min_df, max_df=args.max_df)
+    results, leaning_results, stability, comparisons, windows = {}, {}, {}, {}, []
+    if args.stream_chunk_size is not None:
+        for option, used in (('--dedup', args.dedup), ('--bootstrap', args.bootstrap),
+                             ('--comparative', args.comparative), ('--save-matrices', args.save_matrices),
+                             ('--window', args.window)):
+            if used:
+                print(f"{option} needs the in-memory analysis and is ignored with --stream-chunk-size")
     
-    # political leaning analysis
-    leaning_results = analyze_categories_by_political_leaning(df, use_ner=USE_NER)
+    # unchanged articles come from the normalized text cache
+    from text_cache import NormalizedTextCache, DEFAULT_CACHE_PATH
+    with NormalizedTextCache(DEFAULT_CACHE_PATH) if not args.no_cache else nullcontext() as cache:
+        if args.stream_chunk_size is not None:
+            from streaming import analyze_csv_streaming
+            results, leaning_results = analyze_csv_streaming(
+                csv_path, use_ner=use_ner, chunk_size=args.stream_chunk_size, cache=cache,
+                workers=args.workers, n_process=args.n_process, n_words=args.top_n, profiler=profiler,
+                categories=with_categories, leaning=with_leaning, **vectorizer_options,
+            )
+            if with_categories:
+                print_top_words(results, "TF-IDF RESULTS BY CATEGORY", "Category")
+        else:
+            # clean every article once and store its token IDs, shared by every analysis
+            corpus = None
+            if store is None:
+                from token_store import LABEL_COLUMNS, TokenStore, store_key
+                with profiler.stage('clean', len(df)):
+                    corpus = PreparedCorpus(df, use_ner=use_ner, n_process=args.n_process, cache=cache,
+                                            workers=args.workers)
+                with profiler.stage('tokenize', len(df)):
+                    store = TokenStore.from_texts(
+                        corpus.texts, df[[column for column in LABEL_COLUMNS if column in df.columns]],
+                        key=None if args.no_cache else store_key(csv_path, use_ner))
+                    if not args.no_cache:
+                        store.save(store_path)
+                print(f"Token store: {len(store.vocabulary)} terms, {len(store.tokens)} tokens, "
+                      f"{store.nbytes / 1024:.0f} KiB")
+
+            # near-duplicate clusters (syndicated stories), found on the stored tokens
+            rows, weights = None, None
+            if args.dedup:
+                from dedup import NearDuplicates, print_duplicate_report
+                with profiler.stage('dedup', len(df)):
+                    duplicates = NearDuplicates.from_token_store(store)
+                # a reopened store has no titles, so the report reads just that column
+                articles = df if 'title' in df.columns else df.join(read_table(csv_path, columns=['title']))
+                print_duplicate_report(duplicates, articles)
+                if 'text' in outputs:
+                    duplicates_path = os.path.join('Visualizations',
+                                                   f"duplicate_clusters_{'ner' if use_ner else 'manual'}.csv")
+                    os.makedirs('Visualizations', exist_ok=True)
+                    duplicates.cluster_frame(articles).to_csv(duplicates_path, index_label='article')
+                    print(f"Duplicate clusters saved as '{duplicates_path}'")
+                if args.dedup == 'collapse':
+                    rows = duplicates.is_representative
+                    df = df[rows]
+                    print(f"Kept {len(df)} articles, one per near-duplicate cluster")
+                else:
+                    weights = duplicates.weights
+
+            # every grouping is scored from the same count matrix, built from the token IDs
+            from group_tfidf import GroupTfidfEngine
+            with profiler.stage('vectorize', len(df)):
+                engine = GroupTfidfEngine.from_token_store(store, rows=rows, weights=weights, **vectorizer_options)
+
+            # regular category analysis
+            if with_categories:
+                with profiler.stage('score_categories', len(df)):
+                    results = analyze_categories(df, use_ner=use_ner, corpus=corpus, engine=engine,
+                                                 n_words=args.top_n)
+                print_top_words(results, "TF-IDF RESULTS BY CATEGORY", "Category")
+                profiler.record_groups('Categories', engine.vocabulary_sizes(df['Categories']))
+
+            # political leaning analysis
+            if with_leaning:
+                with profiler.stage('score_leaning', len(df)):
+                    leaning_results = analyze_categories_by_political_leaning(
+                        df, use_ner=use_ner, corpus=corpus, engine=engine, n_words=args.top_n
+                    )
+                if 'grouped_leaning' in df.columns:
+                    profiler.record_groups('grouped_leaning', engine.vocabulary_sizes(df['grouped_leaning']))
+
+            # how much the top words move when the articles of each group are resampled
+            if args.bootstrap:
+                from bootstrap import bootstrap_stability
+                with profiler.stage('bootstrap', len(df)):
+                    if with_categories:
+                        stability['Categories'] = bootstrap_stability(
+                            engine, df['Categories'], n_words=args.top_n, n_resamples=args.bootstrap)
+                    if with_leaning and 'grouped_leaning' in df.columns:
+                        by_leaning = bootstrap_stability(
+                            engine, df['grouped_leaning'], n_words=args.top_n, n_resamples=args.bootstrap)
+                        stability['grouped_leaning'] = {leaning: by_leaning[leaning] for leaning in leaning_results}
+
+            # terms that set each group apart, compared on the shared count matrix
+            if args.comparative:
+                from comparative import compare_groups
+                with profiler.stage('comparative', len(df)):
+                    if with_categories:
+                        comparisons['Categories'] = compare_groups(engine, df['Categories'], n_words=args.top_n)
+                    if with_leaning and 'grouped_leaning' in df.columns:
+                        by_leaning = compare_groups(engine, df['grouped_leaning'], n_words=args.top_n)
+                        # Left, Right, Neutral as in the rest of the report, each against the rest first
+                        order = {leaning: i for i, leaning in enumerate(['rest', 'Left', 'Right', 'Neutral'])}
+                        comparisons['grouped_leaning'] = dict(sorted(
+                            by_leaning.items(), key=lambda item: (order[item[0][0]], order[item[0][1]])))
+
+            # top words in rolling date windows, updated at the window edges on the shared counts
+            if args.window:
+                from rolling import RollingGroupTfidf, group_labels
+                groupings = [column for column, wanted in (('Categories', with_categories),
+                                                           ('grouped_leaning', with_leaning)) if wanted]
+                try:
+                    # the date column is not among the analysis columns, so it is read on its own
+                    dates = read_table(csv_path, columns=[args.date_column])[args.date_column]
+                except Exception as e:
+                    print(f"--window needs a '{args.date_column}' column in {csv_path}: {e}")
+                else:
+                    with profiler.stage('rolling', len(df)):
+                        rolling = RollingGroupTfidf(engine, dates, group_labels(df, groupings))
+                        windows = list(rolling.windows(args.window, args.window_step, n_words=args.top_n))
+
+            # the fitted matrices of every group, memory-mappable by later runs and notebooks
+            if args.save_matrices:
+                from tfidf_matrices import TfidfMatrices
+                matrices_path = os.path.join('.cache', f"tfidf_matrices_{'ner' if use_ner else 'manual'}")
+                with profiler.stage('save_matrices', len(df)):
+                    groupings = {column: df[column] for column in ('Categories', 'grouped_leaning')
+                                 if column in df.columns}
+                    matrices = TfidfMatrices.from_engine(engine, groupings, metadata={
+                        'input': os.path.abspath(csv_path), 'use_ner': use_ner, 'dedup': args.dedup,
+                        **vectorizer_options})
+                    matrices.save(matrices_path)
+                print(f"TF-IDF matrices saved in '{matrices_path}' ({matrices.nbytes / 1024:.0f} KiB)")
+        cache_stats = cache.stats() if cache is not None else None
+    if cache_stats is not None:
+        print(f"Normalized text cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+              f"({cache_stats['entries']} entries, {cache_stats['bytes'] / 1024:.0f} KiB)")
     
     # print leaning results
     if leaning_results:
-        print("\n" + "=" * 60)
-        print("TF-IDF RESULTS BY POLITICAL LEANING")
-        print("=" * 60)
-        
-        for leaning, top_words in leaning_results.items():
-            print(f"\nPolitical Leaning: {leaning}")
-            print("-" * 40)
-            print("Top words by TF-IDF score:")
-            
-            for i, (word, score) in enumerate(top_words, 1):
-                print(f"{i:2d}. {word:<25} {score:.4f}")
-        
-        print("\n" + "=" * 60)
+        print_top_words(leaning_results, "TF-IDF RESULTS BY POLITICAL LEANING", "Political Leaning")
     
-    # visualization for regular analysis
-    try:
-        create_visualizations(results, use_ner=USE_NER)
-    except Exception as e:
-        print(f"Error creating visualization: {e}")
+    if stability:
+        from bootstrap import print_stability, stability_frame
+        headings = {'Categories': ("BOOTSTRAP STABILITY BY CATEGORY", "Category"),
+                    'grouped_leaning': ("BOOTSTRAP STABILITY BY POLITICAL LEANING", "Political Leaning")}
+        for column, by_group in stability.items():
+            print_stability(by_group, *headings[column])
+        if 'text' in outputs:
+            stability_path = os.path.join('Visualizations', f"tfidf_bootstrap_{'ner' if use_ner else 'manual'}.csv")
+            os.makedirs('Visualizations', exist_ok=True)
+            pd.concat([stability_frame(by_group, column)
+                       for column, by_group in stability.items()]).to_csv(stability_path, index=False)
+            print(f"Bootstrap stability saved as '{stability_path}'")
+    
+    if comparisons:
+        from comparative import REST, comparison_frame, print_comparisons
+        headings = {'Categories': ("DISTINCTIVE TERMS BY CATEGORY (vs the rest)", "Category"),
+                    'grouped_leaning': ("DISTINCTIVE TERMS BY POLITICAL LEANING", "Political Leaning")}
+        for column, by_pair in comparisons.items():
+            # every leaning pair is shown; category pairs only go to the CSV
+            shown = by_pair if column == 'grouped_leaning' else {
+                pair: terms for pair, terms in by_pair.items() if pair[1] == REST}
+            print_comparisons(shown, *headings[column])
+        if 'text' in outputs:
+            comparison_path = os.path.join('Visualizations', f"tfidf_comparative_{'ner' if use_ner else 'manual'}.csv")
+            os.makedirs('Visualizations', exist_ok=True)
+            pd.concat([comparison_frame(by_pair, column)
+                       for column, by_pair in comparisons.items()]).to_csv(comparison_path, index=False)
+            print(f"Comparative analysis saved as '{comparison_path}'")
+    
+    if windows:
+        from rolling import print_window, rolling_frame, rolling_path
+        print("\n" + "=" * 80)
+        print(f"TOP WORDS IN ROLLING {args.window} WINDOWS (every {args.window_step})")
+        print("=" * 80)
+        for window in windows:
+            print_window(window)
+        if 'text' in outputs:
+            os.makedirs('Visualizations', exist_ok=True)
+            rolling_frame(windows).to_csv(rolling_path(use_ner), index=False)
+            print(f"Rolling window results saved as '{rolling_path(use_ner)}'")
     
     # save political leaning analysis to file
-    try:
-        save_leaning_results_to_file(leaning_results, use_ner=USE_NER)
-    except Exception as e:
-        print(f"Error saving political leaning analysis: {e}")
+    if 'text' in outputs and with_leaning:
+        try:
+            with profiler.stage('save'):
+                save_leaning_results_to_file(leaning_results, use_ner=use_ner)
+        except Exception as e:
+            print(f"Error saving political leaning analysis: {e}")
     
-    # create political leaning visualization
-    try:
-        create_leaning_visualization(leaning_results, use_ner=USE_NER)
-    except Exception as e:
-        print(f"Error creating political leaning visualization: {e}")
+    # category and political leaning figures, drawn in parallel; unchanged ones are skipped
+    if 'figures' in outputs:
+        from rendering import render_figures
+        figures = {}
+        if with_categories:
+            figures['categories'] = results
+        if with_leaning:
+            figures['leaning'] = leaning_results
+        # one stage for all figures, plus a visualize_<kind> stage per drawn figure
+        with profiler.stage('render'):
+            render_figures(figures, use_ner=use_ner, dpi=args.dpi, fmt=args.figure_format,
+                           workers=args.render_workers, force=args.force_render, profiler=profiler)
+    
+    profiler.print_summary()
+    method_suffix = "ner" if use_ner else "manual"
+    report_path = profiler.save(f'pipeline_profile_{method_suffix}', metadata={
+        'input': csv_path, 'argv': sys.argv[1:] if argv is None else list(argv),
+        'use_ner': use_ner, 'stream_chunk_size': args.stream_chunk_size,
+    })
+    print(f"Pipeline profile saved as '{report_path}'")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,241 @@
+"""Fitted TF-IDF matrices, saved for reuse across runs.
+
+For every group of every grouping column (and for the whole corpus) this
+keeps what a ``TfidfVectorizer`` fit on the group's articles produces: the
+kept features, their IDF, the L2-normalized TF-IDF matrix (CSR) and its mean
+scores. Everything is derived from the shared count matrix of a
+``GroupTfidfEngine`` without refitting.
+
+On disk all matrices share one vocabulary and are concatenated into a few
+flat ``.npy`` arrays, with offsets per matrix in a JSON manifest. ``load``
+memory-maps the arrays, and every accessor returns views into them, so a
+notebook can look up the scores of a term or an article without recomputing
+anything or reading the whole file. As for the token store, every save writes
+a new numbered array directory before the manifest is replaced, so an
+interrupted save leaves the previous matrices intact.
+"""
+
+import json
+import os
+import shutil
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from group_tfidf import group_idf
+from tfidf import number_idf_words, top_display_words
+from token_store import array_dir, remove_arrays, saved_generation
+
+DEFAULT_MATRIX_DIR = os.path.join('.cache', 'tfidf_matrices')
+MANIFEST_FILE = 'matrices.json'
+CORPUS = 'corpus'  # grouping of the corpus-wide matrix, whose only group is ALL
+ALL = 'all'
+# stored arrays, each with the manifest keys of its offset and its length per matrix
+_ARRAYS = {
+    'rows': ('rows', 'n_rows'),
+    'features': ('features', 'n_features'),
+    'idf': ('features', 'n_features'),
+    'mean_scores': ('features', 'n_features'),
+    'data': ('data', 'nnz'),
+    'indices': ('data', 'nnz'),
+    'indptr': None,  # n_rows + 1 entries per matrix, sliced in ``matrix``
+}
+_DTYPES = {'rows': np.int32, 'features': np.int32, 'indices': np.int32, 'indptr': np.int64}
+
+GroupMatrix = namedtuple('GroupMatrix', ['n_documents', 'rows', 'features', 'idf', 'matrix', 'mean_scores'])
+
+
+def group_matrices(engine, labels):
+    """``{label: GroupMatrix}`` for one grouping column of ``engine``.
+
+    ``rows`` are positions in the engine's documents, ``features`` positions
+    in its vocabulary; ``matrix`` is the (rows x features) TF-IDF matrix of
+    the group's own fit.
+    """
+    codes, groups, n_docs, doc_freq, term_freq = engine._group_frequencies(labels)
+    idf, kept_masks = group_idf(n_docs, doc_freq, term_freq, engine.max_features, engine.min_df, engine.max_df)
+    weights = np.ones(len(codes)) if engine.weights is None else engine.weights
+
+    matrices = {}
+    for g, label in enumerate(groups):
+        rows = np.flatnonzero(codes == g)
+        features = np.flatnonzero(kept_masks[g])
+        matrix = (engine.counts[rows][:, features] @ sparse.diags(idf[g, features])).tocsr()
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        matrix = (sparse.diags(1 / norms) @ matrix).tocsr()
+        matrix.sort_indices()
+        mean_scores = (weights[rows] @ matrix) / n_docs[g]
+        matrices[label] = GroupMatrix(int(round(n_docs[g])), rows, features, idf[g, features], matrix, mean_scores)
+    return matrices
+
+
+class TfidfMatrices:
+    """Per-group and corpus-wide TF-IDF matrices over one shared vocabulary."""
+
+    def __init__(self, vocabulary, documents, entries, arrays, metadata=None):
+        self.vocabulary = np.asarray(vocabulary, dtype=str)
+        self.documents = documents  # index labels of the articles; rows point into it
+        self.entries = entries  # one dict per matrix: grouping, group, n_documents and offsets
+        self.arrays = arrays
+        self.metadata = metadata or {}
+        self._positions = {(entry['grouping'], entry['group']): m for m, entry in enumerate(entries)}
+
+    @classmethod
+    def from_engine(cls, engine, groupings, metadata=None):
+        """Fit every group of ``groupings`` (``{name: labels}``) and the whole corpus from ``engine``."""
+        groupings = {CORPUS: pd.Series(ALL, index=engine.index), **groupings}
+        entries, parts = [], {name: [] for name in _ARRAYS}
+        offsets = {'rows': 0, 'features': 0, 'data': 0}
+        for grouping, labels in groupings.items():
+            for group, fit in group_matrices(engine, labels).items():
+                sizes = {'n_rows': len(fit.rows), 'n_features': len(fit.features), 'nnz': fit.matrix.nnz}
+                entries.append({'grouping': grouping, 'group': group, 'n_documents': fit.n_documents,
+                                **offsets, **sizes})
+                offsets = {'rows': offsets['rows'] + sizes['n_rows'],
+                           'features': offsets['features'] + sizes['n_features'],
+                           'data': offsets['data'] + sizes['nnz']}
+                for name, array in zip(_ARRAYS, (fit.rows, fit.features, fit.idf, fit.mean_scores,
+                                                 fit.matrix.data, fit.matrix.indices, fit.matrix.indptr)):
+                    parts[name].append(array)
+
+        arrays = {name: np.concatenate(parts[name] or [np.zeros(0)]).astype(_DTYPES.get(name, np.float64))
+                  for name in _ARRAYS}
+        return cls(engine.vocabulary, pd.Index(engine.index), entries, arrays, metadata)
+
+    def save(self, path=DEFAULT_MATRIX_DIR):
+        previous = saved_generation(os.path.join(path, MANIFEST_FILE))
+        generation = 0 if previous is None else previous + 1
+        # string and mixed document labels (object dtype) need pickling
+        documents = np.asarray(self.documents)
+        pickled = documents.dtype == object
+
+        directory = array_dir(path, generation)
+        shutil.rmtree(directory, ignore_errors=True)  # left over from an interrupted save
+        os.makedirs(directory)
+        for name, array in self.arrays.items():
+            np.save(os.path.join(directory, f'{name}.npy'), array)
+        np.save(os.path.join(directory, 'documents.npy'), documents, allow_pickle=pickled)
+
+        manifest = {'metadata': self.metadata, 'generation': generation, 'vocabulary': self.vocabulary.tolist(),
+                    'documents': {'name': self.documents.name, 'pickled': bool(pickled)}, 'matrices': self.entries}
+        # the manifest is written last and replaced atomically, so it only ever
+        # names arrays that are completely on disk
+        temp_file = os.path.join(path, MANIFEST_FILE + '.tmp')
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(temp_file, os.path.join(path, MANIFEST_FILE))
+        remove_arrays(path, previous, list(self.arrays) + ['documents'])
+
+    @classmethod
+    def load(cls, path=DEFAULT_MATRIX_DIR, mmap=True):
+        """Reopen saved matrices; the arrays are memory-mapped read-only unless ``mmap`` is False."""
+        with open(os.path.join(path, MANIFEST_FILE), encoding='utf-8') as f:
+            manifest = json.load(f)
+        directory = array_dir(path, manifest.get('generation', -1))
+        mode = 'r' if mmap else None
+        arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mode) for name in _ARRAYS}
+        documents_info = manifest.get('documents', {'name': None, 'pickled': False})
+        if documents_info['pickled']:
+            documents = np.load(os.path.join(directory, 'documents.npy'), allow_pickle=True)
+        else:
+            documents = np.load(os.path.join(directory, 'documents.npy'), mmap_mode=mode)
+        return cls(manifest['vocabulary'], pd.Index(documents, name=documents_info['name']), manifest['matrices'],
+                   arrays, manifest['metadata'])
+
+    def groupings(self):
+        return list(dict.fromkeys(entry['grouping'] for entry in self.entries))
+
+    def groups(self, grouping):
+        return [entry['group'] for entry in self.entries if entry['grouping'] == grouping]
+
+    def _entry(self, grouping, group):
+        try:
+            return self.entries[self._positions[grouping, group]]
+        except KeyError:
+            raise KeyError(f"no TF-IDF matrix for {grouping!r} = {group!r}") from None
+
+    def _slice(self, name, entry):
+        offset, size = _ARRAYS[name]
+        return self.arrays[name][entry[offset]:entry[offset] + entry[size]]
+
+    def feature_names(self, grouping=CORPUS, group=ALL):
+        return self.vocabulary[self._slice('features', self._entry(grouping, group))]
+
+    def idf(self, grouping=CORPUS, group=ALL):
+        return self._slice('idf', self._entry(grouping, group))
+
+    def mean_scores(self, grouping=CORPUS, group=ALL):
+        return self._slice('mean_scores', self._entry(grouping, group))
+
+    def document_index(self, grouping=CORPUS, group=ALL):
+        """Index labels of the articles behind the rows of the group's matrix."""
+        return self.documents[self._slice('rows', self._entry(grouping, group))]
+
+    def matrix(self, grouping=CORPUS, group=ALL):
+        """The group's (articles x features) TF-IDF matrix, backed by the stored arrays."""
+        entry = self._entry(grouping, group)
+        # each matrix has n_rows + 1 indptr entries, stored one matrix after the other
+        start = entry['rows'] + self._positions[grouping, group]
+        indptr = self.arrays['indptr'][start:start + entry['n_rows'] + 1]
+        return sparse.csr_matrix((self._slice('data', entry), self._slice('indices', entry), indptr),
+                                 shape=(entry['n_rows'], entry['n_features']), copy=False)
+
+    def _feature(self, term, entry):
+        # features are sorted vocabulary positions, so a term is two binary searches away
+        position = np.searchsorted(self.vocabulary, term)
+        if position == len(self.vocabulary) or self.vocabulary[position] != term:
+            return None
+        features = self._slice('features', entry)
+        i = np.searchsorted(features, position)
+        return int(i) if i < len(features) and features[i] == position else None
+
+    def term_scores(self, term, grouping=CORPUS):
+        """``{group: (idf, mean_score)}`` of ``term`` in every group of ``grouping`` that kept it."""
+        scores = {}
+        for group in self.groups(grouping):
+            entry = self._entry(grouping, group)
+            i = self._feature(term, entry)
+            if i is not None:
+                scores[group] = (float(self._slice('idf', entry)[i]), float(self._slice('mean_scores', entry)[i]))
+        return scores
+
+    def term_documents(self, term, grouping=CORPUS, group=ALL, n_documents=number_idf_words):
+        """The ``n_documents`` articles with the highest TF-IDF for ``term`` in one group, as a Series."""
+        entry = self._entry(grouping, group)
+        i = self._feature(term, entry)
+        if i is None:
+            return pd.Series(dtype=float)
+        column = self.matrix(grouping, group)[:, i].tocoo()
+        order = np.argsort(-column.data, kind='stable')[:n_documents]
+        rows = self._slice('rows', entry)[column.row[order]]
+        return pd.Series(column.data[order], index=self.documents[rows], name=term)
+
+    def document_scores(self, document, grouping=CORPUS, n_words=number_idf_words):
+        """``{group: [(word, score), ...]}``: the top terms of one article in its group(s) of ``grouping``."""
+        position = self.documents.get_loc(document)
+        scores = {}
+        for group in self.groups(grouping):
+            entry = self._entry(grouping, group)
+            rows = self._slice('rows', entry)
+            r = np.searchsorted(rows, position)
+            if r < len(rows) and rows[r] == position:
+                row = self.matrix(grouping, group)[r]
+                feature_names = self.vocabulary[self._slice('features', entry)[row.indices]]
+                scores[group] = top_display_words(feature_names, row.data, n_words)
+        return scores
+
+    def top_words(self, grouping=CORPUS, n_words=number_idf_words):
+        """``{group: (n_documents, [(display_word, score), ...])}``, as ``GroupTfidfEngine.top_words``."""
+        return {
+            group: (self._entry(grouping, group)['n_documents'],
+                    top_display_words(self.feature_names(grouping, group), self.mean_scores(grouping, group),
+                                      n_words))
+            for group in self.groups(grouping)
+        }
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self.arrays.values()) + self.documents.nbytes
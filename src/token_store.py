@@ -0,0 +1,235 @@
+"""Compact, memory-mapped store of tokenized articles.
+
+Cleaned texts are tokenized once with the analysis tokenizer (stop words
+removed) and stored as token IDs into one sorted, interned vocabulary:
+
+- ``tokens``: every document's token IDs back to back (uint16 while the
+  vocabulary fits, else uint32); document ``i`` is the view
+  ``tokens[offsets[i]:offsets[i + 1]]``
+- ``offsets``: ``n_documents + 1`` int64 positions into ``tokens``
+- ``is_document``: whether the cleaned text was non-blank
+- one small-int code array per label column (-1 for missing), with its
+  categories
+
+Saved as ``.npy`` files plus a JSON header and reopened with ``mmap_mode='r'``,
+so reloading costs a few file opens and the count matrix is built straight
+from the arrays, without strings or re-tokenization. The header records a
+key (input file, normalizer, stop words) so a stale store is never reused.
+Every save writes its arrays to a new numbered directory and then replaces
+the header atomically, so an interrupted save leaves the previous store
+intact, and stores that are still memory-mapped are never overwritten.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from tfidf import custom_stop_words, normalizer_fingerprint
+
+STORE_VERSION = 1
+DEFAULT_STORE_DIR = os.path.join('.cache', 'token_store')
+HEADER_FILE = 'store.json'
+ARRAY_DIR = 'arrays_{:06d}'  # formatted with the save generation
+LABEL_COLUMNS = ('source', 'Categories', 'publisher_leaning')
+
+
+def _code_dtype(n_categories):
+    # signed, since -1 marks a missing label
+    return np.int8 if n_categories < 2 ** 7 else np.int16 if n_categories < 2 ** 15 else np.int32
+
+
+def saved_generation(header_file):
+    """Generation of the arrays a saved header names, or None without a readable header.
+
+    Arrays saved before generations were introduced sit next to the header,
+    as generation -1.
+    """
+    try:
+        with open(header_file, encoding='utf-8') as f:
+            return json.load(f).get('generation', -1)
+    except (OSError, ValueError):
+        return None
+
+
+def array_dir(path, generation):
+    return os.path.join(path, ARRAY_DIR.format(generation)) if generation >= 0 else path
+
+
+def remove_arrays(path, generation, names):
+    """Delete the arrays of an older save of ``path``; files still memory-mapped stay readable."""
+    if generation is None:
+        return
+    if generation >= 0:
+        shutil.rmtree(array_dir(path, generation), ignore_errors=True)
+        return
+    for name in names:
+        if os.path.exists(os.path.join(path, name + '.npy')):
+            os.remove(os.path.join(path, name + '.npy'))
+
+
+def store_dir(use_ner=False):
+    """Where ``tfidf.py`` keeps the store of one normalizer."""
+    return f"{DEFAULT_STORE_DIR}_{'ner' if use_ner else 'manual'}"
+
+
+def store_key(input_path, use_ner=False, stop_words=None):
+    """What a stored corpus depends on: the input file, the normalizer and the stop words."""
+    stat = os.stat(input_path)
+    stop_words = sorted(custom_stop_words() if stop_words is None else stop_words)
+    return {
+        'version': STORE_VERSION,
+        'input': os.path.abspath(input_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'normalizer': normalizer_fingerprint(use_ner),
+        'stop_words': hashlib.sha256('\n'.join(stop_words).encode('utf-8')).hexdigest()[:16],
+    }
+
+
+class TokenStore:
+    """Token-ID documents with a shared vocabulary and coded labels."""
+
+    def __init__(self, tokens, offsets, vocabulary, is_document, index, labels, key=None):
+        self.tokens = tokens
+        self.offsets = offsets
+        self.vocabulary = np.asarray(vocabulary, dtype=object)
+        self.is_document = is_document
+        self.index = index
+        self.labels = labels  # {column: (codes, categories)}
+        self.key = key
+
+    @classmethod
+    def from_texts(cls, texts, labels=None, stop_words=None, key=None):
+        """Tokenize cleaned ``texts`` (a Series) once; ``labels`` is a DataFrame of label columns."""
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        stop_words = custom_stop_words() if stop_words is None else stop_words
+        analyze = CountVectorizer(stop_words=sorted(stop_words)).build_analyzer()
+        texts = texts if isinstance(texts, pd.Series) else pd.Series(list(texts))
+
+        interned = {}
+        ids = []
+        lengths = np.zeros(len(texts), dtype=np.int64)
+        for i, text in enumerate(texts):
+            tokens = analyze(text)
+            ids.extend(interned.setdefault(token, len(interned)) for token in tokens)
+            lengths[i] = len(tokens)
+
+        # IDs follow the sorted vocabulary, as CountVectorizer orders its features
+        terms = np.array(list(interned), dtype=object)
+        order = np.argsort(terms.astype(str), kind='stable')
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        token_dtype = np.uint16 if len(terms) <= np.iinfo(np.uint16).max + 1 else np.uint32
+        tokens = rank[np.asarray(ids, dtype=np.int64)].astype(token_dtype)
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+
+        coded = {}
+        for column in ([] if labels is None else labels.columns):
+            codes, categories = pd.factorize(labels[column].reindex(texts.index), sort=True)
+            coded[column] = (codes.astype(_code_dtype(len(categories))), list(categories))
+
+        is_document = (texts.str.strip() != '').to_numpy()
+        return cls(tokens, offsets, terms[order], is_document, texts.index, coded, key)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def document(self, i):
+        """Token IDs of document ``i`` (a view, no copy)."""
+        return self.tokens[self.offsets[i]:self.offsets[i + 1]]
+
+    def counts(self):
+        """(documents x vocabulary) term-count matrix, as ``CountVectorizer`` would return it."""
+        counts = sparse.csr_matrix(
+            (np.ones(len(self.tokens)), np.asarray(self.tokens, dtype=np.int32), np.array(self.offsets)),
+            shape=(len(self), len(self.vocabulary)),
+        )
+        counts.sum_duplicates()
+        return counts
+
+    def label_series(self, column):
+        codes, categories = self.labels[column]
+        values = np.asarray(categories, dtype=object)[np.maximum(codes, 0)]
+        values[np.asarray(codes) < 0] = None
+        return pd.Series(values, index=self.index, name=column)
+
+    def frame(self):
+        """DataFrame of the label columns, aligned with the stored index."""
+        return pd.DataFrame({column: self.label_series(column) for column in self.labels}, index=self.index)
+
+    @property
+    def nbytes(self):
+        arrays = [self.tokens, self.offsets, self.is_document] + [codes for codes, _ in self.labels.values()]
+        return sum(array.nbytes for array in arrays)
+
+    def save(self, path=DEFAULT_STORE_DIR):
+        previous = saved_generation(os.path.join(path, HEADER_FILE))
+        generation = 0 if previous is None else previous + 1
+        arrays = {'tokens': self.tokens, 'offsets': self.offsets, 'is_document': self.is_document}
+        columns = list(self.labels)
+        for j, column in enumerate(columns):
+            arrays[f'codes_{j}'] = self.labels[column][0]
+        # integer and datetime indexes are stored as they are and memory-mapped;
+        # string and mixed ones (object dtype) need pickling
+        index = np.asarray(self.index)
+        pickled = index.dtype == object
+
+        directory = array_dir(path, generation)
+        shutil.rmtree(directory, ignore_errors=True)  # left over from an interrupted save
+        os.makedirs(directory)
+        for name, array in arrays.items():
+            np.save(os.path.join(directory, name + '.npy'), array)
+        np.save(os.path.join(directory, 'index.npy'), index, allow_pickle=pickled)
+
+        header = {
+            'key': self.key,
+            'generation': generation,
+            'vocabulary': self.vocabulary.tolist(),
+            'labels': [[column, self.labels[column][1]] for column in columns],
+            'index': {'name': self.index.name, 'pickled': bool(pickled)},
+        }
+        # the header is written last and replaced atomically, so it only ever
+        # names arrays that are completely on disk
+        temp_file = os.path.join(path, HEADER_FILE + '.tmp')
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(header, f)
+        os.replace(temp_file, os.path.join(path, HEADER_FILE))
+        remove_arrays(path, previous, list(arrays) + ['index'])
+
+    @classmethod
+    def load(cls, path=DEFAULT_STORE_DIR, mmap=True):
+        """Reopen a saved store; the arrays are memory-mapped read-only unless ``mmap`` is False."""
+        with open(os.path.join(path, HEADER_FILE), encoding='utf-8') as f:
+            header = json.load(f)
+        directory = array_dir(path, header.get('generation', -1))
+        mode = 'r' if mmap else None
+
+        def array(name):
+            return np.load(os.path.join(directory, name + '.npy'), mmap_mode=mode)
+
+        labels = {column: (array(f'codes_{j}'), categories)
+                  for j, (column, categories) in enumerate(header['labels'])}
+        index_info = header.get('index', {'name': None, 'pickled': False})
+        if index_info['pickled']:
+            index = np.load(os.path.join(directory, 'index.npy'), allow_pickle=True)
+        else:
+            index = array('index')
+        return cls(array('tokens'), array('offsets'), header['vocabulary'], array('is_document'),
+                   pd.Index(index, name=index_info['name']), labels, header['key'])
+
+    @classmethod
+    def load_matching(cls, key, path=DEFAULT_STORE_DIR):
+        """The store saved in ``path`` if it was built with ``key``, else None."""
+        try:
+            with open(os.path.join(path, HEADER_FILE), encoding='utf-8') as f:
+                if json.load(f)['key'] != key:
+                    return None
+            return cls.load(path)
+        except (OSError, ValueError, KeyError):
+            return None
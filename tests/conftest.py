@@ -1,13 +1,22 @@
 """Pytest configuration and shared fixtures.
 
 This module provides common fixtures for the test suite including
-temporary directories and environment setup.
+temporary directories, environment setup and seeded synthetic articles.
 """
 
 import pytest
 import tempfile
 import shutil
 import os
+import random
+
+import pandas as pd
+
+WORDS = (
+    "tax budget border climate newsom trump williamson scandal fire water school vote "
+    "election court gavin donald biden harris congress senate house texas governor housing "
+    "rent wildfire insurance redistricting proposition ballot voters lawsuit federal funding"
+).split()
 
 
 @pytest.fixture(scope="session")
@@ -23,4 +32,34 @@ def clean_env(monkeypatch):
     """Clean environment fixture to avoid side effects."""
     original_cwd = os.getcwd()
     yield
-    os.chdir(original_cwd)
\ No newline at end of file
+    os.chdir(original_cwd)
+
+
+@pytest.fixture
+def corpus_words():
+    """Vocabulary of the synthetic articles."""
+    return list(WORDS)
+
+
+@pytest.fixture
+def make_articles():
+    """Factory for seeded synthetic articles.
+
+    ``make_articles(n, seed, **columns)`` returns ``n`` articles with a title
+    of three distinct words and a body of ``body_length`` (a range) words,
+    indexed from ``start``, without the words in ``exclude`` (terms a test
+    plants in chosen articles itself). Every other keyword argument adds a
+    label column: a list is drawn from at random, any other value is repeated.
+    """
+    def make(n, seed, body_length=(5, 30), start=0, exclude=(), **columns):
+        words = [word for word in WORDS if word not in exclude]
+        rng = random.Random(seed)
+        df = pd.DataFrame({
+            'title': [' '.join(rng.sample(words, 3)) for _ in range(n)],
+            'body': [' '.join(rng.choices(words, k=rng.randint(*body_length))) for _ in range(n)],
+        }, index=range(start, start + n))
+        for column, values in columns.items():
+            df[column] = [rng.choice(values) for _ in range(n)] if isinstance(values, list) else values
+        return df
+
+    return make
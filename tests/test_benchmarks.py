@@ -0,0 +1,65 @@
+"""
+Tests for the synthetic corpus generator and the benchmark runner.
+"""
+
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import synthetic_corpus
+from synthetic_corpus import generate_corpus, iter_corpus
+from profiling import Measurement
+from run_benchmarks import run
+
+
+class TestSyntheticCorpus:
+    def test_schema(self):
+        df = generate_corpus(50, seed=1)
+
+        assert list(df.columns) == ['title', 'body', 'source', 'Categories', 'publisher_leaning']
+        assert len(df) == 50
+        assert df.notna().all().all()
+        assert set(df['Categories']) <= set(synthetic_corpus.CATEGORY_TOPICS)
+
+    def test_seeded(self):
+        pd.testing.assert_frame_equal(generate_corpus(120, seed=3), generate_corpus(120, seed=3))
+        assert not generate_corpus(120, seed=3).equals(generate_corpus(120, seed=4))
+
+    def test_blocks_are_prefix_stable(self, monkeypatch):
+        monkeypatch.setattr(synthetic_corpus, 'BLOCK_SIZE', 40)
+        small = generate_corpus(50, seed=2)
+        large = generate_corpus(130, seed=2)
+
+        assert [len(block) for block in iter_corpus(130, seed=2)] == [40, 40, 40, 10]
+        pd.testing.assert_frame_equal(large.head(40), small.head(40))
+
+
+class TestBenchmarks:
+    def test_measurement(self):
+        with Measurement() as measurement:
+            data = bytearray(32 * 1024 * 1024)
+        del data
+
+        stats = measurement.as_dict()
+        assert stats['wall_s'] > 0
+        assert stats['peak_rss_mb'] >= stats['rss_growth_mb'] >= 0
+
+    def test_run_saves_results(self, tmp_path):
+        records, json_path = run(sizes=[200], only=['clean_texts', 'analyze_categories', 'update_categories'],
+                                 label='test', results_dir=str(tmp_path))
+
+        assert [r['benchmark'] for r in records] == ['clean_texts', 'analyze_categories', 'update_categories']
+        assert records[0]['n_items'] == 400  # titles and bodies
+        assert all(r['items_per_s'] > 0 for r in records)
+
+        with open(json_path, encoding='utf-8') as f:
+            saved = json.load(f)
+        assert saved['metadata']['label'] == 'test'
+        assert saved['results'] == records
+        assert os.path.exists(json_path[:-len('.json')] + '.csv')
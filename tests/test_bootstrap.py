@@ -0,0 +1,75 @@
+"""
+Tests for the bootstrap stability of the top TF-IDF words.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import tfidf
+from bootstrap import bootstrap_stability, resample_scores, stability_frame
+from group_tfidf import GroupTfidfEngine
+
+
+@pytest.fixture
+def articles(make_articles):
+    df = make_articles(90, 11, body_length=(8, 25), exclude=['wildfire'], source='CNBC',
+                       Categories=['Economy', 'Politics', 'Environment'])
+    # wildfire dominates half of the Environment articles (all of them would exceed max_df)
+    environment = df.index[df['Categories'] == 'Environment'][::2]
+    df.loc[environment, 'body'] += ' wildfire' * 10
+    df.loc[0, 'Categories'] = 'Tiny'
+    return df
+
+
+def test_resample_matches_refit_on_drawn_documents(articles):
+    corpus = tfidf.PreparedCorpus(articles)
+    engine = GroupTfidfEngine.from_corpus(corpus)
+    rows = np.flatnonzero(articles['Categories'] == 'Politics')
+    drawn = np.random.default_rng(3).integers(0, len(rows), len(rows))
+    weights = sparse.csr_matrix(np.bincount(drawn, minlength=len(rows))[None, :], dtype=float)
+
+    scores = resample_scores(engine.counts[rows], weights, tfidf.MAX_FEATURES, tfidf.MIN_DF, tfidf.MAX_DF)[0]
+
+    expected = tfidf.get_top_tfidf_word(corpus.texts.iloc[rows[drawn]].tolist())
+    assert [word for word, _ in tfidf.top_display_words(engine.vocabulary, scores)] == \
+        [word for word, _ in expected]
+    np.testing.assert_allclose([score for _, score in tfidf.top_display_words(engine.vocabulary, scores)],
+                               [score for _, score in expected])
+
+
+def test_stability_report(articles):
+    engine = GroupTfidfEngine.from_corpus(tfidf.PreparedCorpus(articles))
+
+    stability = bootstrap_stability(engine, articles['Categories'], n_words=5, n_resamples=60)
+
+    assert set(stability) == {'Economy', 'Politics', 'Environment'}  # 'Tiny' has one article
+    expected = engine.top_words(articles['Categories'], n_words=5)
+    for category, words in stability.items():
+        assert [word.word for word in words] == [word for word, _ in expected[category][1]]
+        assert [word.score for word in words] == pytest.approx([score for _, score in expected[category][1]])
+        for word in words:
+            assert word.ci_low <= word.ci_high
+            assert 0 <= word.top_n_rate <= 1 and word.median_rank >= 1
+    assert stability['Environment'][0].word == 'wildfire'
+    assert stability['Environment'][0].top_n_rate == 1.0
+    assert stability['Environment'][0].median_rank == 1
+
+
+def test_seed_fixes_results_whatever_the_batch_size(articles):
+    engine = GroupTfidfEngine.from_corpus(tfidf.PreparedCorpus(articles))
+
+    one_batch = bootstrap_stability(engine, articles['Categories'], n_resamples=40, batch_size=40, seed=4)
+    many_batches = bootstrap_stability(engine, articles['Categories'], n_resamples=40, batch_size=7, seed=4)
+    other_seed = bootstrap_stability(engine, articles['Categories'], n_resamples=40, seed=5)
+
+    assert one_batch == many_batches
+    assert one_batch != other_seed
+    frame = stability_frame(one_batch, 'Categories')
+    assert list(frame.columns[:3]) == ['grouping', 'group', 'rank']
+    assert len(frame) == sum(len(words) for words in one_batch.values())
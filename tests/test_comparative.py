@@ -0,0 +1,73 @@
+"""
+Tests for the comparative (log-odds) term analysis.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import tfidf
+from comparative import REST, compare_groups, comparison_frame, log_odds_against_rest, pairwise_log_odds
+from group_tfidf import GroupTfidfEngine
+
+
+@pytest.fixture
+def articles(make_articles):
+    df = make_articles(90, 13, body_length=(8, 25), exclude=['wildfire'], source='CNBC',
+                       grouped_leaning=['Left', 'Right', 'Neutral'])
+    # wildfire is a Left word
+    left = df['grouped_leaning'] == 'Left'
+    df.loc[left, 'body'] += ' wildfire wildfire'
+    return df
+
+
+def test_log_odds_formula():
+    counts = np.array([[10.0, 2.0, 0.0], [3.0, 6.0, 1.0]])
+    prior = np.array([1.3, 0.8, 0.1])
+
+    delta, z_scores = log_odds_against_rest(counts, prior)
+
+    # group 0, term 0 (Monroe et al. 2008, eq. 16 and 20)
+    a0 = prior.sum()
+    expected = (np.log((10 + 1.3) / (12 + a0 - 10 - 1.3)) - np.log((3 + 1.3) / (10 + a0 - 3 - 1.3)))
+    assert delta[0, 0] == pytest.approx(expected)
+    assert z_scores[0, 0] == pytest.approx(expected / np.sqrt(1 / 11.3 + 1 / 4.3))
+    # with two groups, the rest of one group is the other
+    pair_delta, pair_z = pairwise_log_odds(counts, prior)
+    np.testing.assert_allclose(pair_delta[0, 1], delta[0])
+    np.testing.assert_allclose(pair_z[0, 1], z_scores[0])
+
+
+def test_pairs_are_antisymmetric():
+    counts = np.random.default_rng(0).integers(0, 20, size=(4, 30)).astype(float)
+    prior = 0.1 * counts.sum(axis=0) + 0.01
+
+    delta, z_scores = pairwise_log_odds(counts, prior)
+
+    np.testing.assert_allclose(delta, -delta.transpose(1, 0, 2))
+    np.testing.assert_allclose(z_scores, -z_scores.transpose(1, 0, 2))
+    assert not z_scores[np.arange(4), np.arange(4)].any()
+
+
+def test_distinctive_terms(articles):
+    engine = GroupTfidfEngine.from_corpus(tfidf.PreparedCorpus(articles))
+
+    comparisons = compare_groups(engine, articles['grouped_leaning'], n_words=5)
+
+    groups = {'Left', 'Right', 'Neutral'}
+    assert set(comparisons) == {(group, REST) for group in groups} | {
+        (group, other) for group in groups for other in groups if group != other}
+    top = comparisons['Left', REST][0]
+    assert top.word == 'wildfire' and top.z_score > 3 and top.other_count == 0
+    assert comparisons['Left', 'Right'][0].word == 'wildfire'
+    assert 'wildfire' not in [term.word for term in comparisons['Right', 'Left']]
+    for terms in comparisons.values():
+        assert [term.z_score for term in terms] == sorted((term.z_score for term in terms), reverse=True)
+
+    frame = comparison_frame(comparisons, 'grouped_leaning')
+    assert len(frame) == 9 * 5
+    assert set(frame['compared_with']) == groups | {REST}
@@ -0,0 +1,80 @@
+"""
+Tests for MinHash/LSH near-duplicate detection.
+"""
+
+import os
+import random
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from dedup import NearDuplicates, minhash_signatures, shingle_hashes
+from group_tfidf import GroupTfidfEngine
+
+
+@pytest.fixture
+def texts(corpus_words):
+    rng = random.Random(17)
+    originals = [' '.join(rng.choices(corpus_words, k=80)) for _ in range(60)]
+    texts = list(originals)
+    texts += [originals[0]] * 3  # syndicated four times in total
+    edited = originals[1].split()
+    edited[40] = 'edited'
+    texts.append(' '.join(edited))  # a copy with one changed word
+    texts.append('')
+    return pd.Series(texts, index=range(100, 100 + len(texts)))
+
+
+def test_shingles():
+    hashes, counts = shingle_hashes(['a b c d', 'x y', '', 'a b c d'])
+
+    assert counts.tolist() == [2, 1, 0, 2]
+    assert hashes[:2].tolist() == hashes[-2:].tolist()
+    assert len(set(hashes[:3].tolist())) == 3
+
+
+def test_signatures_estimate_jaccard():
+    first = ' '.join(f'w{i}' for i in range(200))
+    second = ' '.join(f'w{i}' for i in range(100, 300))  # 98 of 298 shingles shared
+
+    signatures = minhash_signatures([first, second], num_perm=512)
+
+    assert (signatures[0] == signatures[1]).mean() == pytest.approx(98 / 298, abs=0.07)
+    np.testing.assert_array_equal(minhash_signatures([first, second], num_perm=512, chunk_size=1), signatures)
+
+
+def test_clusters(texts):
+    duplicates = NearDuplicates(texts)
+
+    clusters = pd.Series(duplicates.cluster, index=texts.index)
+    assert clusters.loc[[100, 160, 161, 162]].nunique() == 1
+    assert clusters.loc[101] == clusters.loc[163]
+    assert (duplicates.cluster_size > 1).sum() == 6  # nothing else is merged
+    assert duplicates.is_representative[[0, 1]].all() and not duplicates.is_representative[[60, 61, 62, 63]].any()
+    assert duplicates.weights[0] == 0.25
+
+    stats = duplicates.stats()
+    assert stats['clusters'] == 2 and stats['redundant_documents'] == 4
+    assert stats['size_histogram'] == {2: 1, 4: 1}
+    frame = duplicates.cluster_frame()
+    assert frame['cluster_size'].tolist() == [4, 4, 4, 4, 2, 2]
+
+
+def test_downweighting_matches_collapsing(texts):
+    labels = pd.Series(['Left'] * 40 + ['Right'] * 20 + ['Left'] * 3 + ['Right'] * 2, index=texts.index)
+    duplicates = NearDuplicates(texts)
+    weights = pd.Series(duplicates.weights, index=texts.index)
+    weights[101] = 1  # the edited copy is not identical, so it is left out
+
+    weighted = GroupTfidfEngine(texts.drop(163), weights=weights.drop(163))
+    collapsed = GroupTfidfEngine(texts[duplicates.is_representative])
+
+    expected = collapsed.score_groups(labels)
+    for label, scores in weighted.score_groups(labels).items():
+        assert scores.n_documents == expected[label].n_documents
+        np.testing.assert_array_equal(scores.feature_names, expected[label].feature_names)
+        np.testing.assert_allclose(scores.mean_scores, expected[label].mean_scores)
@@ -0,0 +1,93 @@
+"""Test suite for the one-fit group TF-IDF engine.
+
+This module checks src/group_tfidf.py against separate per-group
+TfidfVectorizer fits.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import random
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+import tfidf
+from group_tfidf import GroupTfidfEngine
+
+
+@pytest.fixture
+def corpus_frame(make_articles):
+    df = make_articles(120, 7, source=['CNBC', 'Fox News', 'Reuters', 'Vox'],
+                       Categories=['Economy', 'Politics', 'Social Issues', None])
+    df.loc[3, ['title', 'body']] = None  # blank document
+    return df
+
+
+def _reference_scores(texts, **params):
+    vectorizer = TfidfVectorizer(stop_words=sorted(tfidf.CUSTOM_STOP_WORDS), **params)
+    matrix = vectorizer.fit_transform(texts)
+    return vectorizer.get_feature_names_out(), np.asarray(matrix.mean(axis=0)).ravel()
+
+
+class TestGroupTfidfEngine:
+    @pytest.mark.parametrize("column", ['Categories', 'source'])
+    @pytest.mark.parametrize("max_features", [None, 1000])
+    def test_matches_per_group_vectorizer(self, corpus_frame, column, max_features):
+        corpus = tfidf.PreparedCorpus(corpus_frame)
+        engine = GroupTfidfEngine.from_corpus(corpus, max_features=max_features)
+
+        results = engine.score_groups(corpus_frame[column])
+        assert set(results) == set(corpus_frame[column].dropna().unique())
+
+        for label, scores in results.items():
+            texts = corpus.texts_for(corpus_frame.index[corpus_frame[column] == label])
+            names, means = _reference_scores(texts, max_features=max_features, min_df=2, max_df=0.8)
+
+            assert scores.n_documents == len(texts)
+            assert list(scores.feature_names) == list(names)
+            np.testing.assert_allclose(scores.mean_scores, means, atol=1e-12)
+
+    def test_top_words_match_get_top_tfidf_word(self, corpus_frame):
+        corpus = tfidf.PreparedCorpus(corpus_frame)
+        engine = GroupTfidfEngine.from_corpus(corpus)
+
+        for label, (n_documents, top_words) in engine.top_words(corpus_frame['Categories']).items():
+            texts = corpus.texts_for(corpus_frame.index[corpus_frame['Categories'] == label])
+            expected = tfidf.get_top_tfidf_word(texts)
+            assert [w for w, _ in top_words] == [w for w, _ in expected]
+
+    def test_max_features_ties_match_vectorizer(self):
+        # about 1500 terms with small, heavily tied counts, so the 1000-term cutoff falls inside a tie
+        rng = random.Random(11)
+        terms = [f'zq{a}{b}{c}' for a in 'abcdefghijkl' for b in 'abcdefghijkl' for c in 'abcdefghijk']
+        texts = pd.Series([' '.join(rng.choices(terms, k=20)) for _ in range(400)])
+        labels = pd.Series(['Health'] * len(texts))
+
+        engine = GroupTfidfEngine(texts)
+        names, _ = _reference_scores(texts.tolist(), max_features=tfidf.MAX_FEATURES, min_df=2, max_df=0.8)
+
+        assert list(engine.score_groups(labels)['Health'].feature_names) == list(names)
+        top_words = engine.top_words(labels)['Health'][1]
+        expected = tfidf.get_top_tfidf_word(texts.tolist())
+        assert [word for word, _ in top_words] == [word for word, _ in expected]
+        assert [score for _, score in top_words] == pytest.approx([score for _, score in expected])
+
+    def test_too_small_group_has_no_terms(self):
+        engine = GroupTfidfEngine(pd.Series(['tax budget vote', 'tax budget rent']))
+        scores = engine.score_groups(pd.Series(['Economy', 'Economy']))
+        assert len(scores['Economy'].feature_names) == 0  # max_df * 2 < min_df
+
+    def test_analyses_accept_engine(self, corpus_frame):
+        corpus = tfidf.PreparedCorpus(corpus_frame)
+        engine = GroupTfidfEngine.from_corpus(corpus)
+
+        with_engine = tfidf.analyze_categories(corpus_frame, corpus=corpus, engine=engine)
+        without = tfidf.analyze_categories(corpus_frame, corpus=corpus)
+
+        assert list(with_engine) == list(without)
+        for category in without:
+            assert [w for w, _ in with_engine[category]] == [w for w, _ in without[category]]
@@ -0,0 +1,104 @@
+"""Test suite for the incremental, persisted TF-IDF model.
+
+This module checks that appending articles to src/incremental.py's model
+gives the same rankings as a full refit.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import tfidf
+from group_tfidf import GroupTfidfEngine
+from incremental import IncrementalTfidfModel
+
+
+@pytest.fixture
+def articles(make_articles):
+    return make_articles(150, 11, source=['CNBC', 'Fox News', 'Reuters'],
+                         Categories=['Economy', 'Politics', 'Social Issues'],
+                         publisher_leaning=['Left', 'Right', 'Centrist', None])
+
+
+def _assert_same_scores(model, articles):
+    df = articles.assign(grouped_leaning=articles['publisher_leaning'].apply(tfidf.group_political_leaning))
+    engine = GroupTfidfEngine.from_corpus(tfidf.PreparedCorpus(df))
+    for column in ('Categories', 'grouped_leaning', 'source'):
+        expected = engine.score_groups(df[column])
+        scores = model.score_groups(column)
+        assert set(scores) == set(expected)
+        for label in expected:
+            assert list(scores[label].feature_names) == list(expected[label].feature_names)
+            np.testing.assert_allclose(scores[label].mean_scores, expected[label].mean_scores, atol=1e-12)
+
+
+class TestIncrementalTfidfModel:
+    def test_appended_updates_match_full_refit(self, articles, tmp_path):
+        path = str(tmp_path / "model")
+        model = IncrementalTfidfModel.open(path)
+        assert model.update(articles.iloc[:60]) == 60
+        model.save()
+
+        # next day: the full file comes in again, only the new rows are merged
+        model = IncrementalTfidfModel.open(path)
+        assert model.update(articles.iloc[:110]) == 50
+        model.save()
+
+        model = IncrementalTfidfModel.load(path)
+        assert model.update(articles) == 40
+        assert model.n_documents == len(articles)
+        _assert_same_scores(model, articles)
+
+    def test_duplicate_rows_count_like_a_refit(self, articles, tmp_path):
+        # a syndicated story twice on day one and a third time on day two
+        day_one = pd.concat([articles.iloc[:40], articles.iloc[[5, 5]]], ignore_index=True)
+        day_two = pd.concat([day_one, articles.iloc[[5]], articles.iloc[40:]], ignore_index=True)
+        model = IncrementalTfidfModel.open(str(tmp_path / "model"))
+
+        assert model.update(day_one) == 42
+        assert model.update(day_one) == 0
+        assert model.update(day_two) == 1 + len(articles) - 40
+        assert model.n_documents == len(day_two)
+        _assert_same_scores(model, day_two)
+
+    def test_interrupted_save_keeps_previous_state(self, articles, tmp_path, monkeypatch):
+        path = str(tmp_path / "model")
+        model = IncrementalTfidfModel.open(path)
+        model.update(articles.iloc[:60])
+        model.save()
+        expected = model.top_words('Categories')
+
+        model.update(articles)
+        def crash(*args):
+            raise OSError("disk full")
+        monkeypatch.setattr(os, 'replace', crash)
+        with pytest.raises(OSError):
+            model.save()
+        monkeypatch.undo()
+
+        model = IncrementalTfidfModel.load(path)
+        assert model.n_documents == 60 and model.top_words('Categories') == expected
+        assert model.update(articles) == len(articles) - 60
+
+    def test_reload_without_old_data(self, articles, tmp_path):
+        path = str(tmp_path / "model")
+        model = IncrementalTfidfModel.open(path)
+        model.update(articles)
+        model.save()
+        expected = model.top_words('Categories')
+
+        assert IncrementalTfidfModel.load(path).top_words('Categories') == expected
+
+    def test_rejects_state_from_other_normalizer(self, articles, tmp_path, monkeypatch):
+        path = str(tmp_path / "model")
+        model = IncrementalTfidfModel.open(path)
+        model.update(articles.iloc[:10])
+        model.save()
+
+        monkeypatch.setattr(tfidf, 'CLEANING_VERSION', tfidf.CLEANING_VERSION + 1)
+        with pytest.raises(ValueError):
+            IncrementalTfidfModel.load(path)
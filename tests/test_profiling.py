@@ -0,0 +1,90 @@
+"""
+Tests for per-stage pipeline profiling.
+"""
+
+import csv
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from profiling import PipelineProfiler
+from tfidf import PreparedCorpus, group_political_leaning
+from group_tfidf import GroupTfidfEngine
+from streaming import analyze_csv_streaming
+
+
+@pytest.fixture
+def articles(make_articles):
+    return make_articles(40, 5, body_length=(20, 20), source='CNBC', Categories=['Economy', 'Politics'],
+                         publisher_leaning=['Left', 'Right', 'Center-Left'])
+
+
+class TestPipelineProfiler:
+    def test_stages_are_recorded(self, tmp_path):
+        profiler = PipelineProfiler(report_dir=str(tmp_path))
+
+        with profiler.stage('load') as stage:
+            stage['n_documents'] = 100
+        with pytest.raises(RuntimeError):
+            with profiler.stage('save'):
+                raise RuntimeError("disk full")
+
+        assert [record['stage'] for record in profiler.stages] == ['load', 'save']
+        assert profiler.stages[0]['docs_per_s'] > 0
+        assert profiler.stages[1]['docs_per_s'] is None
+        assert all(record['wall_s'] >= 0 and record['peak_rss_mb'] > 0 for record in profiler.stages)
+
+    def test_report_files(self, tmp_path):
+        profiler = PipelineProfiler(report_dir=str(tmp_path))
+        with profiler.stage('clean', 10):
+            pass
+        profiler.record_groups('Categories', {'Economy': (6, 40, 12)})
+
+        json_path = profiler.save('profile', metadata={'use_ner': False})
+
+        with open(json_path, encoding='utf-8') as f:
+            report = json.load(f)
+        assert report['metadata']['use_ner'] is False
+        assert report['stages'][0]['stage'] == 'clean'
+        assert report['groups'] == [{'column': 'Categories', 'group': 'Economy', 'n_documents': 6,
+                                     'n_terms': 40, 'n_features': 12}]
+        with open(tmp_path / 'profile.csv', newline='', encoding='utf-8') as f:
+            assert [row['stage'] for row in csv.DictReader(f)] == ['clean']
+
+    def test_cprofile_one_stage(self, tmp_path, capsys):
+        profiler = PipelineProfiler(report_dir=str(tmp_path), profile_stage='vectorize')
+        with profiler.stage('clean'):
+            sorted(range(1000))
+        with profiler.stage('vectorize'):
+            sorted(range(1000))
+
+        assert os.listdir(tmp_path) == ['profile_vectorize.prof']
+        assert "cProfile of stage 'vectorize'" in capsys.readouterr().out
+
+    def test_vocabulary_sizes_match_scores(self, articles):
+        engine = GroupTfidfEngine.from_corpus(PreparedCorpus(articles))
+        labels = articles['publisher_leaning'].apply(group_political_leaning)
+
+        sizes = engine.vocabulary_sizes(labels)
+        scores = engine.score_groups(labels)
+
+        assert set(sizes) == set(scores)
+        for label, (n_documents, n_terms, n_features) in sizes.items():
+            assert n_documents == scores[label].n_documents
+            assert n_features == len(scores[label].feature_names)
+            assert n_terms >= n_features
+
+    def test_streaming_stages(self, articles, tmp_path):
+        path = tmp_path / 'articles.csv'
+        articles.to_csv(path, index=False)
+        profiler = PipelineProfiler(report_dir=str(tmp_path))
+
+        analyze_csv_streaming(str(path), chunk_size=15, profiler=profiler)
+
+        assert [record['stage'] for record in profiler.stages] == ['stream', 'score']
+        assert profiler.stages[0]['n_documents'] == 40
+        assert {group['column'] for group in profiler.groups} == {'Categories', 'grouped_leaning'}
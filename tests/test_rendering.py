@@ -0,0 +1,83 @@
+"""
+Tests for skip-if-unchanged figure rendering.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from profiling import PipelineProfiler
+from rendering import FINGERPRINT_FILE, figure_fingerprint, render_figures
+
+CATEGORY_RESULTS = {
+    'Economy': [('tax', 0.31), ('budget', 0.22), ('jobs', 0.1)],
+    'Politics': [('vote', 0.4), ('senate', 0.2)],
+}
+LEANING_RESULTS = {'Left': [('climate', 0.3)], 'Right': [('border', 0.35)]}
+DPI = 40  # small figures keep the tests fast
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # figures and fingerprints are written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_unchanged_figure_is_not_redrawn():
+    first = render_figures({'categories': CATEGORY_RESULTS}, dpi=DPI, workers=1)
+    path = 'Visualizations/tfidf_visualization_manual.png'
+    mtime = os.path.getmtime(path)
+
+    second = render_figures({'categories': CATEGORY_RESULTS}, dpi=DPI, workers=1)
+
+    assert first == {'categories': 'rendered'}
+    assert second == {'categories': 'unchanged'}
+    assert os.path.getmtime(path) == mtime
+    assert os.path.exists(FINGERPRINT_FILE)
+
+
+def test_changed_results_settings_or_missing_file_redraw():
+    render_figures({'categories': CATEGORY_RESULTS}, dpi=DPI, workers=1)
+    changed = dict(CATEGORY_RESULTS, Economy=[('tax', 0.5)])
+
+    assert render_figures({'categories': changed}, dpi=DPI, workers=1) == {'categories': 'rendered'}
+    assert render_figures({'categories': changed}, dpi=DPI + 10, workers=1) == {'categories': 'rendered'}
+    os.remove('Visualizations/tfidf_visualization_manual.png')
+    assert render_figures({'categories': changed}, dpi=DPI + 10, workers=1) == {'categories': 'rendered'}
+    assert render_figures({'categories': changed}, dpi=DPI + 10, workers=1,
+                          force=True) == {'categories': 'rendered'}
+
+
+def test_fingerprint_covers_settings():
+    base = figure_fingerprint('leaning', LEANING_RESULTS, dpi=DPI)
+
+    assert base == figure_fingerprint('leaning', dict(LEANING_RESULTS), dpi=DPI)
+    assert base != figure_fingerprint('leaning', LEANING_RESULTS, use_ner=True, dpi=DPI)
+    assert base != figure_fingerprint('leaning', LEANING_RESULTS, dpi=DPI, fmt='svg')
+    assert base != figure_fingerprint('categories', LEANING_RESULTS, dpi=DPI)
+
+
+def test_parallel_vector_rendering():
+    profiler = PipelineProfiler()
+    status = render_figures({'categories': CATEGORY_RESULTS, 'leaning': LEANING_RESULTS},
+                            dpi=DPI, fmt='svg', workers=2, profiler=profiler)
+
+    assert status == {'categories': 'rendered', 'leaning': 'rendered'}
+    assert [record['stage'] for record in profiler.stages] == ['visualize_categories', 'visualize_leaning']
+    assert all(record['wall_s'] > 0 and record['peak_rss_mb'] > 0 for record in profiler.stages)
+    for name in ('tfidf_visualization_manual.svg', 'tfidf_political_leaning_manual.svg'):
+        with open(os.path.join('Visualizations', name), encoding='utf-8') as f:
+            assert '<svg' in f.read()
+
+
+def test_empty_results_are_reported():
+    profiler = PipelineProfiler()
+    status = render_figures({'categories': CATEGORY_RESULTS, 'leaning': {}}, dpi=DPI, workers=1, profiler=profiler)
+
+    assert status == {'categories': 'rendered', 'leaning': 'empty'}
+    assert [record['stage'] for record in profiler.stages] == ['visualize_categories']
+    assert not os.path.exists('Visualizations/tfidf_political_leaning_manual.png')
@@ -0,0 +1,80 @@
+"""
+Tests for rolling time-window TF-IDF.
+"""
+
+import os
+import random
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import tfidf
+from group_tfidf import GroupTfidfEngine
+from rolling import RollingGroupTfidf, rolling_frame
+
+
+@pytest.fixture
+def dated_articles(make_articles):
+    n = 150
+    df = make_articles(n, 21, body_length=(5, 25), source='CNBC', Categories=['Economy', 'Politics', 'Environment'],
+                       publisher_leaning=['Left', 'Right', 'Center-Left', None])
+    rng = random.Random(21)
+    start = pd.Timestamp('2025-10-21')
+    df['date'] = [start + pd.Timedelta(hours=rng.randint(0, 24 * 20 - 1)) for _ in range(n)]
+    df.loc[5, 'date'] = None  # undated articles are in no window
+    df.loc[7, ['title', 'body']] = None  # blank document
+    return df.sample(frac=1, random_state=0)  # not in date order
+
+
+def test_windows_match_separate_fits(dated_articles):
+    corpus = tfidf.PreparedCorpus(dated_articles)
+    rolling = RollingGroupTfidf.from_articles(dated_articles, corpus=corpus)
+
+    windows = list(rolling.windows('5D', '2D'))
+
+    assert [window.start for window in windows] == list(pd.date_range('2025-10-21', '2025-11-09', freq='2D'))
+    for window in windows:
+        in_window = dated_articles.index[(dated_articles['date'] >= window.start) &
+                                         (dated_articles['date'] < window.end)]
+        assert window.n_documents == len(in_window)
+        subset = dated_articles.loc[in_window]
+        engine = GroupTfidfEngine(corpus.texts.loc[in_window])
+        leaning = subset['publisher_leaning'].astype(object).apply(tfidf.group_political_leaning)
+        for column, labels in (('Categories', subset['Categories']), ('grouped_leaning', leaning)):
+            expected = engine.top_words(labels)
+            actual = window.top_words[column]
+            assert set(actual) == set(expected)
+            for label, (n_documents, top_words) in actual.items():
+                assert n_documents == expected[label][0]
+                if n_documents < 2:
+                    assert top_words is None
+                    continue
+                assert [word for word, _ in top_words] == [word for word, _ in expected[label][1]]
+                np.testing.assert_allclose([score for _, score in top_words],
+                                           [score for _, score in expected[label][1]])
+
+
+def test_window_state_only_moves_forward(dated_articles):
+    rolling = RollingGroupTfidf.from_articles(dated_articles, group_columns=['Categories'])
+
+    rolling.move_to(10, 40)
+    rolling.move_to(50, 60)  # no overlap: state is rebuilt from the new rows
+    assert rolling._n_docs['Categories'].sum() == (rolling.codes[50:60, 0] >= 0).sum()
+    with pytest.raises(ValueError):
+        rolling.move_to(40, 60)
+
+
+def test_rolling_frame(dated_articles):
+    rolling = RollingGroupTfidf.from_articles(dated_articles, group_columns=['Categories'])
+
+    frame = rolling_frame(rolling.windows('7D', '7D', n_words=3))
+
+    assert list(frame.columns) == ['window_start', 'window_end', 'grouping', 'group', 'n_documents',
+                                   'rank', 'word', 'score']
+    assert frame['rank'].max() == 3
+    assert (frame['window_end'] - frame['window_start'] == pd.Timedelta('7D')).all()
+    assert set(frame['grouping']) == {'Categories'}
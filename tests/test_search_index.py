@@ -0,0 +1,101 @@
+"""
+Tests for the inverted index and its HTTP endpoint.
+"""
+
+import json
+import os
+import sys
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import tfidf
+from search_index import InvertedIndex, make_server
+
+
+@pytest.fixture
+def articles(make_articles):
+    n = 60
+    df = make_articles(n, 41, body_length=(5, 25), start=200, exclude=['newsom', 'gavin', 'governor'],
+                       source=['CNN', 'Fox News', 'Reuters'], Categories=['Politics', 'Economy'],
+                       publisher_leaning=['Left', 'Lean Right', 'Center', None])
+    df['title'] = [f'story {i}' for i in range(n)]
+    df.loc[[203, 217, 230, 244], 'body'] += ' Newsom'
+    return df
+
+
+@pytest.fixture
+def index(articles):
+    return InvertedIndex.from_articles(articles)
+
+
+def test_postings_are_corpus_tfidf(articles, index):
+    texts = tfidf.PreparedCorpus(articles).texts
+    vectorizer = TfidfVectorizer(stop_words=sorted(tfidf.custom_stop_words()))
+    expected = pd.DataFrame(vectorizer.fit_transform(texts).toarray(), index=articles.index,
+                            columns=vectorizer.get_feature_names_out())
+
+    hits = index.search('tax', n=len(articles))
+
+    assert [hit.article for hit in hits] == list(expected['tax'][expected['tax'] > 0]
+                                                 .sort_values(ascending=False, kind='stable').index)
+    np.testing.assert_allclose([hit.score for hit in hits], expected.loc[[hit.article for hit in hits], 'tax'],
+                               rtol=1e-6)
+    assert hits[0].title == f'story {hits[0].article - 200}'
+
+
+def test_query_normalization_and_filters(articles, index):
+    assert index.terms('Newsom') == index.terms('gavin newsom') == ['newsom_entity']
+    assert {hit.article for hit in index.search('newsom')} == {203, 217, 230, 244}
+    assert index.search('unknownword') == []
+
+    for hit in index.search('tax', n=100, category='Economy', leaning='Right'):
+        row = articles.loc[hit.article]
+        assert row['Categories'] == hit.category == 'Economy'
+        assert tfidf.group_political_leaning(row['publisher_leaning']) == hit.leaning == 'Right'
+    neutral = index.search('tax', n=100, leaning='Neutral')
+    leanings = articles.loc[[hit.article for hit in neutral], 'publisher_leaning']
+    assert len(neutral) and (leanings.isna() | (leanings == 'Center')).all()
+    assert index.search('tax', source='Missing Outlet') == []
+
+    both = index.search('tax vote', n=100)
+    assert {hit.article for hit in both} == {hit.article for hit in index.search('tax', n=100)} | {
+        hit.article for hit in index.search('vote', n=100)}
+
+
+def test_string_index(articles):
+    articles.index = [f'a{i}' for i in articles.index]
+
+    hits = InvertedIndex.from_articles(articles).search('newsom')
+
+    assert {hit.article for hit in hits} == {'a203', 'a217', 'a230', 'a244'}
+    assert json.dumps([hit._asdict() for hit in hits])
+
+
+def test_http_endpoint(index):
+    server = make_server(index, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f'http://127.0.0.1:{server.server_address[1]}'
+    try:
+        with urllib.request.urlopen(f'{url}/search?term=Newsom&n=2&source=CNN') as response:
+            payload = json.load(response)
+        assert payload['terms'] == ['newsom_entity'] and len(payload['hits']) <= 2
+        assert all(hit['source'] == 'CNN' for hit in payload['hits'])
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f'{url}/search?n=2')
+        assert error.value.code == 400
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f'{url}/search?term=tax&n=-3')
+        assert error.value.code == 400
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,97 @@
+"""Test suite for chunked streaming ingestion.
+
+This module checks src/streaming.py against the in-memory analysis path.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import tfidf
+from group_tfidf import GroupTfidfEngine
+from streaming import StreamingGroupTfidf, analyze_csv_streaming, read_article_chunks
+
+
+@pytest.fixture
+def articles_csv(tmp_path, make_articles):
+    n = 150
+    df = make_articles(n, 3, source=['CNBC', 'Fox News', 'Reuters'],
+                       Categories=['Economy', 'Politics', 'Social Issues'],
+                       publisher_leaning=['Left', 'Right', 'Centrist', None])
+    df['url'] = [f'https://example.com/{i}' for i in range(n)]
+    path = tmp_path / "articles.csv"
+    df.to_csv(path, index=False)
+    return str(path), df
+
+
+class TestStreaming:
+    def test_chunks_are_bounded_and_projected(self, articles_csv):
+        path, df = articles_csv
+        chunks = list(read_article_chunks(path, chunk_size=40))
+
+        assert [len(chunk) for chunk in chunks] == [40, 40, 40, 30]
+        assert 'url' not in chunks[0].columns
+
+    @pytest.mark.parametrize("column", ['Categories', 'source'])
+    def test_matches_in_memory_engine(self, articles_csv, column):
+        path, df = articles_csv
+        engine = GroupTfidfEngine.from_corpus(tfidf.PreparedCorpus(df))
+        expected = engine.score_groups(df[column])
+
+        with StreamingGroupTfidf([column]) as model:
+            for chunk in read_article_chunks(path, chunk_size=33):
+                texts = tfidf.clean_texts(chunk['title']) + ' ' + tfidf.clean_texts(chunk['body'])
+                model.partial_fit(texts, chunk)
+            streamed = model.score_groups(column)
+
+        assert set(streamed) == set(expected)
+        for label, scores in expected.items():
+            assert streamed[label].n_documents == scores.n_documents
+            assert list(streamed[label].feature_names) == list(scores.feature_names)
+            np.testing.assert_allclose(streamed[label].mean_scores, scores.mean_scores, atol=1e-12)
+
+    def test_analyze_csv_streaming_matches_analyses(self, articles_csv):
+        path, df = articles_csv
+        results, leaning_results = analyze_csv_streaming(path, chunk_size=50)
+
+        expected = tfidf.analyze_categories(df)
+        expected_leaning = tfidf.analyze_categories_by_political_leaning(df)
+
+        assert set(results) == set(expected)
+        for category, top_words in expected.items():
+            assert [w for w, _ in results[category]] == [w for w, _ in top_words]
+        assert list(leaning_results) == list(expected_leaning)
+        for leaning, top_words in expected_leaning.items():
+            assert [w for w, _ in leaning_results[leaning]] == [w for w, _ in top_words]
+
+    def test_totals_grow_geometrically(self):
+        # every chunk brings new terms and a new group
+        chunks = [(pd.Series([f'term{i}a term{i}b', f'term{i}c tax']), pd.DataFrame({'Categories': [f'G{i}', 'A']}))
+                  for i in range(64)]
+        texts = pd.concat([texts for texts, _ in chunks], ignore_index=True)
+        labels = pd.concat([labels['Categories'] for _, labels in chunks], ignore_index=True)
+        expected = GroupTfidfEngine(texts, min_df=1, max_df=1.0).score_groups(labels)
+        
+        capacities = set()
+        with StreamingGroupTfidf(['Categories'], min_df=1, max_df=1.0) as model:
+            for texts, labels in chunks:
+                model.partial_fit(texts, labels)
+                capacities.add(model._doc_freq['Categories'].shape)
+            streamed = model.score_groups('Categories')
+        
+        assert len(capacities) < 16  # a few doublings, not one copy per chunk
+        assert set(streamed) == set(expected)
+        for label, scores in expected.items():
+            assert list(streamed[label].feature_names) == list(scores.feature_names)
+            np.testing.assert_allclose(streamed[label].mean_scores, scores.mean_scores, atol=1e-12)
+
+    def test_spill_directory_removed_on_close(self):
+        model = StreamingGroupTfidf(['Categories'])
+        model.partial_fit(pd.Series(['tax budget', 'vote rent']), pd.DataFrame({'Categories': ['A', 'A']}))
+        spill_dir = model.spill_dir
+        model.close()
+        assert not os.path.exists(spill_dir)
@@ -0,0 +1,81 @@
+"""Test suite for the persistent normalized text cache.
+
+This module contains pytest tests for src/text_cache.py and the cache-aware
+cleaning path in src/tfidf.py.
+"""
+
+import pytest
+import pandas as pd
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import tfidf
+from text_cache import NormalizedTextCache
+
+
+class TestNormalizedTextCache:
+    def test_round_trip_and_stats(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        key = NormalizedTextCache.key("Gavin Newsom", "fp")
+
+        with NormalizedTextCache(path) as cache:
+            assert cache.get_many([key]) == {}
+            cache.put_many({key: "newsom_entity"})
+
+        with NormalizedTextCache(path) as cache:
+            assert cache.get_many([key]) == {key: "newsom_entity"}
+            stats = cache.stats()
+
+        assert stats['entries'] == 1
+        assert stats['hits'] == 1
+        assert stats['misses'] == 0
+
+    def test_key_depends_on_fingerprint(self):
+        assert NormalizedTextCache.key("text", "manual") != NormalizedTextCache.key("text", "ner")
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        with NormalizedTextCache(str(tmp_path / "cache.sqlite"), max_bytes=400) as cache:
+            keys = [NormalizedTextCache.key(f"article {i}", "fp") for i in range(20)]
+            cache.put_many({keys[0]: "first"})
+            for key in keys[1:]:
+                cache.get_many([keys[0]])  # keep the first entry hot
+                cache.put_many({key: "x" * 20})
+
+            stats = cache.stats()
+            assert stats['evictions'] > 0
+            assert stats['bytes'] <= 400
+            assert keys[0] in cache.get_many([keys[0]])
+            assert keys[1] not in cache.get_many([keys[1]])
+
+
+class TestCachedCleaning:
+    def test_rerun_only_cleans_new_or_edited_text(self, tmp_path, monkeypatch):
+        texts = pd.Series(["Gavin Newsom spoke.", None, "Donald Trump replied!"])
+        path = str(tmp_path / "cache.sqlite")
+
+        with NormalizedTextCache(path) as cache:
+            first = tfidf.clean_texts(texts, cache=cache)
+        assert list(first) == [tfidf.clean_text(t) for t in texts]
+
+        cleaned_batches = []
+        original = tfidf._clean_present
+
+        def recording_clean_present(batch, **kwargs):
+            cleaned_batches.append(list(batch))
+            return original(batch, **kwargs)
+
+        monkeypatch.setattr(tfidf, "_clean_present", recording_clean_present)
+        edited = pd.Series(["Gavin Newsom spoke.", "New article", "Donald Trump replied!"])
+        with NormalizedTextCache(path) as cache:
+            second = tfidf.clean_texts(edited, cache=cache)
+            assert cache.stats()['hits'] == 2
+
+        assert cleaned_batches == [["New article"]]
+        assert list(second) == [tfidf.clean_text(t) for t in edited]
+
+    def test_fingerprint_tracks_mapping_table(self, monkeypatch):
+        before = tfidf.normalizer_fingerprint()
+        monkeypatch.setitem(tfidf.ENTITY_MAPPINGS, 'extra_entity', ['extra'])
+        assert tfidf.normalizer_fingerprint() != before
@@ -0,0 +1,350 @@
+"""Test suite for the TF-IDF analysis module.
+
+This module contains pytest tests for text normalization, cleaning and
+scoring in src/tfidf.py.
+"""
+
+import pytest
+import pandas as pd
+import random
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import tfidf
+from tfidf import (
+    ENTITY_MAPPINGS,
+    EntityNormalizer,
+    _apply_mappings_sequentially,
+    clean_text,
+    clean_texts,
+    normalize_text,
+    normalize_text_ner,
+    normalize_texts,
+    normalize_texts_ner,
+    PreparedCorpus,
+    analyze_categories,
+    analyze_categories_by_political_leaning,
+    get_top_tfidf_word,
+    top_display_words,
+)
+import numpy as np
+
+
+@pytest.fixture
+def sample_articles(make_articles):
+    df = make_articles(60, 1, body_length=(25, 25), source=['CNBC', 'Fox News', 'Reuters'],
+                       Categories=['Economy', 'Politics', 'Social Issues'],
+                       publisher_leaning=['Left', 'Right', 'Centrist', None])
+    df['body'] += ' 2025!'
+    return df
+
+
+class TestEntityNormalizer:
+    @pytest.fixture
+    def sample_texts(self):
+        return [
+            'President Donald Trump met Gov. Gavin Newsom in San Francisco.',
+            'The Biden administration and House Democrats discussed health care.',
+            'Chief of staff Dana Williamson was indicted; the GOP reacted.',
+        ]
+
+    def test_matches_sequential_substitution(self, sample_texts):
+        for text in sample_texts:
+            expected = _apply_mappings_sequentially(text.lower(), ENTITY_MAPPINGS)
+            assert normalize_text(text) == expected
+
+    def test_matches_sequential_on_random_phrases(self):
+        words = sorted({w for vs in ENTITY_MAPPINGS.values() for v in vs for w in v.split()})
+        words += ['the', 'of', 'a', '.', ',']
+        rng = random.Random(0)
+        for _ in range(2000):
+            text = ' '.join(rng.choice(words) for _ in range(rng.randint(1, 8)))
+            assert normalize_text(text) == _apply_mappings_sequentially(text, ENTITY_MAPPINGS)
+
+    def test_normalize_many_series_and_list(self, sample_texts):
+        series = pd.Series(sample_texts, index=[10, 20, 30])
+        result = normalize_texts(series)
+
+        assert isinstance(result, pd.Series)
+        assert list(result.index) == [10, 20, 30]
+        assert list(result) == [normalize_text(t) for t in sample_texts]
+        assert normalize_texts(sample_texts) == list(result)
+
+    def test_missing_text_raises(self):
+        with pytest.raises(ValueError):
+            normalize_text(None)
+        with pytest.raises(ValueError):
+            normalize_texts(pd.Series(['trump', None]))
+
+    def test_custom_mapping_table(self):
+        normalizer = EntityNormalizer({'foo_entity': ['foo bar', 'foo']})
+        assert normalizer.normalize('Foo bar and foo') == 'foo_entity and foo_entity'
+
+
+class TestBatchedNer:
+    @pytest.fixture
+    def ruler_nlp(self, monkeypatch):
+        spacy = pytest.importorskip("spacy")
+        nlp = spacy.blank("en")
+        ruler = nlp.add_pipe("entity_ruler")
+        ruler.add_patterns([
+            {"label": "PERSON", "pattern": "Donald Trump"},
+            {"label": "PERSON", "pattern": "Gavin Newsom"},
+            {"label": "GPE", "pattern": "San Francisco"},
+            {"label": "ORG", "pattern": "Democratic Party"},
+            {"label": "ORG", "pattern": "Reuters"},
+        ])
+        monkeypatch.setattr(tfidf, "nlp", nlp, raising=False)
+        return nlp
+
+    def test_entities_rewritten_in_one_pass(self, ruler_nlp):
+        text = "Donald Trump and Gavin Newsom met the Democratic Party in San Francisco, Reuters said."
+        assert normalize_text_ner(text) == (
+            "trump and newsom met the democratic party in san francisco, reuters said."
+        )
+
+    def test_batched_matches_single(self, ruler_nlp):
+        texts = pd.Series(
+            ["Donald Trump spoke.", "Gavin Newsom in San Francisco", "No entities here"],
+            index=[3, 1, 2],
+        )
+        result = normalize_texts_ner(texts, batch_size=2)
+
+        assert list(result.index) == [3, 1, 2]
+        assert list(result) == [normalize_text_ner(t) for t in texts]
+
+    def test_clean_texts_matches_clean_text(self, ruler_nlp):
+        texts = pd.Series(["Gavin Newsom, 2025!", None, "Donald Trump's plan"])
+        for use_ner in (True, False):
+            expected = [clean_text(t, use_ner=use_ner) for t in texts]
+            assert list(clean_texts(texts, use_ner=use_ner)) == expected
+
+
+class TestPreparedCorpus:
+    def test_texts_aligned_with_clean_text(self, sample_articles):
+        corpus = PreparedCorpus(sample_articles)
+
+        assert len(corpus) == len(sample_articles)
+        row = sample_articles.iloc[5]
+        assert corpus.texts.iloc[5] == f"{clean_text(row['title'])} {clean_text(row['body'])}"
+
+    def test_analyses_share_one_cleaning_pass(self, sample_articles, monkeypatch):
+        calls = []
+        original = tfidf.clean_texts
+
+        def counting_clean_texts(texts, **kwargs):
+            calls.append(len(texts))
+            return original(texts, **kwargs)
+
+        monkeypatch.setattr(tfidf, "clean_texts", counting_clean_texts)
+        corpus = PreparedCorpus(sample_articles)
+        analyze_categories(sample_articles, corpus=corpus)
+        analyze_categories_by_political_leaning(sample_articles, corpus=corpus)
+
+        assert calls == [len(sample_articles), len(sample_articles)]  # title + body, once
+
+    def test_shared_corpus_gives_same_results(self, sample_articles):
+        corpus = PreparedCorpus(sample_articles)
+        assert analyze_categories(sample_articles, corpus=corpus) == analyze_categories(sample_articles)
+
+    def test_duplicate_index_rejected(self, sample_articles):
+        with pytest.raises(ValueError):
+            PreparedCorpus(pd.concat([sample_articles, sample_articles]))
+
+
+def _reference_top_words(feature_names, scores, n_words):
+    # the original list-sort-and-dedupe implementation
+    word_scores = sorted(zip(feature_names, scores), key=lambda x: x[1], reverse=True)
+    cleaned = []
+    for word, score in word_scores[:n_words * 2]:
+        display_word = word.replace('_entity', '').replace('_', ' ')
+        if display_word not in [w for w, _ in cleaned]:
+            cleaned.append((display_word, score))
+        if len(cleaned) >= n_words:
+            break
+    return cleaned
+
+
+class TestTopDisplayWords:
+    def test_matches_reference_ranking_with_ties(self):
+        rng = np.random.default_rng(0)
+        names = sorted(['trump_entity', 'trump', 'newsom_entity', 'san_francisco_entity', 'san francisco']
+                       + [f'word{i:03d}' for i in range(200)])
+        for _ in range(50):
+            scores = rng.integers(0, 8, size=len(names)) / 8.0  # lots of ties
+            assert top_display_words(names, scores, 10) == _reference_top_words(names, scores, 10)
+
+    def test_fewer_features_than_requested(self):
+        assert top_display_words(['a', 'b_entity'], np.array([0.1, 0.2]), 10) == [('b', 0.2), ('a', 0.1)]
+        assert top_display_words([], np.array([]), 10) == []
+
+    def test_get_top_tfidf_word_returns_display_words(self, sample_articles):
+        texts = tfidf.PreparedCorpus(sample_articles).texts_for(sample_articles.index)
+        top_words = get_top_tfidf_word(texts, n_words=5)
+
+        assert len(top_words) == 5
+        assert all('_entity' not in word for word, _ in top_words)
+        assert [score for _, score in top_words] == sorted((score for _, score in top_words), reverse=True)
+
+
+class TestParallelCleaning:
+    def test_parallel_matches_serial(self, sample_articles):
+        texts = pd.concat([sample_articles['body']] * 3, ignore_index=True)
+        texts[7] = None
+
+        serial = clean_texts(texts)
+        parallel = clean_texts(texts, workers=2, chunk_size=25)
+
+        assert parallel.equals(serial)
+
+    def test_speedup_report(self, sample_articles, capsys):
+        rows = tfidf.report_cleaning_speedup(sample_articles['body'], workers=2, chunk_sizes=(10, 30))
+
+        assert [row['mode'] for row in rows] == ['serial', 'parallel', 'parallel']
+        assert [row['chunk_size'] for row in rows[1:]] == [10, 30]
+        assert 'speedup report' in capsys.readouterr().out
+
+
+class TestCommandLine:
+    @pytest.fixture
+    def data_file(self, sample_articles, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        path = tmp_path / 'articles.csv'
+        sample_articles.to_csv(path, index=False)
+        return str(path)
+
+    def test_document_frequency_arguments(self):
+        args = tfidf.build_parser().parse_args(['--min-df', '3', '--max-df', '0.5'])
+        assert args.min_df == 3 and isinstance(args.min_df, int)
+        assert args.max_df == 0.5
+
+    def test_selected_grouping_and_top_n(self, data_file, capsys):
+        tfidf.main(['--input', data_file, '--groupings', 'leaning', '--top-n', '3',
+                    '--outputs', 'none', '--no-cache'])
+
+        out = capsys.readouterr().out
+        assert 'TF-IDF RESULTS BY POLITICAL LEANING' in out
+        assert 'TF-IDF RESULTS BY CATEGORY' not in out
+        assert ' 3. ' in out and ' 4. ' not in out
+        assert sorted(os.listdir('Visualizations')) == ['pipeline_profile_manual.csv', 'pipeline_profile_manual.json']
+        assert not os.path.exists('.cache')
+
+    def test_text_output_only(self, data_file):
+        tfidf.main(['--input', data_file, '--outputs', 'text', '--stream-chunk-size', '25'])
+
+        assert 'tfidf_political_leaning_manual.txt' in os.listdir('Visualizations')
+        assert not any(name.endswith('.png') for name in os.listdir('Visualizations'))
+
+    def test_bootstrap_report(self, data_file, capsys):
+        tfidf.main(['--input', data_file, '--bootstrap', '20', '--outputs', 'text', '--no-cache'])
+
+        assert 'BOOTSTRAP STABILITY BY CATEGORY' in capsys.readouterr().out
+        report = pd.read_csv(os.path.join('Visualizations', 'tfidf_bootstrap_manual.csv'))
+        assert set(report['grouping']) == {'Categories', 'grouped_leaning'}
+        assert (report['ci_low'] <= report['ci_high']).all()
+
+    def test_comparative_report(self, data_file, capsys):
+        tfidf.main(['--input', data_file, '--comparative', '--outputs', 'text', '--no-cache'])
+
+        out = capsys.readouterr().out
+        assert 'DISTINCTIVE TERMS BY POLITICAL LEANING' in out
+        assert out.index('Political Leaning: Left vs rest') < out.index('Political Leaning: Left vs Right')
+        report = pd.read_csv(os.path.join('Visualizations', 'tfidf_comparative_manual.csv'))
+        assert set(report['grouping']) == {'Categories', 'grouped_leaning'}
+
+    def test_rolling_windows(self, sample_articles, tmp_path, monkeypatch, capsys):
+        from rolling import RollingGroupTfidf, rolling_frame
+        monkeypatch.chdir(tmp_path)
+        dated = sample_articles.assign(date=pd.date_range('2025-10-01', periods=len(sample_articles), freq='7h'))
+        dated.to_csv('articles.csv', index=False)
+
+        tfidf.main(['--input', 'articles.csv', '--window', '5D', '--window-step', '3D', '--top-n', '3',
+                    '--outputs', 'text', '--no-cache'])
+
+        assert 'TOP WORDS IN ROLLING 5D WINDOWS' in capsys.readouterr().out
+        report = pd.read_csv(os.path.join('Visualizations', 'tfidf_rolling_manual.csv'))
+        expected = rolling_frame(RollingGroupTfidf.from_articles(dated).windows('5D', '3D', n_words=3))
+        assert list(report['word']) == list(expected['word'])
+        assert report['score'].tolist() == pytest.approx(expected['score'].tolist())
+
+    def test_dedup_collapse(self, sample_articles, tmp_path, monkeypatch, capsys):
+        monkeypatch.chdir(tmp_path)
+        syndicated = sample_articles.head(3).assign(source='AP NEWS')
+        pd.concat([sample_articles, syndicated], ignore_index=True).to_csv('articles.csv', index=False)
+
+        tfidf.main(['--input', 'articles.csv', '--dedup', 'collapse', '--outputs', 'text', '--no-cache'])
+
+        out = capsys.readouterr().out
+        assert f'Kept {len(sample_articles)} articles' in out
+        clusters = pd.read_csv(os.path.join('Visualizations', 'duplicate_clusters_manual.csv'))
+        assert len(clusters) == 6 and set(clusters['cluster_size']) == {2}
+
+    def test_rerun_reopens_token_store(self, data_file, capsys):
+        tfidf.main(['--input', data_file, '--outputs', 'text'])
+        first = capsys.readouterr().out
+        with open(os.path.join('Visualizations', 'tfidf_political_leaning_manual.txt')) as f:
+            expected = f.read()
+
+        tfidf.main(['--input', data_file, '--outputs', 'text'])
+
+        assert 'tokenized articles' not in first and 'tokenized articles' in capsys.readouterr().out
+        with open(os.path.join('Visualizations', 'tfidf_political_leaning_manual.txt')) as f:
+            assert f.read() == expected
+
+    def test_save_matrices(self, data_file):
+        from tfidf_matrices import TfidfMatrices
+
+        tfidf.main(['--input', data_file, '--save-matrices', '--outputs', 'none', '--no-cache'])
+
+        matrices = TfidfMatrices.load(os.path.join('.cache', 'tfidf_matrices_manual'))
+        assert matrices.groupings() == ['corpus', 'Categories', 'grouped_leaning']
+        assert matrices.metadata['max_df'] == tfidf.MAX_DF
+
+    def test_missing_input(self, tmp_path, capsys):
+        tfidf.main(['--input', str(tmp_path / 'missing.csv')])
+        assert 'missing.csv not found' in capsys.readouterr().out
+
+
+IMPORT_TIME_BUDGET = 1.5  # seconds for `import tfidf` in a fresh interpreter
+
+
+class TestLazyImports:
+    def test_import_stays_light(self):
+        import json
+        import subprocess
+        src_dir = os.path.join(os.path.dirname(__file__), '..', 'src')
+        code = (
+            "import json, sys, time\n"
+            f"sys.path.insert(0, {src_dir!r})\n"
+            "start = time.perf_counter()\n"
+            "import tfidf\n"
+            "elapsed = time.perf_counter() - start\n"
+            "heavy = [m for m in ('sklearn', 'matplotlib', 'seaborn', 'spacy') if m in sys.modules]\n"
+            "print(json.dumps({'elapsed': elapsed, 'heavy': heavy}))\n"
+        )
+        result = json.loads(subprocess.run([sys.executable, '-c', code], capture_output=True,
+                                           text=True, check=True).stdout)
+
+        assert result['heavy'] == []
+        assert result['elapsed'] < IMPORT_TIME_BUDGET
+
+    def test_lazy_module_constants(self):
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+        from tfidf import CUSTOM_STOP_WORDS
+
+        assert CUSTOM_STOP_WORDS >= ENGLISH_STOP_WORDS | tfidf.EXTRA_STOP_WORDS
+        assert tfidf.NER_AVAILABLE == (tfidf.get_nlp() is not None)
+        with pytest.raises(AttributeError):
+            tfidf.NOT_A_SETTING
+
+    def test_model_loaded_once(self, monkeypatch):
+        spacy = pytest.importorskip("spacy")
+        loads = []
+        monkeypatch.setattr(tfidf, 'nlp', None)
+        monkeypatch.setattr(tfidf, '_nlp_load_attempted', False)
+        monkeypatch.setattr(spacy, 'load', lambda name: loads.append(name) or spacy.blank('en'))
+
+        assert tfidf.get_nlp() is tfidf.get_nlp()
+        assert loads == [tfidf.NER_MODEL]
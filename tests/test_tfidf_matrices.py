@@ -0,0 +1,115 @@
+"""
+Tests for the saved, memory-mapped TF-IDF matrices.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import tfidf
+from group_tfidf import GroupTfidfEngine
+from tfidf_matrices import ALL, CORPUS, TfidfMatrices
+
+
+@pytest.fixture
+def articles(make_articles):
+    df = make_articles(80, 31, start=1000, exclude=['wildfire'], Categories=['Politics', 'Climate', 'Economy'])
+    df = df[['body', 'Categories']].rename(columns={'body': 'text'})
+    climate = df.index[df['Categories'] == 'Climate']
+    df.loc[climate[::2], 'text'] += ' wildfire'  # in half of the Climate articles, so max_df keeps it
+    df.loc[1003, 'text'] = ''
+    return df
+
+
+@pytest.fixture
+def matrices(articles):
+    engine = GroupTfidfEngine(articles['text'])
+    return TfidfMatrices.from_engine(engine, {'Categories': articles['Categories']}), engine
+
+
+def test_matrices_match_vectorizer_fit(articles, matrices):
+    matrices, _ = matrices
+
+    for grouping, group, texts in ((CORPUS, ALL, articles['text']),
+                                   ('Categories', 'Economy', articles.loc[articles['Categories'] == 'Economy', 'text'])):
+        texts = texts[texts.str.strip() != '']
+        vectorizer = TfidfVectorizer(max_features=tfidf.MAX_FEATURES, stop_words=sorted(tfidf.custom_stop_words()),
+                                     min_df=tfidf.MIN_DF, max_df=tfidf.MAX_DF)
+        expected = vectorizer.fit_transform(texts)
+
+        np.testing.assert_array_equal(matrices.feature_names(grouping, group), vectorizer.get_feature_names_out())
+        np.testing.assert_allclose(matrices.idf(grouping, group), vectorizer.idf_)
+        np.testing.assert_allclose(matrices.matrix(grouping, group).toarray(), expected.toarray(), atol=1e-12)
+        assert list(matrices.document_index(grouping, group)) == list(texts.index)
+
+
+def test_save_and_memory_map(articles, matrices, tmp_path):
+    matrices, engine = matrices
+    matrices.save(str(tmp_path))
+
+    loaded = TfidfMatrices.load(str(tmp_path))
+
+    assert isinstance(loaded.arrays['data'], np.memmap)
+    assert loaded.groupings() == [CORPUS, 'Categories']
+    for group, (n_documents, top_words) in engine.top_words(articles['Categories']).items():
+        loaded_documents, loaded_words = loaded.top_words('Categories')[group]
+        assert loaded_documents == n_documents
+        assert [word for word, _ in loaded_words] == [word for word, _ in top_words]
+        assert [score for _, score in loaded_words] == pytest.approx([score for _, score in top_words])
+
+
+def test_string_document_labels_round_trip(articles, tmp_path):
+    articles.index = pd.Index([f'a{i}' for i in articles.index], name='article')
+    engine = GroupTfidfEngine(articles['text'])
+    TfidfMatrices.from_engine(engine, {'Categories': articles['Categories']}).save(str(tmp_path))
+
+    loaded = TfidfMatrices.load(str(tmp_path))
+
+    pd.testing.assert_index_equal(loaded.documents, articles.index, exact=False)
+    assert loaded.term_documents('wildfire', 'Categories', 'Climate').index.isin(articles.index).all()
+
+
+def test_interrupted_save_keeps_previous_matrices(articles, matrices, tmp_path, monkeypatch):
+    matrices, engine = matrices
+    matrices.save(str(tmp_path))
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, 'replace', fail)
+    with pytest.raises(OSError):
+        TfidfMatrices.from_engine(engine, {}).save(str(tmp_path))
+    monkeypatch.undo()
+
+    loaded = TfidfMatrices.load(str(tmp_path))
+    assert loaded.groupings() == [CORPUS, 'Categories']
+    np.testing.assert_array_equal(loaded.mean_scores('Categories', 'Climate'),
+                                  matrices.mean_scores('Categories', 'Climate'))
+
+    TfidfMatrices.from_engine(engine, {}).save(str(tmp_path))
+    assert TfidfMatrices.load(str(tmp_path)).groupings() == [CORPUS]
+    assert sorted(os.listdir(tmp_path)) == ['arrays_000001', 'matrices.json']  # older arrays removed
+
+
+def test_term_and_document_queries(articles, matrices):
+    matrices, _ = matrices
+
+    scores = matrices.term_scores('wildfire', 'Categories')
+    assert set(scores) == {'Climate'} and scores['Climate'][0] > 1
+    assert matrices.term_scores('unknown', 'Categories') == {}
+
+    top = matrices.term_documents('tax', 'Categories', 'Politics', n_documents=3)
+    assert len(top) == 3 and top.is_monotonic_decreasing
+    assert set(top.index) <= set(articles.index[articles['Categories'] == 'Politics'])
+
+    document = top.index[0]
+    by_group = matrices.document_scores(document, 'Categories')
+    assert list(by_group) == [articles.loc[document, 'Categories']]
+    assert dict(by_group[articles.loc[document, 'Categories']])['tax'] == pytest.approx(top.iloc[0])
+    assert matrices.document_scores(1003) == {}
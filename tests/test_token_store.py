@@ -0,0 +1,109 @@
+"""
+Tests for the memory-mapped token-ID corpus store.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from dedup import NearDuplicates
+from group_tfidf import GroupTfidfEngine
+from token_store import TokenStore, store_key
+
+
+@pytest.fixture
+def articles(make_articles):
+    df = make_articles(60, 23, start=500, Categories=['Politics', 'Economy', 'Climate'],
+                       publisher_leaning=['Left', 'Lean Right', None])
+    df['body'] += ' the and said'  # stop words, left out of the vocabulary
+    df.loc[507, 'body'] = ' '
+    return df
+
+
+@pytest.fixture
+def texts(articles):
+    return articles['body']
+
+
+@pytest.fixture
+def labels(articles):
+    return articles[['Categories', 'publisher_leaning']]
+
+
+def test_engine_matches_text_fit(texts, labels):
+    store = TokenStore.from_texts(texts, labels)
+
+    assert store.tokens.dtype == np.uint16
+    assert 'the' not in store.vocabulary and list(store.vocabulary) == sorted(store.vocabulary)
+    rows = np.arange(len(texts)) % 4 != 0
+    for engine, expected in ((GroupTfidfEngine.from_token_store(store), GroupTfidfEngine(texts)),
+                             (GroupTfidfEngine.from_token_store(store, rows=rows), GroupTfidfEngine(texts[rows]))):
+        np.testing.assert_array_equal(engine.vocabulary, expected.vocabulary)
+        np.testing.assert_array_equal(engine.is_document, expected.is_document)
+        assert (engine.counts != expected.counts).nnz == 0
+        assert engine.top_words(labels['Categories']) == expected.top_words(labels['Categories'])
+
+
+def test_save_and_memory_map(texts, labels, tmp_path):
+    store = TokenStore.from_texts(texts, labels, key={'input': 'articles.csv'})
+    store.save(str(tmp_path))
+
+    loaded = TokenStore.load(str(tmp_path))
+
+    assert isinstance(loaded.tokens, np.memmap) and not loaded.tokens.flags.writeable
+    assert loaded.labels['Categories'][0].dtype == np.int8
+    np.testing.assert_array_equal(loaded.document(3), store.document(3))
+    pd.testing.assert_frame_equal(loaded.frame(), labels)
+    assert (loaded.counts() != store.counts()).nnz == 0
+    np.testing.assert_array_equal(NearDuplicates.from_token_store(loaded).cluster,
+                                  NearDuplicates.from_token_store(store).cluster)
+
+
+def test_stale_store_is_not_reused(texts, tmp_path):
+    data_file = tmp_path / 'articles.csv'
+    data_file.write_text('title,body\n')
+    key = store_key(str(data_file))
+    TokenStore.from_texts(texts, key=key).save(str(tmp_path / 'store'))
+
+    assert len(TokenStore.load_matching(key, str(tmp_path / 'store'))) == len(texts)
+    assert TokenStore.load_matching(store_key(str(data_file), use_ner=True), str(tmp_path / 'store')) is None
+    data_file.write_text('title,body\nedited,\n')
+    assert TokenStore.load_matching(store_key(str(data_file)), str(tmp_path / 'store')) is None
+    assert TokenStore.load_matching(key, str(tmp_path / 'missing')) is None
+
+
+def test_string_index_round_trips(texts, labels, tmp_path):
+    texts.index = pd.Index([f'a{i}' for i in texts.index], name='article')
+    store = TokenStore.from_texts(texts, labels.set_axis(texts.index))
+    store.save(str(tmp_path))
+
+    loaded = TokenStore.load(str(tmp_path))
+
+    pd.testing.assert_index_equal(loaded.index, texts.index, exact=False)
+    assert loaded.frame().index.name == 'article'
+
+
+def test_interrupted_save_keeps_previous_store(texts, labels, tmp_path, monkeypatch):
+    TokenStore.from_texts(texts, labels).save(str(tmp_path))
+    previous = TokenStore.load(str(tmp_path))
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, 'replace', fail)
+    with pytest.raises(OSError):
+        TokenStore.from_texts(texts[:10], labels[:10]).save(str(tmp_path))
+    monkeypatch.undo()
+
+    loaded = TokenStore.load(str(tmp_path))
+    assert len(loaded) == len(texts)
+    assert (loaded.counts() != previous.counts()).nnz == 0
+
+    TokenStore.from_texts(texts[:10], labels[:10]).save(str(tmp_path))
+    assert len(TokenStore.load(str(tmp_path))) == 10
+    assert sorted(os.listdir(tmp_path)) == ['arrays_000001', 'store.json']  # older arrays removed
@@ -1,7 +1,7 @@
 """Test suite for data processing tools.
 
 This module contains pytest tests for the data processing utilities:
-add_publisher_leaning, separate_by_category, and update_categories.
+add_publisher_leaning, separate_by_category, update_categories and data_io.
 """
 
 import pytest
@@ -13,9 +13,10 @@ import sys
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'tools'))
 
-from add_publisher_leaning import add_publisher_leaning, publisher_leaning
-from separate_by_category import separate_data_by_category
+from add_publisher_leaning import add_publisher_leaning, publisher_leaning, PublisherLeaningResolver, source_keys
+from separate_by_category import separate_data_by_category, read_category
 from update_categories import update_categories
+from data_io import read_table, write_table, read_columns
 
 class TestAddPublisherLeaning:
     @pytest.fixture
@@ -47,6 +48,25 @@ class TestAddPublisherLeaning:
         
         assert result_df is None
 
+    def test_csv_input_is_read_once(self, sample_data, tmp_path, monkeypatch):
+        import add_publisher_leaning as module
+        import data_io
+        input_file = tmp_path / "input.csv"
+        sample_data.to_csv(input_file, index=False)
+        reads = []
+        
+        def counting_read_table(*args, **kwargs):
+            reads.append(args)
+            return read_table(*args, **kwargs)
+        
+        monkeypatch.setattr(module, 'read_table', counting_read_table)
+        monkeypatch.setattr(data_io, 'read_table', counting_read_table)
+        
+        add_publisher_leaning(str(input_file), str(input_file))
+        
+        assert len(reads) == 1
+        assert list(pd.read_csv(input_file)['publisher_leaning']) == ['Center-Left', 'Right', 'Unknown']
+
     def test_publisher_leaning_dict_not_empty(self):
         assert len(publisher_leaning) > 0
         assert 'CNBC' in publisher_leaning
@@ -64,6 +84,55 @@ class TestAddPublisherLeaning:
         assert len(output_df) == len(sample_data)
         assert 'publisher_leaning' in output_df.columns
 
+    def test_resolver_matches_source_variants(self):
+        resolver = PublisherLeaningResolver()
+        
+        assert resolver.resolve('Fox News Channel') == 'Right'
+        assert resolver.resolve('foxnews.com') == 'Right'
+        assert resolver.resolve('https://www.foxnews.com/politics') == 'Right'
+        assert resolver.resolve('FOX NEWS') == 'Right'
+        assert resolver.resolve('New York Times') == 'Left'
+        assert resolver.resolve('The Dispatch') == 'Center-Right'
+        assert resolver.resolve('Fox Business') == 'Right'
+        assert resolver.resolve('Unknown Source') is None
+        assert source_keys('The Fox News Channel') == ['thefoxnewschannel', 'foxnewschannel',
+                                                        'thefoxnews', 'foxnews']
+
+    def test_resolver_resolves_each_source_once(self, monkeypatch):
+        import add_publisher_leaning as module
+        calls = []
+        original = module.source_keys
+        monkeypatch.setattr(module, 'source_keys', lambda name: calls.append(name) or original(name))
+        
+        resolver = PublisherLeaningResolver()
+        calls.clear()
+        sources = pd.Series(['foxnews.com', 'CNBC', 'Mystery Gazette', None] * 250, dtype='category')
+        leanings = resolver.resolve_series(sources)
+        resolver.resolve_series(sources.astype(object))
+        
+        assert sorted(calls) == ['Mystery Gazette', 'foxnews.com']
+        assert list(leanings[:2]) == ['Right', 'Center-Left']
+        assert leanings[2:4].isna().all()
+        assert resolver.unmatched == {'Mystery Gazette': 500}
+
+    def test_chunked_matches_in_memory(self, tmp_path):
+        input_file = tmp_path / "input.csv"
+        sources = ['CNBC', 'foxnews.com', 'Unknown Source', 'Reuters', 'the atlantic']
+        pd.DataFrame({
+            'title': [f'Article {i}' for i in range(10)],
+            'source': sources * 2,
+            'body': [f'Body {i}, with a comma' for i in range(10)],
+        }).to_csv(input_file, index=False)
+        
+        add_publisher_leaning(str(input_file), str(tmp_path / "full.csv"))
+        result_df = add_publisher_leaning(str(input_file), str(tmp_path / "chunked.csv"), chunk_size=3)
+        
+        full_df = pd.read_csv(tmp_path / "full.csv")
+        chunked_df = pd.read_csv(tmp_path / "chunked.csv")
+        pd.testing.assert_frame_equal(chunked_df, full_df)
+        assert list(result_df['publisher_leaning'].astype(object)) == list(full_df['publisher_leaning'])
+        assert list(full_df['publisher_leaning'][:5]) == ['Center-Left', 'Right', 'Unknown', 'Centrist', 'Left']
+
 
 class TestSeparateByCategory:
     @pytest.fixture
@@ -111,6 +180,30 @@ class TestSeparateByCategory:
         expected_file = Path('data') / 'immigration_and_security.csv'
         assert expected_file.exists()
 
+    def test_verification_counts(self, sample_category_data, tmp_path, monkeypatch, capsys):
+        monkeypatch.chdir(tmp_path)
+        sample_category_data.to_csv('data_annotated.csv', index=False)
+
+        separate_data_by_category(workers=2)
+
+        output = capsys.readouterr().out
+        assert "Economy: 2 entries" in output
+        assert "Verification: 4 entries distributed across all files" in output
+
+    def test_partitioned_dataset(self, sample_category_data, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        sample_category_data.to_csv('data_annotated.csv', index=False)
+
+        separate_data_by_category(partitioned=True)
+        separate_data_by_category(partitioned=True)  # rerun replaces, does not append
+
+        dataset_dir = Path('data') / 'by_category'
+        assert dataset_dir.exists()
+        economy_df = read_category(dataset_dir, 'Economy', columns=['title'])
+        assert sorted(economy_df['title']) == ['Article 1', 'Article 3']
+        immigration_df = read_category(dataset_dir, 'Immigration & Security')
+        assert list(immigration_df['title']) == ['Article 4']
+
 
 class TestUpdateCategories:
     @pytest.fixture
@@ -168,4 +261,103 @@ class TestUpdateCategories:
         
         assert len(updated_df) == len(sample_category_data)
         assert list(updated_df.columns) == list(sample_category_data.columns)
-        assert all(updated_df['title'] == sample_category_data['title'])
\ No newline at end of file
+        assert all(updated_df['title'] == sample_category_data['title'])
+
+    def test_update_categories_skips_unchanged_file(self, sample_category_data, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        sample_category_data['Categories'] = ['Economy', 'Social Issues', 'Economy']
+        sample_category_data.to_csv('data_annotated.csv', index=False)
+        before = os.stat('data_annotated.csv')
+        
+        assert update_categories() == {}
+        
+        after = os.stat('data_annotated.csv')
+        assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+
+    @pytest.mark.parametrize('extension', ['.csv', '.parquet', '.feather'])
+    def test_update_categories_chunked(self, tmp_path, monkeypatch, extension):
+        monkeypatch.chdir(tmp_path)
+        categories = ['Social', 'Economy', None, 'Immigration and Security', 'Corruption/Scandal', 'Social', 'Economy']
+        df = pd.DataFrame({
+            'title': [f'Article {i}' for i in range(len(categories))],
+            'Categories': categories,
+            'body': [f'Body {i}, with a comma' for i in range(len(categories))],
+        })
+        write_table(df, 'data_annotated' + extension)
+        
+        changes = update_categories(chunk_size=2)
+        
+        assert changes == {'data_annotated' + extension: {
+            'Social': 2, 'Corruption/Scandal': 1, 'Immigration and Security': 1}}
+        updated_df = read_table('data_annotated' + extension)
+        expected = ['Social Issues', 'Economy', None, 'Immigration & Security', 'Corruption & Scandal',
+                    'Social Issues', 'Economy']
+        assert [None if pd.isna(c) else c for c in updated_df['Categories']] == expected
+        assert list(updated_df['body']) == list(df['body'])
+        assert os.listdir(tmp_path) == ['data_annotated' + extension]
+
+
+class TestDataIO:
+    @pytest.fixture
+    def sample_articles(self):
+        return pd.DataFrame({
+            'title': ['Article 1', 'Article 2', 'Article 3'],
+            'body': ['Body 1', 'Body 2', 'Body 3'],
+            'source': ['CNBC', 'Fox News', 'CNBC'],
+            'Categories': ['Economy', 'Social', 'Economy'],
+        })
+
+    @pytest.mark.parametrize("extension", ['.parquet', '.feather'])
+    def test_columnar_round_trip_with_categoricals(self, sample_articles, tmp_path, extension):
+        path = tmp_path / f"articles{extension}"
+        write_table(sample_articles, path)
+
+        df = read_table(path)
+        assert isinstance(df['source'].dtype, pd.CategoricalDtype)
+        assert isinstance(df['Categories'].dtype, pd.CategoricalDtype)
+        assert list(df['title']) == list(sample_articles['title'])
+
+    @pytest.mark.parametrize("extension", ['.csv', '.parquet', '.feather'])
+    def test_column_projection(self, sample_articles, tmp_path, extension):
+        path = tmp_path / f"articles{extension}"
+        write_table(sample_articles, path)
+
+        assert read_columns(path) == list(sample_articles.columns)
+        df = read_table(path, columns=['source', 'missing'])
+        assert list(df.columns) == ['source']
+
+    def test_unsupported_extension(self, sample_articles, tmp_path):
+        with pytest.raises(ValueError):
+            write_table(sample_articles, tmp_path / "articles.xlsx")
+
+    def test_add_publisher_leaning_parquet(self, sample_articles, tmp_path):
+        input_file = tmp_path / "input.parquet"
+        output_file = tmp_path / "output.parquet"
+        write_table(sample_articles, input_file)
+
+        result_df = add_publisher_leaning(str(input_file), str(output_file))
+
+        assert 'body' not in result_df.columns  # never parsed
+        assert list(result_df['publisher_leaning']) == ['Center-Left', 'Right', 'Center-Left']
+        output_df = read_table(output_file)
+        assert list(output_df['body']) == list(sample_articles['body'])
+        assert list(output_df['publisher_leaning']) == ['Center-Left', 'Right', 'Center-Left']
+
+    def test_update_categories_parquet(self, sample_articles, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        write_table(sample_articles, 'data_annotated.parquet')
+
+        update_categories()
+
+        updated_df = read_table('data_annotated.parquet')
+        assert list(updated_df['Categories']) == ['Economy', 'Social Issues', 'Economy']
+        assert list(updated_df['body']) == list(sample_articles['body'])
+
+    def test_separate_by_category_parquet_output(self, sample_articles, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        write_table(sample_articles, 'data_annotated.parquet')
+
+        separate_data_by_category(output_format='parquet')
+
+        economy_df = read_table(Path('data') / 'economy.parquet')
+        assert len(economy_df) == 2
@@ -2,10 +2,22 @@
 
 This module maps news publishers to political bias categories using a predefined
 dictionary of publisher political leanings (Left, Center-Left, Right, etc.).
+Input and output may be CSV, Parquet or Feather files.
+
+Sources are matched through a normalized-name index, so spelling variants of a
+known publisher ("FOX NEWS", "foxnews.com", "Fox News Channel") resolve to its
+leaning. Each distinct source string is resolved once and the result is
+broadcast to every row that carries it.
 """
 
+import numpy as np
 import pandas as pd
 import os
+import re
+import sys
+from collections import Counter
+
+from data_io import find_table, read_columns, read_table, table_format, write_with_columns
 
 publisher_leaning = {
     "CNBC": "Center-Left",
@@ -45,22 +57,132 @@ publisher_leaning = {
     "The Atlantic": "Left"
 }
 
-def add_publisher_leaning(input_file, output_file):
+# trailing words that do not tell two outlets apart ("Fox News Channel")
+GENERIC_SOURCE_SUFFIXES = ('channel', 'network', 'online', 'digital', 'website', 'magazine')
+DOMAIN_PATTERN = re.compile(r'(?:https?://)?(?:www\.)?([a-z0-9.-]+?)\.(?:com|org|net|co\.uk|co|news|tv|us)(?:/.*)?')
+
+def source_keys(name):
+    """Normalized lookup keys for a source name, most specific first.
+
+    Keys are casefolded with punctuation and whitespace removed. A bare
+    domain is reduced to its name ("foxnews.com" -> "foxnews"), and variants
+    without a leading "the" and without a generic trailing word are added.
+    """
+    name = str(name).casefold().strip().replace('&', ' and ')
+    domain = DOMAIN_PATTERN.fullmatch(name)
+    if domain:
+        name = domain.group(1)
+    words = re.findall(r'[^\W_]+', name)
+    variants = [words]
+    if len(words) > 1 and words[0] == 'the':
+        variants.append(words[1:])
+    for variant in list(variants):
+        if len(variant) > 1 and variant[-1] in GENERIC_SOURCE_SUFFIXES:
+            variants.append(variant[:-1])
+    keys = []
+    for variant in variants:
+        key = ''.join(variant)
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+class PublisherLeaningResolver:
+    """Resolve source names to leanings through a normalized-key index.
+
+    ``resolve_series`` factorizes its input, so each distinct source is looked
+    up once per resolver (results are memoized) however many rows share it.
+    Sources that match nothing are counted in ``unmatched``.
+    """
+
+    def __init__(self, leanings=None):
+        self.leanings = publisher_leaning if leanings is None else leanings
+        self._index = {}
+        ambiguous = set()
+        for name, leaning in self.leanings.items():
+            for key in source_keys(name):
+                if self._index.setdefault(key, leaning) != leaning:
+                    ambiguous.add(key)
+        for key in ambiguous:
+            del self._index[key]
+        self._memo = {}
+        self.unmatched = Counter()
+
+    def resolve(self, source):
+        """Leaning of one source name, or None when it is not known."""
+        if source not in self._memo:
+            leaning = self.leanings.get(source)
+            if leaning is None:
+                leaning = next((self._index[key] for key in source_keys(source) if key in self._index), None)
+            self._memo[source] = leaning
+        return self._memo[source]
+
+    def resolve_series(self, sources):
+        """Leanings for a Series of sources (None where unmatched), same index."""
+        sources = pd.Series(sources)
+        if isinstance(sources.dtype, pd.CategoricalDtype):
+            codes, uniques = sources.cat.codes.to_numpy(), sources.cat.categories
+        else:
+            codes, uniques = pd.factorize(sources)
+        resolved = np.array([self.resolve(source) for source in uniques] + [None], dtype=object)
+        leanings = resolved[codes]  # code -1 (missing source) picks the trailing None
+
+        row_counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        for source, leaning, count in zip(uniques, resolved, row_counts):
+            if leaning is None and count:
+                self.unmatched[source] += int(count)
+        return pd.Series(leanings, index=sources.index, name='publisher_leaning')
+
+    def report_unmatched(self):
+        if not self.unmatched:
+            return
+        print("Warning: The following publishers were not found in the leaning dictionary:")
+        for publisher, count in self.unmatched.most_common():
+            print(f"  - {publisher} ({count} rows)")
+        print("These entries will have 'Unknown' as publisher_leaning")
+
+def _add_publisher_leaning_chunked(input_file, output_file, resolver, chunk_size):
+    """Stream a CSV input in chunks; returns the ``source`` and ``publisher_leaning`` columns."""
+    temp_path = os.path.join(os.path.dirname(os.path.abspath(output_file)), '.tmp_' + os.path.basename(output_file))
+    resolved = []
     try:
-        df = pd.read_csv(input_file)
-        
-        df['publisher_leaning'] = df['source'].map(publisher_leaning)
-        
-        unmapped_publishers = df[df['publisher_leaning'].isna()]['source'].unique()
-        if len(unmapped_publishers) > 0:
-            print("Warning: The following publishers were not found in the leaning dictionary:")
-            for publisher in unmapped_publishers:
-                print(f"  - {publisher}")
-            print("These entries will have 'Unknown' as publisher_leaning")
+        # strings in, strings out: the other columns are copied verbatim
+        chunks = pd.read_csv(input_file, chunksize=chunk_size, dtype=str, keep_default_na=False)
+        for i, chunk in enumerate(chunks):
+            chunk['publisher_leaning'] = resolver.resolve_series(chunk['source']).fillna('Unknown')
+            chunk.to_csv(temp_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+            resolved.append(chunk[['source', 'publisher_leaning']].astype('category'))
+        os.replace(temp_path, output_file)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return pd.concat(resolved, ignore_index=True) if resolved else pd.DataFrame(columns=['source', 'publisher_leaning'])
+
+def add_publisher_leaning(input_file, output_file, chunk_size=None, resolver=None):
+    """Write ``output_file`` as ``input_file`` plus a ``publisher_leaning`` column.
+
+    Returns the resulting DataFrame. For CSV data this is the full table; for
+    Parquet/Feather the article text (``body``) is copied as Arrow data and
+    left out of the returned frame, so it is never parsed. With ``chunk_size``
+    a CSV-to-CSV run is streamed in chunks of that many rows and only the
+    ``source`` and ``publisher_leaning`` columns are returned.
+    """
+    resolver = PublisherLeaningResolver() if resolver is None else resolver
+    try:
+        is_csv = table_format(input_file) == 'csv'
+        if chunk_size and is_csv and table_format(output_file) == 'csv':
+            df = _add_publisher_leaning_chunked(input_file, output_file, resolver, chunk_size)
+        else:
+            if is_csv:
+                df = read_table(input_file)
+            else:
+                df = read_table(input_file, columns=[c for c in read_columns(input_file) if c != 'body'])
             
-            df['publisher_leaning'] = df['publisher_leaning'].fillna('Unknown')
+            df['publisher_leaning'] = resolver.resolve_series(df['source']).fillna('Unknown')
+            # a CSV input is already fully loaded, so it is written from df instead of being parsed again
+            write_with_columns(input_file, output_file, {'publisher_leaning': df['publisher_leaning']},
+                               frame=df if is_csv else None)
         
-        df.to_csv(output_file, index=False)
+        resolver.report_unmatched()
         
         print(f"Successfully created {output_file} with publisher leaning information")
         print(f"Total rows processed: {len(df)}")
@@ -80,11 +202,13 @@ def add_publisher_leaning(input_file, output_file):
         return None
 
 if __name__ == "__main__":
-    input_file = "data_annotated.csv"
-    output_file = "data_annotated_with_leaning.csv"
+    # Usage: python tools/add_publisher_leaning.py [chunk_size]
+    input_file = find_table("data_annotated") or "data_annotated.csv"
+    output_file = "data_annotated_with_leaning" + os.path.splitext(input_file)[1]
+    chunk_size = int(sys.argv[1]) if len(sys.argv) > 1 else None
     
-    result_df = add_publisher_leaning(input_file, output_file)
+    result_df = add_publisher_leaning(input_file, output_file, chunk_size=chunk_size)
     
     if result_df is not None:
         print(f"\nFirst few rows of the updated dataset:")
-        print(result_df[['title', 'source', 'publisher_leaning']].head())
\ No newline at end of file
+        print(result_df[[c for c in ('title', 'source', 'publisher_leaning') if c in result_df.columns]].head())
\ No newline at end of file
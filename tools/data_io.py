@@ -0,0 +1,181 @@
+"""Read and write article tables in CSV, Parquet or Feather format.
+
+The format is chosen from the file extension. Columnar files store the
+repeated label columns (Categories, source, publisher_leaning) as categoricals
+and support column projection, so a step that only needs ``source`` or
+``Categories`` never parses the article bodies. CSV remains supported for
+import and export.
+
+Usage:
+    python tools/data_io.py data_annotated.csv data_annotated.parquet
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+CATEGORICAL_COLUMNS = ('Categories', 'source', 'publisher_leaning')
+TABLE_FORMATS = {'.csv': 'csv', '.parquet': 'parquet', '.feather': 'feather'}
+# preferred order when looking for an existing dataset by base name
+FORMAT_PREFERENCE = ('.parquet', '.feather', '.csv')
+
+
+def table_format(path):
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension not in TABLE_FORMATS:
+        raise ValueError(f"Unsupported table format '{extension}' for {path} (use .csv, .parquet or .feather)")
+    return TABLE_FORMATS[extension]
+
+
+def find_table(base_name, directory='.'):
+    """First existing ``base_name`` + extension in FORMAT_PREFERENCE order, or None."""
+    for extension in FORMAT_PREFERENCE:
+        path = os.path.join(directory, base_name + extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def read_columns(path):
+    """Column names of a table without reading its rows."""
+    fmt = table_format(path)
+    if fmt == 'csv':
+        return list(pd.read_csv(path, nrows=0).columns)
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    if fmt == 'parquet':
+        return list(pq.read_schema(path).names)
+    with pa.memory_map(str(path)) as source:
+        return list(pa.ipc.open_file(source).schema.names)
+
+
+def read_table(path, columns=None):
+    """Read a table, loading only ``columns`` (missing ones are ignored) when given."""
+    fmt = table_format(path)
+    if columns is not None:
+        available = read_columns(path)
+        columns = [column for column in columns if column in available]
+
+    if fmt == 'csv':
+        return pd.read_csv(path, usecols=columns)
+    if fmt == 'parquet':
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_feather(path, columns=columns)
+
+
+def iter_table_chunks(path, chunk_size, columns=None):
+    """Yield DataFrames of at most ``chunk_size`` rows, restricted to ``columns``.
+
+    CSV is read with ``chunksize``, Parquet row batch by row batch and Feather
+    one record batch slice at a time from a memory map.
+    """
+    fmt = table_format(path)
+    if columns is not None:
+        available = read_columns(path)
+        columns = [column for column in columns if column in available]
+
+    if fmt == 'csv':
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=columns)
+        return
+    for batch in iter_arrow_batches(path, chunk_size, columns):
+        yield batch.to_pandas()
+
+
+def iter_arrow_batches(path, chunk_size, columns=None):
+    """Arrow record batches of a Parquet or Feather file."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if table_format(path) == 'parquet':
+        yield from pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns)
+        return
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if columns is not None:
+                batch = batch.select(columns)
+            for offset in range(0, batch.num_rows, chunk_size):
+                yield batch.slice(offset, chunk_size)
+
+
+def with_categoricals(df):
+    df = df.copy()
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+    return df
+
+
+def without_categoricals(df):
+    """Plain object columns, e.g. before assigning labels that are not categories yet."""
+    df = df.copy()
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype(object)
+    return df
+
+
+def write_table(df, path):
+    fmt = table_format(path)
+    if fmt == 'csv':
+        df.to_csv(path, index=False)
+    elif fmt == 'parquet':
+        with_categoricals(df).to_parquet(path, index=False)
+    else:
+        with_categoricals(df).reset_index(drop=True).to_feather(path)
+
+
+def write_with_columns(input_path, output_path, new_columns, frame=None):
+    """Copy ``input_path`` to ``output_path`` with ``new_columns`` added or replaced.
+
+    When both files are columnar the other columns are copied as Arrow data
+    and never converted to Python objects; otherwise the table is rewritten
+    through pandas, from ``frame`` when the caller has already read the whole
+    of ``input_path``. The output is written to a temporary file first, so
+    ``output_path`` may be the same as ``input_path``.
+    """
+    temp_path = os.path.join(os.path.dirname(os.path.abspath(output_path)),
+                             '.tmp_' + os.path.basename(output_path))
+    if table_format(input_path) == 'csv' or table_format(output_path) == 'csv':
+        df = read_table(input_path) if frame is None else frame.copy()
+        for name, values in new_columns.items():
+            df[name] = list(values)
+        write_table(df, temp_path)
+        os.replace(temp_path, output_path)
+        return
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyarrow.feather as feather
+
+    if table_format(input_path) == 'parquet':
+        table = pq.read_table(input_path)
+    else:
+        table = feather.read_table(input_path)
+
+    for name, values in new_columns.items():
+        column = pa.array(pd.Series(list(values)).astype('category'))
+        if name in table.column_names:
+            table = table.set_column(table.column_names.index(name), name, column)
+        else:
+            table = table.append_column(name, column)
+
+    if table_format(output_path) == 'parquet':
+        pq.write_table(table, temp_path)
+    else:
+        feather.write_feather(table, temp_path)
+    os.replace(temp_path, output_path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python tools/data_io.py <input.csv|.parquet|.feather> <output.csv|.parquet|.feather>")
+        sys.exit(1)
+
+    input_file, output_file = sys.argv[1], sys.argv[2]
+    df = read_table(input_file)
+    write_table(df, output_file)
+    print(f"Converted {input_file} ({len(df)} rows) to {output_file}")
@@ -1,35 +1,69 @@
 """Separate dataset into category-specific CSV files.
 
-This module segments the annotated dataset into individual CSV files
-for each content category to enable targeted analysis.
+This module segments the annotated dataset into individual CSV (or Parquet /
+Feather) files for each content category to enable targeted analysis, or into
+a single Hive-style partitioned Parquet dataset keyed by category.
 """
 
 import pandas as pd
 import os
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def separate_data_by_category():
-    print("Reading data_annotated.csv...")
-    df = pd.read_csv('data_annotated.csv')
+from data_io import find_table, read_table, write_table
+
+PARTITIONED_DIR = 'by_category'
+
+def safe_category_filename(category):
+    return category.replace('&', 'and').replace('/', '_').replace(' ', '_').lower()
+
+def write_partitioned_dataset(df, dataset_dir, column='Categories'):
+    """Write ``df`` as a Hive-style Parquet dataset (``column=<value>/...``)."""
+    dataset_dir = Path(dataset_dir)
+    if dataset_dir.exists():
+        shutil.rmtree(dataset_dir)  # partition files are appended otherwise
+    df[df[column].notna()].to_parquet(dataset_dir, partition_cols=[column], index=False)
+
+def read_category(dataset_dir, category, columns=None, column='Categories'):
+    """Load one category from a partitioned dataset without scanning the others."""
+    return pd.read_parquet(dataset_dir, columns=columns, filters=[(column, '==', category)])
+
+def separate_data_by_category(input_file=None, output_format='csv', workers=None, partitioned=False):
+    if input_file is None:
+        input_file = find_table('data_annotated') or 'data_annotated.csv'
+    print(f"Reading {input_file}...")
+    df = read_table(input_file)
     
     data_dir = Path('data')
     data_dir.mkdir(exist_ok=True)
     
-    categories = df['Categories'].unique()
-    print(f"Found {len(categories)} categories:")
-    for cat in categories:
-        print(f"  - {cat}")
+    # one pass over the rows; groups keep their order of first appearance
+    groups = [(category, category_data) for category, category_data
+              in df.groupby('Categories', sort=False, observed=True)]
+    print(f"Found {len(groups)} categories:")
+    for category, _ in groups:
+        print(f"  - {category}")
     
-    for category in categories:
-        category_data = df[df['Categories'] == category]
-        
-        safe_filename = category.replace('&', 'and').replace('/', '_').replace(' ', '_').lower()
-        filename = f"{safe_filename}.csv"
-        filepath = data_dir / filename
-        
-        category_data.to_csv(filepath, index=False)
-        
-        print(f"Saved {len(category_data)} entries for '{category}' to {filepath}")
+    if partitioned:
+        dataset_dir = data_dir / PARTITIONED_DIR
+        write_partitioned_dataset(df, dataset_dir)
+        for category, category_data in groups:
+            print(f"Saved {len(category_data)} entries for '{category}' to {dataset_dir}")
+    else:
+        # files are independent, so they are written concurrently
+        # (Parquet/Feather writers release the GIL while encoding)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = []
+            for category, category_data in groups:
+                filepath = data_dir / f"{safe_category_filename(category)}.{output_format}"
+                futures.append((category, len(category_data), filepath,
+                                pool.submit(write_table, category_data, filepath)))
+            
+            for category, count, filepath, future in futures:
+                future.result()
+                print(f"Saved {count} entries for '{category}' to {filepath}")
     
     print(f"\nAll files saved successfully in the 'data' folder!")
     
@@ -38,18 +72,21 @@ def separate_data_by_category():
     print(f"Total entries in original file: {total_entries}")
     
     verification_count = 0
-    for category in categories:
-        count = len(df[df['Categories'] == category])
+    for category, category_data in groups:
+        count = len(category_data)
         verification_count += count
         print(f"  {category}: {count} entries")
     
     print(f"Verification: {verification_count} entries distributed across all files")
+    missing = total_entries - verification_count
+    if missing:
+        print(f"Warning: {missing} entries have no category and were not written")
 
 if __name__ == "__main__":
     try:
-        separate_data_by_category()
+        separate_data_by_category(partitioned='--partitioned' in sys.argv)
         print("Script completed successfully!")
     except Exception as e:
         print(f"Error occurred: {e}")
         import traceback
-        traceback.print_exc()
\ No newline at end of file
+        traceback.print_exc()
@@ -2,85 +2,174 @@
 Update category names in annotated datasets to ensure consistency.
 
 This module standardizes category naming conventions across datasets by applying
-predefined mapping rules to normalize category labels.
+predefined mapping rules to normalize category labels. Files are processed in
+bounded chunks: a first pass reads only the Categories column to find out
+whether anything would change, and only then is the file rewritten, chunk by
+chunk, into a temporary file that atomically replaces the original.
 """
 
 import pandas as pd
 import os
+import sys
 
-def update_categories():
+from data_io import FORMAT_PREFERENCE, iter_arrow_batches, iter_table_chunks, table_format
+
+DATASET_NAMES = ["data_annotated", "data_annotated_with_leaning"]
+
+CATEGORY_MAPPINGS = {
+    "Social": "Social Issues",
+    "Corruption/Scandal": "Corruption & Scandal",
+    "Immigration and Security": "Immigration & Security"
+}
+
+UPDATE_CHUNK_SIZE = 100000
+
+def remap_categories(categories, mappings=CATEGORY_MAPPINGS):
+    """Apply every mapping in one vectorized pass; unmapped values are kept."""
+    categories = pd.Series(categories).astype(object)
+    return categories.map(mappings).fillna(categories).where(categories.notna())
+
+def category_counts(data_file, chunk_size=UPDATE_CHUNK_SIZE):
+    """Category distribution of ``data_file``, reading only the Categories column."""
+    counts = pd.Series(dtype='int64')
+    for chunk in iter_table_chunks(data_file, chunk_size, columns=['Categories']):
+        counts = counts.add(chunk['Categories'].astype(object).value_counts(), fill_value=0)
+    return counts.astype('int64').sort_values(ascending=False, kind='stable')
+
+def _temp_path(data_file):
+    directory, name = os.path.split(os.path.abspath(data_file))
+    return os.path.join(directory, '.tmp_' + name)
+
+def rewrite_categories(data_file, mappings=CATEGORY_MAPPINGS, chunk_size=UPDATE_CHUNK_SIZE):
+    """Rewrite ``data_file`` chunk by chunk with ``mappings`` applied to Categories.
+
+    The output goes to a temporary file in the same directory, which replaces
+    ``data_file`` only once it is complete.
+    """
+    temp_path = _temp_path(data_file)
+    try:
+        if table_format(data_file) == 'csv':
+            # strings in, strings out: the other columns are copied verbatim
+            chunks = pd.read_csv(data_file, chunksize=chunk_size, dtype=str, keep_default_na=False)
+            for i, chunk in enumerate(chunks):
+                chunk['Categories'] = remap_categories(chunk['Categories'], mappings)
+                chunk.to_csv(temp_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        else:
+            _rewrite_arrow(data_file, temp_path, mappings, chunk_size)
+        os.replace(temp_path, data_file)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def _rewrite_arrow(data_file, temp_path, mappings, chunk_size):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    is_parquet = table_format(data_file) == 'parquet'
+    # Feather allows a single dictionary per field, so every batch is encoded
+    # against the same one
+    dictionary = pd.Index(remap_categories(category_counts(data_file, chunk_size).index, mappings)).unique()
+    writer = None
+    try:
+        for batch in iter_arrow_batches(data_file, chunk_size):
+            if writer is None:
+                schema = batch.schema
+                writer = pq.ParquetWriter(temp_path, schema) if is_parquet else pa.ipc.new_file(temp_path, schema)
+            i = schema.get_field_index('Categories')
+            categories = remap_categories(batch.column(i).to_pandas(), mappings)
+            columns = list(batch.columns)
+            field_type = schema.field(i).type
+            if pa.types.is_dictionary(field_type):
+                codes = pd.Categorical(categories, categories=dictionary).codes
+                columns[i] = pa.DictionaryArray.from_arrays(
+                    pa.array(codes, type=field_type.index_type, mask=codes < 0),
+                    pa.array(dictionary, type=field_type.value_type),
+                )
+            else:
+                columns[i] = pa.array(categories, type=field_type, from_pandas=True)
+            batch = pa.RecordBatch.from_arrays(columns, schema=schema)
+            if is_parquet:
+                writer.write_table(pa.Table.from_batches([batch]))
+            else:
+                writer.write_batch(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+
+def update_categories(chunk_size=UPDATE_CHUNK_SIZE):
     """
-    Update category names in CSV files according to predefined mapping rules.
+    Update category names in data files according to predefined mapping rules.
     
-    Processes data_annotated.csv and data_annotated_with_leaning.csv files,
-    applying standardized category naming conventions. Creates backup of 
-    original files and reports on changes made.
+    Processes data_annotated and data_annotated_with_leaning in every format
+    present (.parquet, .feather, .csv), applying standardized category naming
+    conventions, and reports on changes made. Files in which no category
+    would change are left untouched; the others are rewritten in chunks of
+    ``chunk_size`` rows and atomically replaced.
     
-    Category mappings applied:
+    Category mappings applied (CATEGORY_MAPPINGS):
     - "Social" → "Social Issues"
     - "Corruption/Scandal" → "Corruption & Scandal"
     - "Immigration and Security" → "Immigration & Security"
     
-    Raises:
-        FileNotFoundError: If required CSV files are not found
-        Exception: For CSV reading/writing errors
+    Returns:
+        dict: ``{data_file: {old_category: count}}`` for the files that were rewritten
     """
-    csv_files = ["data_annotated.csv", "data_annotated_with_leaning.csv"]
+    data_files = []
+    for dataset in DATASET_NAMES:
+        found = [dataset + extension for extension in FORMAT_PREFERENCE if os.path.exists(dataset + extension)]
+        if not found:
+            print(f"Warning: {dataset}.csv not found in current directory, skipping...")
+        data_files.extend(found)
     
-    for csv_file in csv_files:
-        if not os.path.exists(csv_file):
-            print(f"Warning: {csv_file} not found in current directory, skipping...")
-            continue
-        
-        print(f"\nReading {csv_file}...")
+    updated = {}
+    for data_file in data_files:
+        print(f"\nReading {data_file}...")
         
         try:
-            df = pd.read_csv(csv_file)
+            counts = category_counts(data_file, chunk_size)
         except Exception as e:
-            print(f"Error reading CSV file {csv_file}: {e}")
+            print(f"Error reading data file {data_file}: {e}")
             continue
         
-        print(f"\nCurrent category distribution in {csv_file}:")
-        print(df['Categories'].value_counts())
-        
-        category_mappings = {
-            "Social": "Social Issues",
-            "Corruption/Scandal": "Corruption & Scandal", 
-            "Immigration and Security": "Immigration & Security"
-        }
+        print(f"\nCurrent category distribution in {data_file}:")
+        print(counts)
         
         changes_made = {}
-        
-        for old_category, new_category in category_mappings.items():
-            count = (df['Categories'] == old_category).sum()
+        for old_category, new_category in CATEGORY_MAPPINGS.items():
+            count = int(counts.get(old_category, 0))
             if count > 0:
-                df.loc[df['Categories'] == old_category, 'Categories'] = new_category
                 changes_made[old_category] = {'new_name': new_category, 'count': count}
-                print(f"Updated {count} rows: '{old_category}' → '{new_category}'")
+                print(f"Updating {count} rows: '{old_category}' → '{new_category}'")
             else:
                 print(f"No rows found with category '{old_category}'")
         
+        if not changes_made:
+            print(f"\nNo changes were made to {data_file} - target categories not found.")
+            print("\n" + "="*60)
+            continue
+        
         try:
-            df.to_csv(csv_file, index=False)
-            print(f"\nSuccessfully updated {csv_file}")
+            rewrite_categories(data_file, CATEGORY_MAPPINGS, chunk_size)
+            print(f"\nSuccessfully updated {data_file}")
         except Exception as e:
-            print(f"Error saving CSV file {csv_file}: {e}")
+            print(f"Error saving data file {data_file}: {e}")
             continue
+        updated[data_file] = {old_name: info['count'] for old_name, info in changes_made.items()}
         
-        print(f"\nUpdated category distribution in {csv_file}:")
-        print(df['Categories'].value_counts())
+        print(f"\nUpdated category distribution in {data_file}:")
+        print(counts.rename(index=lambda category: CATEGORY_MAPPINGS.get(category, category))
+                    .groupby(level=0, sort=False).sum().sort_values(ascending=False, kind='stable'))
         
-        if changes_made:
-            print(f"\nSummary of changes made to {csv_file}:")
-            for old_name, info in changes_made.items():
-                print(f"  - {info['count']} rows changed from '{old_name}' to '{info['new_name']}'")
-        else:
-            print(f"\nNo changes were made to {csv_file} - target categories not found.")
+        print(f"\nSummary of changes made to {data_file}:")
+        for old_name, info in changes_made.items():
+            print(f"  - {info['count']} rows changed from '{old_name}' to '{info['new_name']}'")
             
         print("\n" + "="*60)
+    return updated
 
 if __name__ == "__main__":
     """
     Main execution block - runs category update process when script is called directly.
+    Usage: python tools/update_categories.py [chunk_size]
     """
-    update_categories()
\ No newline at end of file
+    update_categories(int(sys.argv[1]) if len(sys.argv) > 1 else UPDATE_CHUNK_SIZE)